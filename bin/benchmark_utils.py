@@ -0,0 +1,56 @@
+"""
+Helpers for the `bin/benchmark_*` scripts for summarizing timings and
+saving and comparing results across revisions.
+"""
+
+import os
+import subprocess
+
+from sentry.utils import json
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def get_revision() -> str | None:
+    try:
+        return (
+            subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT)
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_change(value: float, baseline: float | None) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value - baseline) / baseline:+6.1%})"
+
+
+def load_baseline(path: str | None) -> dict[str, dict] | None:
+    """
+    Loads results saved with `save_results` to compare against, if a path is
+    given.
+    """
+    if not path:
+        return None
+
+    with open(path) as f:
+        baseline_data = json.load(f)
+    print(f"comparing against {baseline_data.get('revision') or path}\n")
+    return baseline_data["results"]
+
+
+def save_results(path: str | None, rounds: int, results: dict[str, dict]) -> None:
+    if not path:
+        return
+
+    with open(path, "w") as f:
+        json.dump({"revision": get_revision(), "rounds": rounds, "results": results}, f)
+    print(f"\nresults saved to {path}")
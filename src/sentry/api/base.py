@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import functools
 import logging
 import time
-from collections.abc import Callable, Iterable, Mapping
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from datetime import datetime, timedelta, timezone
 from typing import Any, TypedDict
 from urllib.parse import quote as urlquote
@@ -23,7 +24,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from sentry_sdk import Scope
 
-from sentry import analytics, options, tsdb
+from sentry import analytics, features, options, tsdb
 from sentry.api.api_owners import ApiOwner
 from sentry.api.api_publish_status import ApiPublishStatus
 from sentry.api.exceptions import StaffRequired, SuperuserRequired
@@ -226,6 +227,9 @@ class Endpoint(APIView):
         | Callable[..., RateLimitConfig | dict[str, dict[RateLimitCategory, RateLimit]]]
     ) = DEFAULT_RATE_LIMIT_CONFIG
     enforce_rate_limit: bool = settings.SENTRY_RATELIMITER_ENABLED
+    # Organization and project features the endpoint checks, which are evaluated
+    # at once when feature checks are memoized per request
+    prefetch_features: Sequence[str] = ()
 
     def build_cursor_link(self, request: HttpRequest, name: str, cursor: Cursor) -> str:
         if request.GET.get("cursor") is None:
@@ -383,55 +387,77 @@ class Endpoint(APIView):
         if origin == "null":
             origin = None
 
-        try:
-            with sentry_sdk.start_span(op="base.dispatch.request", name=type(self).__name__):
-                if origin:
+        feature_check_cache = (
+            features.default_manager.request_cache()
+            if options.get("features.request-cache.enabled")
+            else contextlib.nullcontext()
+        )
+        with feature_check_cache as check_cache:
+            try:
+                with sentry_sdk.start_span(op="base.dispatch.request", name=type(self).__name__):
+                    if origin:
+                        if request.auth:
+                            allowed_origins = request.auth.get_allowed_origins()
+                        else:
+                            allowed_origins = None
+                        if not is_valid_origin(origin, allowed=allowed_origins):
+                            response = Response(f"Invalid origin: {origin}", status=400)
+                            self.response = self.finalize_response(
+                                request, response, *args, **kwargs
+                            )
+                            return self.response
+
                     if request.auth:
-                        allowed_origins = request.auth.get_allowed_origins()
+                        update_token_access_record(request.auth)
+
+                    self.initial(request, *args, **kwargs)
+
+                    if getattr(request, "access", None) is None:
+                        # setup default access
+                        request.access = access.from_request(request)
+
+                    # Get the appropriate handler method
+                    assert request.method is not None
+                    method = request.method.lower()
+                    if method in self.http_method_names and hasattr(self, method):
+                        handler = getattr(self, method)
+
+                        # Only convert args when using defined handlers
+                        (args, kwargs) = self.convert_args(request, *args, **kwargs)
+                        self.args = args
+                        self.kwargs = kwargs
+
+                        if check_cache is not None and self.prefetch_features:
+                            project = kwargs.get("project")
+                            features.default_manager.prefetch(
+                                self.prefetch_features,
+                                actor=request.user,
+                                projects=[project] if project is not None else None,
+                                organization=kwargs.get("organization")
+                                or getattr(project, "organization", None),
+                            )
                     else:
-                        allowed_origins = None
-                    if not is_valid_origin(origin, allowed=allowed_origins):
-                        response = Response(f"Invalid origin: {origin}", status=400)
-                        self.response = self.finalize_response(request, response, *args, **kwargs)
-                        return self.response
-
-                if request.auth:
-                    update_token_access_record(request.auth)
-
-                self.initial(request, *args, **kwargs)
-
-                if getattr(request, "access", None) is None:
-                    # setup default access
-                    request.access = access.from_request(request)
-
-                # Get the appropriate handler method
-                assert request.method is not None
-                method = request.method.lower()
-                if method in self.http_method_names and hasattr(self, method):
-                    handler = getattr(self, method)
-
-                    # Only convert args when using defined handlers
-                    (args, kwargs) = self.convert_args(request, *args, **kwargs)
-                    self.args = args
-                    self.kwargs = kwargs
-                else:
-                    handler = self.http_method_not_allowed
+                        handler = self.http_method_not_allowed
 
-            with sentry_sdk.start_span(
-                op="base.dispatch.execute",
-                name=".".join(
-                    getattr(part, "__name__", None) or str(part) for part in (type(self), handler)
-                ),
-            ) as span:
-                response = handler(request, *args, **kwargs)
+                with sentry_sdk.start_span(
+                    op="base.dispatch.execute",
+                    name=".".join(
+                        getattr(part, "__name__", None) or str(part)
+                        for part in (type(self), handler)
+                    ),
+                ) as span:
+                    response = handler(request, *args, **kwargs)
+
+            except Exception as exc:
+                response = self.handle_exception_with_details(request, exc)
 
-        except Exception as exc:
-            response = self.handle_exception_with_details(request, exc)
+            if origin:
+                self.add_cors_headers(request, response)
 
-        if origin:
-            self.add_cors_headers(request, response)
+            self.response = self.finalize_response(request, response, *args, **kwargs)
 
-        self.response = self.finalize_response(request, response, *args, **kwargs)
+            if check_cache is not None:
+                self.response["X-Sentry-Feature-Checks"] = check_cache.get_debug_header()
 
         if settings.SENTRY_API_RESPONSE_DELAY:
             duration = time.time() - start_time
@@ -28,6 +28,7 @@ class Buffer(Service):
     __all__ = (
         "get",
         "incr",
+        "flush_aggregated_incrs",
         "process",
         "process_pending",
         "process_batch",
@@ -137,6 +138,13 @@ class Buffer(Service):
             headers={"sentry-propagate-traces": False},
         )
 
+    def flush_aggregated_incrs(self) -> None:
+        """
+        Write out any increments that the backend is holding in-process. Backends that
+        don't coalesce increments have nothing to do here.
+        """
+        return
+
     def process_pending(self) -> None:
         return
 
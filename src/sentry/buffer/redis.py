@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import os
 import pickle
+import threading
+import weakref
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from enum import Enum
 from time import time
 from typing import Any, TypeVar
 
 import rb
+from celery.signals import worker_process_shutdown
 from django.utils.encoding import force_bytes, force_str
 from rediscluster import RedisCluster
 
@@ -221,17 +226,150 @@ class PendingBuffer:
         return rv
 
 
+@dataclass
+class AggregatedIncr:
+    model: type[models.Model]
+    filters: dict[str, BufferField]
+    columns: dict[str, int] = field(default_factory=dict)
+    extra: dict[str, Any] = field(default_factory=dict)
+    signal_only: bool = False
+    # number of `incr` calls folded into this entry
+    count: int = 0
+
+    def merge(
+        self,
+        columns: dict[str, int],
+        extra: dict[str, Any] | None,
+        signal_only: bool | None,
+    ) -> None:
+        for column, amount in columns.items():
+            self.columns[column] = self.columns.get(column, 0) + amount
+        if extra:
+            # last write wins, same as the HSET we would have issued per call
+            self.extra.update(extra)
+        if signal_only is True:
+            self.signal_only = True
+        self.count += 1
+
+
+class IncrAggregator:
+    """
+    Coalesces `RedisBuffer.incr` calls in-process, keyed by the buffer key of
+    (model, filters). Entries are handed back by `drain` once either the
+    aggregation window has elapsed or `max_keys` distinct keys are pending.
+    """
+
+    def __init__(self, max_keys: int, window: float) -> None:
+        assert max_keys > 0
+        self.max_keys = max_keys
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: dict[str, AggregatedIncr] = {}
+        self._window_start: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        key: str,
+        model: type[models.Model],
+        columns: dict[str, int],
+        filters: dict[str, BufferField],
+        extra: dict[str, Any] | None,
+        signal_only: bool | None,
+    ) -> dict[str, AggregatedIncr] | None:
+        """
+        Adds an increment and returns the drained entries if this call
+        crossed the flush threshold, or None otherwise.
+        """
+        now = time()
+        with self._lock:
+            if self._window_start is None:
+                self._window_start = now
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = AggregatedIncr(model=model, filters=filters)
+            entry.merge(columns, extra, signal_only)
+
+            if len(self._pending) >= self.max_keys or now - self._window_start >= self.window:
+                return self._drain_locked()
+        return None
+
+    def drain(self) -> dict[str, AggregatedIncr]:
+        with self._lock:
+            return self._drain_locked()
+
+    def _drain_locked(self) -> dict[str, AggregatedIncr]:
+        pending = self._pending
+        self._pending = {}
+        self._window_start = None
+        return pending
+
+
+# Buffers coalescing increments in this process, flushed when it shuts down.
+_aggregating_buffers: weakref.WeakSet[RedisBuffer] = weakref.WeakSet()
+
+
+def _shutdown_incr_aggregation(**kwargs: Any) -> None:
+    for buffer in list(_aggregating_buffers):
+        buffer.shutdown_incr_aggregation()
+
+
+# Don't lose coalesced increments when the process shuts down. Celery prefork
+# children exit without running `atexit` handlers, and only send
+# `worker_process_shutdown`.
+atexit.register(_shutdown_incr_aggregation)
+worker_process_shutdown.connect(_shutdown_incr_aggregation, weak=False)
+
+
+def _flush_aggregated_incrs_periodically(
+    buffer_ref: weakref.ref[RedisBuffer], stop: threading.Event, window: float
+) -> None:
+    # Only holds a weak reference, so that the thread doesn't keep the buffer alive.
+    while not stop.wait(window):
+        buffer = buffer_ref()
+        if buffer is None:
+            return
+        try:
+            buffer.flush_aggregated_incrs()
+        except Exception:
+            logger.exception("buffer.incr.aggregated-flush-failed")
+        del buffer
+
+
 class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, incr_batch_size: int = 2, **options: object):
+    def __init__(
+        self,
+        incr_batch_size: int = 2,
+        incr_aggregation_max_keys: int = 0,
+        incr_aggregation_window: float = 1.0,
+        **options: object,
+    ):
+        """
+        incr_aggregation_max_keys - When greater than zero, `incr` calls are
+        coalesced in-process per (model, filters) and written to Redis as one
+        pipelined batch per node once this many distinct keys are pending, or
+        once `incr_aggregation_window` seconds have passed since the first
+        pending increment. Disabled by default.
+        """
         self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
             "SENTRY_BUFFER_OPTIONS", options
         )
         self.incr_batch_size = incr_batch_size
         assert self.incr_batch_size > 0
 
+        self.incr_aggregator: IncrAggregator | None = None
+        if incr_aggregation_max_keys > 0:
+            self.incr_aggregator = IncrAggregator(
+                max_keys=incr_aggregation_max_keys, window=incr_aggregation_window
+            )
+        self._flush_thread_pid: int | None = None
+        self._flush_thread_stop: threading.Event | None = None
+
     def validate(self) -> None:
         validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
 
@@ -463,11 +601,45 @@ class RedisBuffer(Buffer):
             - Perform a set (last write wins) on extra
             - Perform a set on signal_only (only if True)
         - Add hashmap key to pending flushes
+
+        If in-process aggregation is enabled, the increment is coalesced with others
+        for the same key and only written once the aggregator's threshold is reached
+        (or on `flush_aggregated_incrs`).
         """
         key = self._make_key(model, filters)
-        # We can't use conn.map() due to wanting to support multiple pending
-        # keys (one per Redis partition)
-        pipe = self.get_redis_connection(key)
+
+        if self.incr_aggregator is not None:
+            self._ensure_flush_thread()
+            drained = self.incr_aggregator.add(key, model, columns, filters, extra, signal_only)
+            if drained:
+                self._write_aggregated_incrs(drained)
+        else:
+            # We can't use conn.map() due to wanting to support multiple pending
+            # keys (one per Redis partition)
+            pipe = self.get_redis_connection(key)
+            self._queue_incr(pipe, key, model, columns, filters, extra, signal_only)
+            pipe.execute()
+
+        metrics.incr(
+            "buffer.incr",
+            skip_internal=True,
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+    def _queue_incr(
+        self,
+        pipe: Pipeline,
+        key: str,
+        model: type[models.Model],
+        columns: dict[str, int],
+        filters: dict[str, BufferField],
+        extra: dict[str, Any] | None,
+        signal_only: bool | None,
+        now: float | None = None,
+    ) -> None:
+        """
+        Adds the commands for a single buffered increment of `key` to `pipe`.
+        """
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
         _validate_json_roundtrip(filters, model)
 
@@ -494,14 +666,114 @@ class RedisBuffer(Buffer):
             pipe.hset(key, "s", "1")
 
         pipe.expire(key, self.key_expire)
-        pipe.zadd(self.pending_key, {key: time()})
-        pipe.execute()
+        pipe.zadd(self.pending_key, {key: now if now is not None else time()})
 
-        metrics.incr(
-            "buffer.incr",
-            skip_internal=True,
-            tags={"module": model.__module__, "model": model.__name__},
-        )
+    def flush_aggregated_incrs(self) -> None:
+        """
+        Writes out any increments currently coalesced in-process.
+        """
+        if self.incr_aggregator is None:
+            return
+        drained = self.incr_aggregator.drain()
+        if drained:
+            self._write_aggregated_incrs(drained)
+
+    def shutdown_incr_aggregation(self) -> None:
+        """
+        Stops the periodic flush thread of this process and writes out any
+        increments currently coalesced in-process.
+        """
+        if self._flush_thread_stop is not None:
+            self._flush_thread_stop.set()
+        self.flush_aggregated_incrs()
+
+    def _ensure_flush_thread(self) -> None:
+        """
+        Starts a thread in this process that flushes coalesced increments once
+        per aggregation window, so that they are written even if no further
+        `incr` calls come in. Threads don't survive a fork, so every process
+        starts its own.
+        """
+        pid = os.getpid()
+        if self._flush_thread_pid == pid:
+            return
+        assert self.incr_aggregator is not None
+        self._flush_thread_pid = pid
+        self._flush_thread_stop = threading.Event()
+        _aggregating_buffers.add(self)
+        threading.Thread(
+            target=_flush_aggregated_incrs_periodically,
+            args=(weakref.ref(self), self._flush_thread_stop, self.incr_aggregator.window),
+            name="buffer-incr-flush",
+            daemon=True,
+        ).start()
+
+    def _write_aggregated_incrs(self, entries: dict[str, AggregatedIncr]) -> None:
+        """
+        Writes drained entries with one pipeline per node. Entries of pipelines
+        that fail are dropped and counted, same as increments failing to be
+        written without aggregation: a pipeline without a transaction may have
+        partially applied, and retrying it would count some increments twice.
+        """
+        now = time()
+        pipes: list[tuple[Pipeline, dict[str, AggregatedIncr]]] = []
+        if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
+            # The cluster pipeline splits commands per node itself on execute.
+            pipe = self.cluster.pipeline(transaction=False)
+            for key, entry in entries.items():
+                self._queue_incr(
+                    pipe,
+                    key,
+                    entry.model,
+                    entry.columns,
+                    entry.filters,
+                    entry.extra,
+                    entry.signal_only,
+                    now=now,
+                )
+            pipes.append((pipe, entries))
+        elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
+            router = self.cluster.get_router()
+            pipes_by_host: dict[int, tuple[Pipeline, dict[str, AggregatedIncr]]] = {}
+            for key, entry in entries.items():
+                host_id = router.get_host_for_key(key)
+                if host_id not in pipes_by_host:
+                    pipes_by_host[host_id] = (
+                        self.cluster.get_local_client(host_id).pipeline(transaction=True),
+                        {},
+                    )
+                pipe, host_entries = pipes_by_host[host_id]
+                host_entries[key] = entry
+                self._queue_incr(
+                    pipe,
+                    key,
+                    entry.model,
+                    entry.columns,
+                    entry.filters,
+                    entry.extra,
+                    entry.signal_only,
+                    now=now,
+                )
+            pipes.extend(pipes_by_host.values())
+        else:
+            raise AssertionError("unreachable")
+
+        for pipe, pipe_entries in pipes:
+            try:
+                pipe.execute()
+            except Exception:
+                logger.exception("buffer.incr.aggregated-write-failed")
+                metrics.incr("buffer.incr.aggregated-write-failed", skip_internal=True)
+                metrics.incr(
+                    "buffer.incr.aggregated-dropped",
+                    amount=sum(entry.count for entry in pipe_entries.values()),
+                    skip_internal=True,
+                )
+
+        calls = sum(entry.count for entry in entries.values())
+        metrics.incr("buffer.incr.coalesced", amount=calls - len(entries), skip_internal=True)
+        metrics.distribution("buffer.incr.aggregated-keys", len(entries))
+        metrics.distribution("buffer.incr.aggregated-pipelines", len(pipes))
 
     def process_pending(self) -> None:
         client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
@@ -424,6 +424,24 @@ KAFKA_CONSUMERS: Mapping[str, ConsumerDefinition] = {
                 default=100,
                 help="The number of segments to download from redis at once. Defaults to 100.",
             ),
+            click.Option(
+                ["--flush-concurrency", "flush_concurrency"],
+                type=int,
+                default=1,
+                help="The number of threads loading segments from redis in parallel. Defaults to 1.",
+            ),
+            click.Option(
+                ["--segment-read-chunk-size", "segment_read_chunk_size"],
+                type=int,
+                default=0,
+                help="Read segments from redis in chunks of this many spans. Defaults to 0 (read at once).",
+            ),
+            click.Option(
+                ["--max-segment-bytes", "max_segment_bytes"],
+                type=int,
+                default=0,
+                help="Truncate segments larger than this many bytes. Defaults to 0 (unlimited).",
+            ),
             *multiprocessing_options(default_max_batch_size=100),
         ],
     },
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import logging
 
-__all__ = ["FeatureManager"]
+__all__ = ["FeatureCheckCache", "FeatureManager"]
 
 import abc
+import threading
+import time
 from collections import defaultdict
-from collections.abc import Iterable, Sequence
+from collections.abc import Generator, Iterable, Sequence
+from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
 
 import sentry_sdk
@@ -139,6 +142,28 @@ class RegisteredFeatureManager:
 FLAGPOLE_OPTION_PREFIX = "feature"
 
 
+class FeatureCheckCache:
+    """
+    Results of the feature checks made while handling a request, keyed by the
+    feature, the objects it was checked for and the actor.
+    """
+
+    def __init__(self) -> None:
+        self.results: dict[tuple[Any, ...], bool] = {}
+        self.hits = 0
+        self.misses = 0
+        # Seconds spent checking (and prefetching) features
+        self.duration = 0.0
+
+    def get_debug_header(self) -> str:
+        checks = self.hits + self.misses
+        hit_rate = self.hits / checks if checks else 0.0
+        return (
+            f"checks={checks}; hits={self.hits}; hit_rate={hit_rate:.2f}; "
+            f"duration_ms={self.duration * 1000:.1f}"
+        )
+
+
 # TODO: Change RegisteredFeatureManager back to object once it can be removed
 class FeatureManager(RegisteredFeatureManager):
     def __init__(self) -> None:
@@ -150,6 +175,7 @@ class FeatureManager(RegisteredFeatureManager):
         self.option_features: set[str] = set()
         self.flagpole_features: set[str] = set()
         self._entity_handler: FeatureHandler | None = None
+        self._local = threading.local()
 
     def all(
         self, feature_type: type[Feature] = Feature, api_expose_only: bool = False
@@ -270,7 +296,31 @@ class FeatureManager(RegisteredFeatureManager):
 
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
 
+        Within ``request_cache``, results are memoized per feature, objects and
+        actor.
         """
+        check_cache: FeatureCheckCache | None = getattr(self._local, "check_cache", None)
+        if check_cache is None:
+            return self._has(name, *args, skip_entity=skip_entity, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            key = self._get_check_key(name, args, kwargs, skip_entity)
+            if key is not None and key in check_cache.results:
+                check_cache.hits += 1
+                rv = check_cache.results[key]
+                record_feature_flag(name, rv)
+                return rv
+
+            check_cache.misses += 1
+            rv = self._has(name, *args, skip_entity=skip_entity, **kwargs)
+            if key is not None:
+                check_cache.results[key] = rv
+            return rv
+        finally:
+            check_cache.duration += time.perf_counter() - start
+
+    def _has(self, name: str, *args: Any, skip_entity: bool | None = False, **kwargs: Any) -> bool:
         sample_rate = 0.01
         try:
             with metrics.timer("features.has", tags={"feature": name}, sample_rate=sample_rate):
@@ -381,6 +431,95 @@ class FeatureManager(RegisteredFeatureManager):
                 sentry_sdk.capture_exception(e)
             return None
 
+    @contextmanager
+    def request_cache(self) -> Generator[FeatureCheckCache]:
+        """
+        Memoizes the results of ``has`` in the current thread for the duration
+        of the block, which is usually the handling of an API request.
+        """
+        check_cache = FeatureCheckCache()
+        previous = getattr(self._local, "check_cache", None)
+        self._local.check_cache = check_cache
+        try:
+            yield check_cache
+        finally:
+            self._local.check_cache = previous
+
+    def prefetch(
+        self,
+        feature_names: Sequence[str],
+        actor: User | RpcUser | AnonymousUser | None = None,
+        projects: Sequence[Project] | None = None,
+        organization: Organization | None = None,
+    ) -> None:
+        """
+        Checks the given organization and project features with ``batch_has``,
+        and memoizes the results in the active request cache so that later
+        calls to ``has`` don't evaluate them one by one.
+        """
+        check_cache: FeatureCheckCache | None = getattr(self._local, "check_cache", None)
+        if check_cache is None:
+            return
+
+        org_features = [name for name in feature_names if name.startswith("organizations:")]
+        project_features = [name for name in feature_names if name.startswith("projects:")]
+        batches = []
+        if organization is not None and org_features:
+            batches.append((org_features, None))
+        if projects and project_features:
+            batches.append((project_features, projects))
+
+        if self._entity_handler is None:
+            # `batch_has` falls back to `has`, which memoizes the results
+            for names, batch_projects in batches:
+                self.batch_has(names, actor, projects=batch_projects, organization=organization)
+            return
+
+        start = time.perf_counter()
+        try:
+            for names, batch_projects in batches:
+                results = self.batch_has(
+                    names, actor, projects=batch_projects, organization=organization
+                )
+                for scope, scope_results in (results or {}).items():
+                    subject_id = int(scope.split(":")[1])
+                    for name, rv in scope_results.items():
+                        # Registered handlers take precedence over the entity
+                        # handler, and unhandled features fall back to defaults
+                        if rv is None or self._handler_registry.get(name):
+                            continue
+                        key = (name, (subject_id,), self._get_actor_key(actor), False)
+                        check_cache.results.setdefault(key, rv)
+        finally:
+            check_cache.duration += time.perf_counter() - start
+
+    @staticmethod
+    def _get_actor_key(actor: User | RpcUser | AnonymousUser | None) -> Any:
+        if actor is None:
+            return None
+        return getattr(actor, "id", None) or "anonymous"
+
+    def _get_check_key(
+        self, name: str, args: Sequence[Any], kwargs: dict[str, Any], skip_entity: bool | None
+    ) -> tuple[Any, ...] | None:
+        """
+        Returns the key to memoize a call to ``has`` under, or None if it can't
+        be memoized. The feature class determines what its arguments are, so
+        they are identified by their ids (e.g. an `Organization` and an
+        `RpcOrganization` are the same organization), whether they are passed
+        by position or by name.
+        """
+        subject_ids = []
+        for arg in [*args, *(value for key, value in sorted(kwargs.items()) if key != "actor")]:
+            subject_id = getattr(arg, "id", None)
+            if subject_id is None:
+                return None
+            subject_ids.append(subject_id)
+
+        return (
+            name, tuple(subject_ids), self._get_actor_key(kwargs.get("actor")), bool(skip_entity)
+        )
+
     @staticmethod
     def _shim_feature_strategy(
         entity_feature_strategy: bool | FeatureHandlerStrategy,
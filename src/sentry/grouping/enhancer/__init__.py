@@ -18,8 +18,10 @@ from sentry_ophio.enhancers import Enhancements as RustEnhancements
 
 from sentry.grouping.component import FrameGroupingComponent, StacktraceGroupingComponent
 from sentry.stacktraces.functions import set_in_app
+from sentry.utils import metrics
 from sentry.utils.safe import get_path, set_path
 
+from . import cache as enhancements_cache
 from .exceptions import InvalidEnhancerConfig
 from .matchers import create_match_frame
 from .parser import parse_enhancements
@@ -477,12 +479,33 @@ class Enhancements:
 
     @classmethod
     def from_base64_string(cls, base64_string: str | bytes) -> Enhancements:
-        """Convert a base64 string into an `Enhancements` object"""
+        """
+        Convert a base64 string into an `Enhancements` object.
+
+        Results are cached per process, so the returned object may be shared and must not be
+        mutated.
+        """
         bytes_str = (
             base64_string.encode("ascii", "ignore")
             if isinstance(base64_string, str)
             else base64_string
         )
+        cache_key = enhancements_cache.get_cache_key(bytes_str)
+        enhancements_cache.record_usage(cache_key, bytes_str)
+
+        with metrics.timer("grouping.enhancements.from_base64_string") as metric_tags:
+            enhancements = enhancements_cache.get_cached_enhancements(cache_key)
+            if enhancements is not None:
+                metric_tags["cache"] = "hit"
+                return enhancements
+
+            metric_tags["cache"] = "miss"
+            enhancements = cls._from_base64_bytes(bytes_str)
+            enhancements_cache.cache_enhancements(cache_key, enhancements)
+            return enhancements
+
+    @classmethod
+    def _from_base64_bytes(cls, bytes_str: bytes) -> Enhancements:
         padded_bytes = bytes_str + b"=" * (4 - (len(bytes_str) % 4))
         try:
             compressed_pickle = base64.urlsafe_b64decode(padded_bytes)
@@ -0,0 +1,130 @@
+"""
+Process-wide cache of parsed enhancements.
+
+Every event carries its grouping config, including the enhancements as a
+base64 string, and building an ``Enhancements`` object from that string
+(decompressing, parsing the rules in Python and Rust and merging them with the
+base rules) is expensive. Since the base64 string fully determines the
+resulting object, parsed enhancements are cached per process keyed by a hash
+of that string.
+
+To avoid every freshly started worker process paying this cost for the same
+configs again, a sample of lookups is recorded in Redis together with the
+serialized config. Worker processes can then warm their cache with the most
+frequently used configs on startup, see ``warm_enhancements_cache``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import threading
+from typing import TYPE_CHECKING
+
+from cachetools import LRUCache
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics, redis
+
+if TYPE_CHECKING:
+    from sentry.grouping.enhancer import Enhancements
+
+logger = logging.getLogger(__name__)
+
+# Most projects use one of a handful of default configs, custom rules are what
+# makes this grow.
+CACHE_SIZE = 1_000
+
+HOT_CONFIGS_KEY = "grouping-enhancements:hot"
+HOT_CONFIGS_MAX = 1_000
+CONFIG_KEY_PREFIX = "grouping-enhancements:config:"
+CONFIG_TTL = 24 * 60 * 60
+
+_cache: LRUCache[str, Enhancements] = LRUCache(maxsize=CACHE_SIZE)
+_lock = threading.Lock()
+
+
+def get_cache_key(base64_bytes: bytes) -> str:
+    return hashlib.sha1(base64_bytes).hexdigest()
+
+
+def get_cached_enhancements(cache_key: str) -> Enhancements | None:
+    with _lock:
+        return _cache.get(cache_key)
+
+
+def cache_enhancements(cache_key: str, enhancements: Enhancements) -> None:
+    with _lock:
+        _cache[cache_key] = enhancements
+
+
+def record_usage(cache_key: str, base64_bytes: bytes) -> None:
+    """
+    Records that the given config was used, for a sample of calls, so that it
+    can be picked up by ``warm_enhancements_cache``.
+    """
+    if random.random() < options.get("grouping.enhancements.hot-configs-sample-rate"):
+        _record_hot_config(cache_key, base64_bytes)
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_GROUPING_ENHANCEMENTS_REDIS_CLUSTER)
+
+
+def _record_hot_config(cache_key: str, base64_bytes: bytes) -> None:
+    try:
+        with _get_redis_client().pipeline(transaction=False) as p:
+            p.set(CONFIG_KEY_PREFIX + cache_key, base64_bytes.decode("ascii"), ex=CONFIG_TTL)
+            p.zincrby(HOT_CONFIGS_KEY, 1, cache_key)
+            p.expire(HOT_CONFIGS_KEY, CONFIG_TTL)
+            # keep only the most used configs
+            p.zremrangebyrank(HOT_CONFIGS_KEY, 0, -HOT_CONFIGS_MAX - 1)
+            p.execute()
+    except Exception:
+        logger.exception("grouping.enhancements.record_hot_config_failed")
+
+
+def warm_enhancements_cache() -> None:
+    """
+    Parses the most frequently used enhancements configs into the process-wide
+    cache. The number of configs is controlled by the
+    `grouping.enhancements.warm-cache-size` option; this is a no-op if it's 0.
+    """
+    from sentry.grouping.enhancer import Enhancements
+
+    size = options.get("grouping.enhancements.warm-cache-size")
+    if size <= 0:
+        return
+
+    with metrics.timer("grouping.enhancements.warm_cache"):
+        try:
+            client = _get_redis_client()
+            cache_keys = client.zrevrange(HOT_CONFIGS_KEY, 0, min(size, CACHE_SIZE) - 1)
+            with client.pipeline(transaction=False) as p:
+                for cache_key in cache_keys:
+                    p.get(CONFIG_KEY_PREFIX + cache_key)
+                configs = p.execute()
+        except Exception:
+            logger.exception("grouping.enhancements.warm_cache_failed")
+            return
+
+        warmed = 0
+        for cache_key, config in zip(cache_keys, configs):
+            if config is None:
+                continue
+            base64_bytes = config.encode("ascii")
+            try:
+                enhancements = Enhancements._from_base64_bytes(base64_bytes)
+            except ValueError:
+                continue
+            cache_enhancements(cache_key, enhancements)
+            warmed += 1
+
+        metrics.distribution("grouping.enhancements.warm_cache.configs", warmed)
@@ -209,6 +209,56 @@ def find_grouphash_with_group(
     return None
 
 
+def bulk_get_or_create_grouphashes(
+    project: Project, hashes: Iterable[str], create_missing: bool = True
+) -> list[tuple[GroupHash, bool]]:
+    """
+    Fetch the `GroupHash` records for the given hashes in a single query and, if `create_missing`
+    is set, create the ones which don't yet exist in a single insert. Returns `(grouphash, created)`
+    pairs in the order of the given hashes. Hashes without a record (only possible if
+    `create_missing` is not set) are skipped.
+
+    Inserts ignore conflicts, so another process creating the same grouphashes concurrently is not
+    an error. In that case both processes may consider the grouphash created, which grouphash
+    metadata creation already guards against.
+    """
+    hashes = list(dict.fromkeys(hashes))
+    if not hashes:
+        return []
+
+    grouphashes_by_hash = {
+        grouphash.hash: grouphash
+        for grouphash in GroupHash.objects.filter(project=project, hash__in=hashes).select_related(
+            "_metadata"
+        )
+    }
+    missing_hashes = [hash_value for hash_value in hashes if hash_value not in grouphashes_by_hash]
+
+    if missing_hashes and create_missing:
+        # Insert in a stable order so that concurrent inserts of overlapping hashes lock rows in the
+        # same order and can't deadlock each other.
+        GroupHash.objects.bulk_create(
+            [GroupHash(project=project, hash=hash_value) for hash_value in sorted(missing_hashes)],
+            ignore_conflicts=True,
+        )
+        # `ignore_conflicts` means we don't get ids back, so the new rows have to be fetched again
+        for grouphash in GroupHash.objects.filter(
+            project=project, hash__in=missing_hashes
+        ).select_related("_metadata"):
+            grouphashes_by_hash[grouphash.hash] = grouphash
+
+        metrics.incr("grouping.grouphash.bulk_created", amount=len(missing_hashes))
+    else:
+        missing_hashes = []
+
+    created_hashes = set(missing_hashes)
+    return [
+        (grouphashes_by_hash[hash_value], hash_value in created_hashes)
+        for hash_value in hashes
+        if hash_value in grouphashes_by_hash
+    ]
+
+
 def get_or_create_grouphashes(
     event: Event,
     project: Project,
@@ -216,23 +266,15 @@ def get_or_create_grouphashes(
     hashes: Iterable[str],
     grouping_config: str,
 ) -> list[GroupHash]:
+    # The only utility of secondary hashes is to link new primary hashes to an existing group via
+    # an existing grouphash. Secondary hashes which are new are therefore of no value, so we don't
+    # create grouphash records for them.
     is_secondary = grouping_config == project.get_option("sentry:secondary_grouping_config")
     grouphashes: list[GroupHash] = []
 
-    if is_secondary:
-        # The only utility of secondary hashes is to link new primary hashes to an existing group
-        # via an existing grouphash. Secondary hashes which are new are therefore of no value, so
-        # filter them out before creating grouphash records.
-        existing_hashes = set(
-            GroupHash.objects.filter(project=project, hash__in=hashes).values_list(
-                "hash", flat=True
-            )
-        )
-        hashes = filter(lambda hash_value: hash_value in existing_hashes, hashes)
-
-    for hash_value in hashes:
-        grouphash, created = GroupHash.objects.get_or_create(project=project, hash=hash_value)
-
+    for grouphash, created in bulk_get_or_create_grouphashes(
+        project, hashes, create_missing=not is_secondary
+    ):
         if should_handle_grouphash_metadata(project, created):
             try:
                 # We don't expect this to throw any errors, but collecting this metadata
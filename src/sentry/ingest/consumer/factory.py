@@ -14,6 +14,7 @@ from arroyo.processing.strategies import (
 )
 from arroyo.types import Commit, FilteredPayload, Message, Partition
 
+from sentry.grouping.enhancer.cache import warm_enhancements_cache
 from sentry.ingest.types import ConsumerType
 from sentry.processing.backpressure.arroyo import HealthChecker, create_backpressure_step
 from sentry.utils.arroyo import MultiprocessingPool, run_task_with_multiprocessing
@@ -76,18 +77,23 @@ class IngestStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         self.stop_at_timestamp = stop_at_timestamp
 
         self.multi_process = None
-        self._pool = MultiprocessingPool(num_processes)
+        self._pool = MultiprocessingPool(num_processes, initializer=warm_enhancements_cache)
 
         # XXX: Attachment topic has two multiprocessing strategies chained together so we use
         # two pools.
         if self.is_attachment_topic:
-            self._attachments_pool: MultiprocessingPool | None = MultiprocessingPool(num_processes)
+            self._attachments_pool: MultiprocessingPool | None = MultiprocessingPool(
+                num_processes, initializer=warm_enhancements_cache
+            )
         else:
             self._attachments_pool = None
         if num_processes > 1:
             self.multi_process = MultiProcessConfig(
                 num_processes, max_batch_size, max_batch_time, input_block_size, output_block_size
             )
+        else:
+            # Events are processed in this process, the pool workers warm up themselves.
+            warm_enhancements_cache()
 
         self.health_checker = HealthChecker("ingest")
 
@@ -171,6 +171,7 @@ class OrganizationGroupIndexEndpoint(OrganizationEndpoint):
     owner = ApiOwner.ISSUES
     permission_classes = (OrganizationEventPermission,)
     enforce_rate_limit = True
+    prefetch_features = ("organizations:global-views", "organizations:issue-taxonomy")
 
     def _search(
         self,
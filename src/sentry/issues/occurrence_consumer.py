@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import logging
 from collections import defaultdict
-from collections.abc import Mapping
+from collections.abc import Collection, Mapping, Sequence
 from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID
 
@@ -22,7 +23,7 @@ from sentry import nodestore, options
 from sentry.event_manager import GroupInfo
 from sentry.eventstore.models import Event
 from sentry.issues.grouptype import InvalidGroupTypeError, get_group_type_by_type_id
-from sentry.issues.ingest import process_occurrence_data, save_issue_occurrence
+from sentry.issues.ingest import hash_fingerprint, process_occurrence_data, save_issue_occurrence
 from sentry.issues.issue_occurrence import DEFAULT_LEVEL, IssueOccurrence, IssueOccurrenceData
 from sentry.issues.json_schemas import EVENT_PAYLOAD_SCHEMA, LEGACY_EVENT_PAYLOAD_SCHEMA
 from sentry.issues.producer import PayloadType
@@ -46,6 +47,36 @@ class EventLookupError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class BatchContext:
+    """
+    Data needed to process the occurrences of a batch, fetched for all of
+    them at once. See `prepare_batch_context`.
+    """
+
+    # ids of the occurrences whose rate limits were checked for the batch, the
+    # others are checked when they are processed
+    rate_limit_checked_ids: frozenset[str] = frozenset()
+    # ids of the occurrences which were rate limited
+    rate_limited_ids: frozenset[str] = frozenset()
+    # nodestore data of the events referenced by occurrences without event data,
+    # keyed by node id
+    event_data: Mapping[str, Any] = field(default_factory=dict)
+    # the occurrences parsed by `_get_kwargs`, or the error parsing them raised,
+    # keyed by occurrence id
+    kwargs: dict[str, Mapping[str, Any] | Exception] = field(default_factory=dict)
+
+    def take_kwargs(self, occurrence_id: str) -> Mapping[str, Any] | None:
+        """
+        Returns the parsed occurrence, or raises the error parsing it raised.
+        Each occurrence is only handed out once, processing it modifies it.
+        """
+        kwargs = self.kwargs.pop(occurrence_id, None)
+        if isinstance(kwargs, Exception):
+            raise kwargs
+        return kwargs
+
+
 def create_rate_limit_key(project_id: int, fingerprint: str) -> str:
     rate_limit_key = f"occurrence_rate_limit:{project_id}-{fingerprint}"
     return rate_limit_key
@@ -77,6 +108,163 @@ def is_rate_limited(
         return False
 
 
+def get_rate_limited_occurrences(payloads: Sequence[Mapping[str, Any]]) -> frozenset[str]:
+    """
+    Checks the rate limits of all the given occurrences with a single call to
+    the rate limiter. Like `is_rate_limited`, each occurrence uses one unit of
+    the quota of its project and fingerprint; once the quota is used up, the
+    remaining occurrences of that fingerprint in the batch are rate limited.
+    """
+    try:
+        rate_limit_enabled = options.get("issues.occurrence-consumer.rate-limit.enabled")
+        if not rate_limit_enabled:
+            return frozenset()
+
+        occurrence_ids: dict[str, list[str]] = defaultdict(list)
+        for payload in payloads:
+            payload_type = payload.get("payload_type", PayloadType.OCCURRENCE.value)
+            if payload_type != PayloadType.OCCURRENCE.value:
+                continue
+            try:
+                fingerprint = hash_fingerprint(payload["fingerprint"][:1])[0]
+                rate_limit_key = create_rate_limit_key(payload["project_id"], fingerprint)
+                occurrence_ids[rate_limit_key].append(payload["id"])
+            except (KeyError, IndexError, TypeError, AttributeError):
+                # invalid payloads are rejected when they are processed
+                continue
+
+        if not occurrence_ids:
+            return frozenset()
+
+        rate_limit_quota = Quota(**options.get("issues.occurrence-consumer.rate-limit.quota"))
+        granted_quotas = rate_limiter.check_and_use_quotas(
+            [
+                RequestedQuota(rate_limit_key, len(ids), [rate_limit_quota])
+                for rate_limit_key, ids in occurrence_ids.items()
+            ]
+        )
+        return frozenset(
+            occurrence_id
+            for ids, granted_quota in zip(occurrence_ids.values(), granted_quotas)
+            for occurrence_id in ids[granted_quota.granted :]
+        )
+    except Exception:
+        logger.exception("Failed to check issue platform rate limiter")
+        return frozenset()
+
+
+def get_event_data(payloads: Sequence[Mapping[str, Any]]) -> Mapping[str, Any]:
+    """
+    Fetches the events referenced by occurrences without event data from
+    nodestore, with a single multi-get.
+    """
+    node_ids = []
+    for payload in payloads:
+        if "event" in payload or not payload.get("event_id"):
+            continue
+        try:
+            event_id = UUID(payload["event_id"]).hex
+            node_ids.append(Event.generate_node_id(payload["project_id"], event_id))
+        except (KeyError, ValueError, TypeError, AttributeError):
+            continue
+
+    if not node_ids:
+        return {}
+
+    try:
+        return {
+            node_id: data
+            for node_id, data in nodestore.backend.get_multi(node_ids).items()
+            if data is not None
+        }
+    except Exception:
+        # each occurrence falls back to looking up its own event
+        logger.exception("Failed to fetch occurrence events from nodestore")
+        return {}
+
+
+def _get_processed_cache_key(occurrence_id: str) -> str:
+    return f"occurrence_consumer.process_occurrence_group.{occurrence_id}"
+
+
+def _get_processed_ids(occurrence_ids: Collection[str]) -> set[str]:
+    """
+    Returns the ids of the given occurrences which were processed recently,
+    and are skipped by `process_occurrence_group`.
+    """
+    cache_keys = {
+        _get_processed_cache_key(occurrence_id): occurrence_id for occurrence_id in occurrence_ids
+    }
+    return {
+        cache_keys[cache_key]
+        for cache_key, processed in cache.get_many(list(cache_keys)).items()
+        if processed
+    }
+
+
+def _get_ingest_context(
+    occurrence_data: Mapping[str, Any],
+) -> tuple[Project, Organization, bool]:
+    """
+    Returns the project and organization of the occurrence, and whether they
+    may ingest occurrences of its type.
+    """
+    project = Project.objects.get_from_cache(id=occurrence_data["project_id"])
+    organization = Organization.objects.get_from_cache(id=project.organization_id)
+    group_type = get_group_type_by_type_id(occurrence_data["type"])
+    return project, organization, group_type.allow_ingest(organization)
+
+
+@metrics.wraps("occurrence_consumer.prepare_batch_context")
+def prepare_batch_context(payloads: Sequence[Mapping[str, Any]]) -> BatchContext:
+    """
+    Parses the occurrences of the batch, and checks the rate limits and
+    fetches the events of the ones which will be ingested. Occurrences
+    skipped as already processed, invalid ones and ones whose type may not be
+    ingested are dropped by `process_occurrence_group` before their rate
+    limits are checked, so they mustn't use any quota.
+    """
+    occurrences: dict[str, Mapping[str, Any]] = {}
+    for payload in payloads:
+        payload_type = payload.get("payload_type", PayloadType.OCCURRENCE.value)
+        if payload_type == PayloadType.OCCURRENCE.value and payload.get("id"):
+            occurrences.setdefault(payload["id"], payload)
+
+    processed_ids = _get_processed_ids(occurrences) if occurrences else set()
+
+    kwargs_by_id: dict[str, Mapping[str, Any] | Exception] = {}
+    ingestible = []
+    for occurrence_id, payload in occurrences.items():
+        if occurrence_id in processed_ids:
+            continue
+        try:
+            with metrics.timer("occurrence_consumer._process_message._get_kwargs"):
+                kwargs = _get_kwargs(payload)
+        except Exception as e:
+            # raised again when the occurrence is processed
+            kwargs_by_id[occurrence_id] = e
+            continue
+        kwargs_by_id[occurrence_id] = kwargs
+
+        try:
+            _, _, allow_ingest = _get_ingest_context(kwargs["occurrence_data"])
+        except Exception:
+            # the error is raised again when the occurrence is processed
+            continue
+        if allow_ingest:
+            ingestible.append(payload)
+
+    rate_limited_ids = get_rate_limited_occurrences(ingestible)
+    return BatchContext(
+        rate_limit_checked_ids=frozenset(payload["id"] for payload in ingestible),
+        rate_limited_ids=rate_limited_ids,
+        event_data=get_event_data(
+            [payload for payload in ingestible if payload["id"] not in rate_limited_ids]
+        ),
+        kwargs=kwargs_by_id,
+    )
+
+
 @sentry_sdk.tracing.trace
 def save_event_from_occurrence(
     data: dict[str, Any],
@@ -96,8 +284,9 @@ def save_event_from_occurrence(
 
 
 @sentry_sdk.tracing.trace
-def lookup_event(project_id: int, event_id: str) -> Event:
-    data = nodestore.backend.get(Event.generate_node_id(project_id, event_id))
+def lookup_event(project_id: int, event_id: str, data: Mapping[str, Any] | None = None) -> Event:
+    if data is None:
+        data = nodestore.backend.get(Event.generate_node_id(project_id, event_id))
     if data is None:
         raise EventLookupError(f"Failed to lookup event({event_id}) for project_id({project_id})")
     event = Event(event_id=event_id, project_id=project_id)
@@ -166,12 +355,12 @@ def process_event_and_issue_occurrence(
 
 @sentry_sdk.tracing.trace
 def lookup_event_and_process_issue_occurrence(
-    occurrence_data: IssueOccurrenceData,
+    occurrence_data: IssueOccurrenceData, event_data: Mapping[str, Any] | None = None
 ) -> tuple[IssueOccurrence, GroupInfo | None]:
     project_id = occurrence_data["project_id"]
     event_id = occurrence_data["event_id"]
     try:
-        event = lookup_event(project_id, event_id)
+        event = lookup_event(project_id, event_id, event_data)
     except Exception:
         raise EventLookupError(f"Failed to lookup event({event_id}) for project_id({project_id})")
 
@@ -323,10 +512,14 @@ def _get_kwargs(payload: Mapping[str, Any]) -> Mapping[str, Any]:
 @sentry_sdk.tracing.trace
 @metrics.wraps("occurrence_consumer.process_occurrence_message")
 def process_occurrence_message(
-    message: Mapping[str, Any], txn: Transaction | NoOpSpan | Span
+    message: Mapping[str, Any],
+    txn: Transaction | NoOpSpan | Span,
+    batch_context: BatchContext | None = None,
 ) -> tuple[IssueOccurrence, GroupInfo | None] | None:
-    with metrics.timer("occurrence_consumer._process_message._get_kwargs"):
-        kwargs = _get_kwargs(message)
+    kwargs = batch_context.take_kwargs(message["id"]) if batch_context is not None else None
+    if kwargs is None:
+        with metrics.timer("occurrence_consumer._process_message._get_kwargs"):
+            kwargs = _get_kwargs(message)
     occurrence_data = kwargs["occurrence_data"]
     metric_tags = {"occurrence_type": occurrence_data["type"]}
     is_buffered_spans = kwargs.get("is_buffered_spans", False)
@@ -338,16 +531,14 @@ def process_occurrence_message(
     )
     txn.set_tag("occurrence_type", occurrence_data["type"])
 
-    project = Project.objects.get_from_cache(id=occurrence_data["project_id"])
-    organization = Organization.objects.get_from_cache(id=project.organization_id)
+    project, organization, allow_ingest = _get_ingest_context(occurrence_data)
 
     txn.set_tag("organization_id", organization.id)
     txn.set_tag("organization_slug", organization.slug)
     txn.set_tag("project_id", project.id)
     txn.set_tag("project_slug", project.slug)
 
-    group_type = get_group_type_by_type_id(occurrence_data["type"])
-    if not group_type.allow_ingest(organization):
+    if not allow_ingest:
         metrics.incr(
             "occurrence_ingest.dropped_feature_disabled",
             sample_rate=1.0,
@@ -356,7 +547,12 @@ def process_occurrence_message(
         txn.set_tag("result", "dropped_feature_disabled")
         return None
 
-    if is_rate_limited(project.id, fingerprint=occurrence_data["fingerprint"][0]):
+    if batch_context is not None and message["id"] in batch_context.rate_limit_checked_ids:
+        rate_limited = message["id"] in batch_context.rate_limited_ids
+    else:
+        rate_limited = is_rate_limited(project.id, fingerprint=occurrence_data["fingerprint"][0])
+
+    if rate_limited:
         metrics.incr(
             "occurrence_ingest.dropped_rate_limited",
             sample_rate=1.0,
@@ -382,13 +578,21 @@ def process_occurrence_message(
             "occurrence_consumer._process_message.lookup_event_and_process_issue_occurrence",
             tags=metric_tags,
         ):
-            return lookup_event_and_process_issue_occurrence(kwargs["occurrence_data"])
+            event_data = None
+            if batch_context is not None:
+                event_data = batch_context.event_data.get(
+                    Event.generate_node_id(project.id, occurrence_data["event_id"])
+                )
+            return lookup_event_and_process_issue_occurrence(
+                kwargs["occurrence_data"], event_data
+            )
 
 
 @sentry_sdk.tracing.trace
 @metrics.wraps("occurrence_consumer.process_message")
 def _process_message(
     message: Mapping[str, Any],
+    batch_context: BatchContext | None = None,
 ) -> tuple[IssueOccurrence | None, GroupInfo | None] | None:
     """
     :raises InvalidEventPayloadError: when the message is invalid
@@ -408,7 +612,7 @@ def _process_message(
 
                 return None, GroupInfo(group=group, is_new=False, is_regression=False)
             elif payload_type == PayloadType.OCCURRENCE.value:
-                return process_occurrence_message(message, txn)
+                return process_occurrence_message(message, txn, batch_context)
             else:
                 metrics.incr(
                     "occurrence_consumer._process_message.dropped_invalid_payload_type",
@@ -436,12 +640,14 @@ def process_occurrence_batch(
     execute each group using a ThreadPoolWorker.
 
     By batching we're able to process occurrences in parallel while guaranteeing
-    that no occurrences are processed out of order per group.
+    that no occurrences are processed out of order per group. Rate limits and
+    events stored in nodestore are fetched for the whole batch at once.
     """
 
     batch = message.payload
 
     occcurrence_mapping: Mapping[str, list[Mapping[str, Any]]] = defaultdict(list)
+    payloads: list[Mapping[str, Any]] = []
 
     for item in batch:
         assert isinstance(item, BrokerValue)
@@ -456,6 +662,7 @@ def process_occurrence_batch(
         partition_key: str = payload["fingerprint"][0] if payload["fingerprint"] else ""
 
         occcurrence_mapping[partition_key].append(payload)
+        payloads.append(payload)
 
     # Number of occurrences that are being processed in this batch
     metrics.gauge("occurrence_consumer.checkin.parallel_batch_count", len(batch))
@@ -464,14 +671,18 @@ def process_occurrence_batch(
     metrics.gauge("occurrence_consumer.checkin.parallel_batch_groups", len(occcurrence_mapping))
     # Submit occurrences & status changes for processing
     with sentry_sdk.start_transaction(op="process_batch", name="occurrence.occurrence_consumer"):
+        batch_context = prepare_batch_context(payloads)
         futures = [
-            worker.submit(process_occurrence_group, group) for group in occcurrence_mapping.values()
+            worker.submit(process_occurrence_group, group, batch_context)
+            for group in occcurrence_mapping.values()
         ]
         wait(futures)
 
 
 @metrics.wraps("occurrence_consumer.process_occurrence_group")
-def process_occurrence_group(items: list[Mapping[str, Any]]) -> None:
+def process_occurrence_group(
+    items: list[Mapping[str, Any]], batch_context: BatchContext | None = None
+) -> None:
     """
     Process a group of related occurrences (all part of the same group)
     completely serially.
@@ -491,10 +702,9 @@ def process_occurrence_group(items: list[Mapping[str, Any]]) -> None:
         )
 
     for item in items:
-        cache_key = f"occurrence_consumer.process_occurrence_group.{item['id']}"
-        if cache.get(cache_key):
+        if _get_processed_ids([item["id"]]):
             logger.info("Skipping processing of occurrence %s due to cache hit", item["id"])
             continue
-        _process_message(item)
+        _process_message(item, batch_context)
         # just need a 300 second cache
-        cache.set(cache_key, 1, 300)
+        cache.set(_get_processed_cache_key(item["id"]), 1, 300)
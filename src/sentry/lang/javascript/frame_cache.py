@@ -0,0 +1,129 @@
+"""
+Cache of JavaScript frames symbolicated by Symbolicator.
+
+The same minified frames recur across many events of a release. How a frame
+is symbolicated only depends on the project, platform, release, dist and
+source map images of the event, on the frame itself, and on its neighbouring
+frames (the function name of a frame is derived from the call site of the
+adjacent frame). Results of fully symbolicated frames are cached under a hash
+of those inputs, in Redis with a bounded process-local LRU in front of it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import orjson
+from cachetools import LRUCache
+from django.conf import settings
+
+from sentry.utils import redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 10_000
+# Sources can be scraped from the web, and may change without a new release
+CACHE_TTL = 60 * 60
+KEY_PREFIX = "js-frame:"
+
+# The raw and the symbolicated frame as returned by Symbolicator
+CachedFrame = tuple[dict[str, Any], dict[str, Any]]
+
+_local_cache: LRUCache[str, CachedFrame] = LRUCache(maxsize=CACHE_SIZE)
+_lock = threading.Lock()
+
+
+def get_cache_keys(
+    project_id: int,
+    data: Mapping[str, Any],
+    modules: Sequence[Mapping[str, Any]],
+    frames: Sequence[Mapping[str, Any]],
+) -> list[str]:
+    """
+    Returns the cache keys of the (normalized) frames of a stacktrace.
+    """
+    event_hash = hashlib.sha1(
+        orjson.dumps(
+            [project_id, data.get("platform"), data.get("release"), data.get("dist"), modules],
+            option=orjson.OPT_SORT_KEYS,
+        )
+    )
+    encoded_frames = [orjson.dumps(frame, option=orjson.OPT_SORT_KEYS) for frame in frames]
+
+    keys = []
+    for i, encoded_frame in enumerate(encoded_frames):
+        frame_hash = event_hash.copy()
+        frame_hash.update(encoded_frames[i - 1] if i > 0 else b"null")
+        frame_hash.update(encoded_frame)
+        frame_hash.update(encoded_frames[i + 1] if i + 1 < len(encoded_frames) else b"null")
+        keys.append(KEY_PREFIX + frame_hash.hexdigest())
+    return keys
+
+
+def _get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_JS_FRAME_CACHE_REDIS_CLUSTER)
+
+
+def get_cached_frames(keys: Sequence[str]) -> dict[str, CachedFrame]:
+    """
+    Looks up the given keys in the local cache, and the remaining ones in
+    Redis. Frames found in Redis are added to the local cache.
+    """
+    cached_frames = {}
+    with _lock:
+        for key in keys:
+            cached_frame = _local_cache.get(key)
+            if cached_frame is not None:
+                cached_frames[key] = cached_frame
+
+    missing_keys = list({key for key in keys if key not in cached_frames})
+    if not missing_keys:
+        return cached_frames
+
+    try:
+        with _get_redis_client().pipeline(transaction=False) as p:
+            for key in missing_keys:
+                p.get(key)
+            values = p.execute()
+    except Exception:
+        logger.exception("sourcemaps.frame_cache.get_failed")
+        return cached_frames
+
+    found = {}
+    for key, value in zip(missing_keys, values):
+        if value is not None:
+            raw_frame, complete_frame = orjson.loads(value)
+            found[key] = (raw_frame, complete_frame)
+
+    with _lock:
+        for key, cached_frame in found.items():
+            _local_cache[key] = cached_frame
+
+    cached_frames.update(found)
+    return cached_frames
+
+
+def cache_frames(frames: Mapping[str, CachedFrame]) -> None:
+    if not frames:
+        return
+
+    with _lock:
+        for key, cached_frame in frames.items():
+            _local_cache[key] = cached_frame
+
+    try:
+        with _get_redis_client().pipeline(transaction=False) as p:
+            for key, cached_frame in frames.items():
+                p.set(key, orjson.dumps(cached_frame), ex=CACHE_TTL)
+            p.execute()
+    except Exception:
+        logger.exception("sourcemaps.frame_cache.set_failed")
+
+
+def clear_local_cache() -> None:
+    with _lock:
+        _local_cache.clear()
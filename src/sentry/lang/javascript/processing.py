@@ -2,7 +2,9 @@ import logging
 import re
 from typing import Any
 
+from sentry import options
 from sentry.debug_files.artifact_bundles import maybe_renew_artifact_bundles_from_processing
+from sentry.lang.javascript import frame_cache
 from sentry.lang.javascript.utils import JAVASCRIPT_PLATFORMS
 from sentry.lang.native.error import SymbolicationFailed, write_error
 from sentry.lang.native.symbolicator import Symbolicator
@@ -224,6 +226,39 @@ def _normalize_frame(raw_frame: Any) -> dict:
     return frame
 
 
+def _record_frame_cache_metrics(cache_keys: list[list[str]], cached_frames: dict[str, Any]) -> None:
+    num_frames = sum(len(keys) for keys in cache_keys)
+    hits = sum(1 for keys in cache_keys for key in keys if key in cached_frames)
+    metrics.incr("sourcemaps.symbolicator.frame_cache.hit", amount=hits)
+    metrics.incr("sourcemaps.symbolicator.frame_cache.miss", amount=num_frames - hits)
+
+
+def _get_cacheable_frames(
+    cache_keys: list[list[str]],
+    raw_stacktraces: dict[int, Any],
+    complete_stacktraces: dict[int, Any],
+    processing_errors: list[Any],
+) -> dict[str, frame_cache.CachedFrame]:
+    """
+    Returns the symbolicated frames which can be cached: the ones which were
+    symbolicated and whose file had no errors, which would otherwise not be
+    reported for cached frames.
+    """
+    error_paths = {error.get("abs_path") for error in processing_errors}
+
+    cacheable_frames = {}
+    for i, complete_stacktrace in complete_stacktraces.items():
+        for key, raw_frame, complete_frame in zip(
+            cache_keys[i], raw_stacktraces[i]["frames"], complete_stacktrace["frames"]
+        ):
+            if not (complete_frame.get("data") or {}).get("symbolicated"):
+                continue
+            if raw_frame.get("abs_path") in error_paths:
+                continue
+            cacheable_frames[key] = (raw_frame, complete_frame)
+    return cacheable_frames
+
+
 def process_js_stacktraces(symbolicator: Symbolicator, data: Any) -> Any:
     modules = sourcemap_images_from_data(data)
 
@@ -245,37 +280,78 @@ def process_js_stacktraces(symbolicator: Symbolicator, data: Any) -> Any:
         metrics.incr("sourcemaps.symbolicator.events.skipped")
         return
 
-    metrics.incr("process.javascript.symbolicate.request")
-    response = symbolicator.process_js(
-        platform=data.get("platform"),
-        stacktraces=stacktraces,
-        modules=modules,
-        release=data.get("release"),
-        dist=data.get("dist"),
-    )
+    # Stacktraces are only sent to Symbolicator if some of their frames are not
+    # cached, and then in full, as frames are symbolicated with their neighbours.
+    cache_keys: list[list[str]] | None = None
+    cached_frames: dict[str, frame_cache.CachedFrame] = {}
+    if options.get("symbolicator.sourcemaps-frame-cache-enabled"):
+        cache_keys = [
+            frame_cache.get_cache_keys(symbolicator.project.id, data, modules, stacktrace["frames"])
+            for stacktrace in stacktraces
+        ]
+        cached_frames = frame_cache.get_cached_frames([key for keys in cache_keys for key in keys])
+        _record_frame_cache_metrics(cache_keys, cached_frames)
+
+    uncached_indexes = [
+        i
+        for i in range(len(stacktraces))
+        if cache_keys is None or any(key not in cached_frames for key in cache_keys[i])
+    ]
 
-    if not _handle_response_status(data, response):
-        return data
+    raw_stacktraces: dict[int, Any] = {}
+    complete_stacktraces: dict[int, Any] = {}
+    if uncached_indexes:
+        metrics.incr("process.javascript.symbolicate.request")
+        response = symbolicator.process_js(
+            platform=data.get("platform"),
+            stacktraces=[stacktraces[i] for i in uncached_indexes],
+            modules=modules,
+            release=data.get("release"),
+            dist=data.get("dist"),
+        )
 
-    used_artifact_bundles = response.get("used_artifact_bundles", [])
-    if used_artifact_bundles:
-        maybe_renew_artifact_bundles_from_processing(symbolicator.project.id, used_artifact_bundles)
+        if not _handle_response_status(data, response):
+            return data
 
-    processing_errors = response.get("errors", [])
-    if len(processing_errors) > 0:
-        data.setdefault("errors", []).extend(map_symbolicator_process_js_errors(processing_errors))
-    scraping_attempts = response.get("scraping_attempts", [])
-    if len(scraping_attempts) > 0:
-        data["scraping_attempts"] = scraping_attempts
+        used_artifact_bundles = response.get("used_artifact_bundles", [])
+        if used_artifact_bundles:
+            maybe_renew_artifact_bundles_from_processing(
+                symbolicator.project.id, used_artifact_bundles
+            )
+
+        processing_errors = response.get("errors", [])
+        if len(processing_errors) > 0:
+            data.setdefault("errors", []).extend(
+                map_symbolicator_process_js_errors(processing_errors)
+            )
+        scraping_attempts = response.get("scraping_attempts", [])
+        if len(scraping_attempts) > 0:
+            data["scraping_attempts"] = scraping_attempts
+
+        assert len(uncached_indexes) == len(response["stacktraces"]), (stacktraces, response)
+
+        raw_stacktraces = dict(zip(uncached_indexes, response["raw_stacktraces"]))
+        complete_stacktraces = dict(zip(uncached_indexes, response["stacktraces"]))
+
+        if cache_keys is not None:
+            frame_cache.cache_frames(
+                _get_cacheable_frames(
+                    cache_keys, raw_stacktraces, complete_stacktraces, processing_errors
+                )
+            )
 
-    assert len(stacktraces) == len(response["stacktraces"]), (stacktraces, response)
+    for i in range(len(stacktraces)):
+        if i not in complete_stacktraces:
+            assert cache_keys is not None
+            raw_stacktraces[i] = {"frames": [cached_frames[key][0] for key in cache_keys[i]]}
+            complete_stacktraces[i] = {"frames": [cached_frames[key][1] for key in cache_keys[i]]}
 
     has_in_app_frames = False
     all_in_app_frames_symbolicated = True
 
-    for sinfo, raw_stacktrace, complete_stacktrace in zip(
-        stacktrace_infos, response["raw_stacktraces"], response["stacktraces"]
-    ):
+    for i, sinfo in enumerate(stacktrace_infos):
+        raw_stacktrace = raw_stacktraces[i]
+        complete_stacktrace = complete_stacktraces[i]
         processed_frame_idx = 0
         new_frames = []
         new_raw_frames = []
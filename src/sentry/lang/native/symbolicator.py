@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import dataclasses
 import logging
+import os
+import threading
 import time
 import uuid
 from collections.abc import Callable
@@ -295,6 +297,23 @@ class ServiceUnavailable(Exception):
     pass
 
 
+_pooled_sessions = threading.local()
+
+
+def _get_pooled_session() -> Session:
+    """
+    Returns the HTTP session of the current thread, so that connections to
+    Symbolicator are kept alive and reused across events instead of being
+    established for every event. Sessions are not shared between threads, or
+    with forked processes.
+    """
+    pid = os.getpid()
+    if getattr(_pooled_sessions, "pid", None) != pid:
+        _pooled_sessions.pid = pid
+        _pooled_sessions.session = Session()
+    return _pooled_sessions.session
+
+
 class SymbolicatorSession:
     """
     The `SymbolicatorSession` is a glorified HTTP request wrapper that does the following things:
@@ -303,6 +322,11 @@ class SymbolicatorSession:
     - Maintains `timeout` parameters which are passed to Symbolicator.
     - Converts 404 and 503 errors into proper classes so they can be handled upstream.
     - Otherwise, it retries failed requests.
+
+    The underlying connections are pooled per thread, see `_get_pooled_session`.
+    Requests are blocking: every caller symbolicates a single event per task
+    and needs the result before it can continue, so there are no tasks to
+    create and poll concurrently.
     """
 
     def __init__(
@@ -328,12 +352,14 @@ class SymbolicatorSession:
 
     def open(self):
         if self.session is None:
-            self.session = Session()
+            self.session = _get_pooled_session()
+            # Routing is up to the `worker_id`, don't let cookies of a previous
+            # event pin us to an instance.
+            self.session.cookies.clear()
 
     def close(self):
-        if self.session is not None:
-            self.session.close()
-            self.session = None
+        # The connections are left open for the next session to use.
+        self.session = None
 
     def _request(self, method, path, **kwargs):
         if not self.session:
@@ -10,6 +10,7 @@ from django.core.cache import BaseCache, InvalidCacheBackendError, caches
 from django.utils.functional import cached_property
 
 from sentry import options
+from sentry.nodestore.lru import get_lru_cache
 from sentry.utils import json, metrics
 from sentry.utils.services import Service
 
@@ -147,7 +148,7 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
+            bytes_data = self._get_bytes_multi_lru([id])[id]
             rv = self._decode(bytes_data, subkey=subkey)
             if subkey is None:
                 # set cache item only after we know decoding did not fail
@@ -171,6 +172,28 @@ class NodeStorage(local, Service):
         """
         return {id: self._get_bytes(id) for id in id_list}
 
+    def _get_bytes_multi_lru(self, id_list: list[str]) -> dict[str, bytes | None]:
+        """
+        Like `_get_bytes_multi`, but served from the process-wide LRU cache where
+        possible. Only ids missing from it are fetched from the backend.
+        """
+        lru_cache = get_lru_cache()
+        if lru_cache is None:
+            if len(id_list) == 1:
+                return {id_list[0]: self._get_bytes(id_list[0])}
+            return self._get_bytes_multi(id_list)
+
+        rv: dict[str, bytes | None] = dict(lru_cache.get_many(id_list))
+        missing_ids = [id for id in id_list if id not in rv]
+        if missing_ids:
+            if len(missing_ids) == 1:
+                fetched = {missing_ids[0]: self._get_bytes(missing_ids[0])}
+            else:
+                fetched = self._get_bytes_multi(missing_ids)
+            lru_cache.set_many(fetched)
+            rv.update(fetched)
+        return rv
+
     def get_multi(self, id_list: list[str], subkey: str | None = None) -> dict[str, Any | None]:
         """
         >>> nodestore.get_multi(['key1', 'key2')
@@ -196,7 +219,7 @@ class NodeStorage(local, Service):
             with sentry_sdk.start_span(op="nodestore._get_bytes_multi_and_decode") as span:
                 items = {
                     id: self._decode(value, subkey=subkey)
-                    for id, value in self._get_bytes_multi(uncached_ids).items()
+                    for id, value in self._get_bytes_multi_lru(uncached_ids).items()
                 }
             if subkey is None:
                 self._set_cache_items(items)
@@ -229,6 +252,9 @@ class NodeStorage(local, Service):
         >>> nodestore.set_bytes('key1', b"{'foo': 'bar'}")
         """
         metrics.distribution("nodestore.set_bytes", len(data))
+        lru_cache = get_lru_cache()
+        if lru_cache is not None:
+            lru_cache.delete_many([item_id])
         return self._set_bytes(item_id, data, ttl)
 
     def _set_bytes(self, item_id: str, data: bytes, ttl: timedelta | None = None) -> None:
@@ -294,10 +320,16 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, item_id: str) -> None:
+        lru_cache = get_lru_cache()
+        if lru_cache is not None:
+            lru_cache.delete_many([item_id])
         if self.cache:
             self.cache.delete(item_id)
 
     def _delete_cache_items(self, id_list: list[str]) -> None:
+        lru_cache = get_lru_cache()
+        if lru_cache is not None:
+            lru_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many([item_id for item_id in id_list])
 
@@ -7,6 +7,7 @@ from typing import Any
 import sentry_sdk
 
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.zstd_dictionaries import load_dictionaries
 from sentry.utils.kvstore.bigtable import BigtableKVStorage
 
 
@@ -21,7 +22,12 @@ class BigtableNodeStorage(NodeStorage):
     :param default_ttl: How many days keys should be stored (and considered
         valid for reading + returning)
     :param compression: A boolean whether to enable zlib-compression, or the
-        string "zstd" to use zstd.
+        string "zstd" to use zstd, or "zstd-dict" to use zstd with the trained
+        dictionaries found in ``compression_dictionaries_path``.
+    :param compression_dictionaries_path: Directory of dictionaries written by
+        ``sentry nodestore train-dictionary``.
+    :param compression_dictionary_version: Dictionary version to compress new
+        payloads with, defaults to the latest one.
 
     >>> from datetime import timedelta
     >>> BigtableNodeStorage(
@@ -43,6 +49,8 @@ class BigtableNodeStorage(NodeStorage):
         automatic_expiry: bool = False,
         default_ttl: timedelta | None = None,
         compression: bool | str = False,
+        compression_dictionaries_path: str | None = None,
+        compression_dictionary_version: int | None = None,
         **client_options: object,
     ):
         if compression is True:
@@ -52,6 +60,10 @@ class BigtableNodeStorage(NodeStorage):
         else:
             _compression = compression
 
+        compression_dictionaries = None
+        if compression_dictionaries_path is not None:
+            compression_dictionaries = load_dictionaries(compression_dictionaries_path)
+
         self.store = self.store_class(
             project=project,
             instance=instance,
@@ -59,6 +71,8 @@ class BigtableNodeStorage(NodeStorage):
             default_ttl=default_ttl,
             compression=_compression,
             client_options=client_options,
+            compression_dictionaries=compression_dictionaries,
+            compression_dictionary_version=compression_dictionary_version,
         )
         self.automatic_expiry = automatic_expiry
         self.skip_deletes = automatic_expiry and "_SENTRY_CLEANUP" in os.environ
@@ -10,6 +10,7 @@ from django.utils import timezone
 
 from sentry.db.models.query import create_or_update
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.lru import get_lru_cache
 from sentry.utils.strings import compress, decompress
 
 from .models import Node
@@ -62,6 +63,9 @@ class DjangoNodeStorage(NodeStorage):
         days = math.floor(total_seconds / 86400)
 
         BulkDeleteQuery(model=Node, dtfield="timestamp", days=days).execute()
+        lru_cache = get_lru_cache()
+        if lru_cache is not None:
+            lru_cache.clear()
         if self.cache:
             self.cache.clear()
 
@@ -32,6 +32,7 @@ class FileSystemNodeStorage(NodeStorage):
 
     def delete(self, id: str) -> None:
         os.remove(self.node_path(id))
+        self._delete_cache_item(id)
 
     def cleanup(self, cutoff: datetime) -> None:
         for filename in os.listdir(self.path):
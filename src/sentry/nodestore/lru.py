@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from sentry import options
+from sentry.utils import metrics
+
+
+class _Entry(NamedTuple):
+    data: bytes
+    expires_at: float
+
+
+class NodeLRUCache:
+    """
+    Process-wide, byte-size-bounded LRU cache of raw (decompressed) nodestore
+    payloads.
+
+    Entries hold the complete encoded node, i.e. the default payload and all of
+    its subkeys, so a single entry serves reads for any subkey of that node.
+    Values are cached as bytes rather than decoded objects so that callers
+    mutating the returned event data can't poison the cache.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._entries
+
+    def get(self, item_id: str) -> bytes | None:
+        return self.get_many([item_id]).get(item_id)
+
+    def get_many(self, id_list: Iterable[str]) -> dict[str, bytes]:
+        now = time.monotonic()
+        rv: dict[str, bytes] = {}
+        misses = 0
+        expired = 0
+        with self._lock:
+            for item_id in id_list:
+                entry = self._entries.get(item_id)
+                if entry is None:
+                    misses += 1
+                    continue
+                if entry.expires_at <= now:
+                    self._remove_locked(item_id)
+                    misses += 1
+                    expired += 1
+                    continue
+                self._entries.move_to_end(item_id)
+                rv[item_id] = entry.data
+
+        if rv:
+            metrics.incr("nodestore.lru.get", amount=len(rv), tags={"result": "hit"})
+        if misses:
+            metrics.incr("nodestore.lru.get", amount=misses, tags={"result": "miss"})
+        if expired:
+            metrics.incr("nodestore.lru.evict", amount=expired, tags={"reason": "expired"})
+        return rv
+
+    def set(self, item_id: str, data: bytes) -> None:
+        self.set_many({item_id: data})
+
+    def set_many(self, items: dict[str, bytes | None]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        evicted = 0
+        with self._lock:
+            for item_id, data in items.items():
+                if item_id in self._entries:
+                    self._remove_locked(item_id)
+                # Don't cache misses, and don't let a single huge node flush
+                # the whole cache.
+                if not data or len(data) > self.max_bytes:
+                    continue
+                self._entries[item_id] = _Entry(data, expires_at)
+                self.current_bytes += len(data)
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_id = next(iter(self._entries))
+                self._remove_locked(oldest_id)
+                evicted += 1
+
+        if evicted:
+            metrics.incr("nodestore.lru.evict", amount=evicted, tags={"reason": "size"})
+        metrics.gauge("nodestore.lru.bytes", self.current_bytes)
+
+    def delete_many(self, id_list: Iterable[str]) -> None:
+        with self._lock:
+            for item_id in id_list:
+                self._remove_locked(item_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove_locked(self, item_id: str) -> None:
+        entry = self._entries.pop(item_id, None)
+        if entry is not None:
+            self.current_bytes -= len(entry.data)
+
+
+_lru_cache: NodeLRUCache | None = None
+_lru_cache_lock = threading.Lock()
+
+
+def get_lru_cache() -> NodeLRUCache | None:
+    """
+    Returns the shared process-wide cache, or None if it is disabled through the
+    `nodestore.lru-cache.max-bytes` option. Size and TTL changes to the options
+    are applied to the live cache.
+    """
+    global _lru_cache
+
+    max_bytes = options.get("nodestore.lru-cache.max-bytes")
+    if max_bytes <= 0:
+        if _lru_cache is not None:
+            _lru_cache.clear()
+        return None
+
+    ttl = options.get("nodestore.lru-cache.ttl-seconds")
+    with _lru_cache_lock:
+        if _lru_cache is None:
+            _lru_cache = NodeLRUCache(max_bytes=max_bytes, ttl=ttl)
+        else:
+            _lru_cache.max_bytes = max_bytes
+            _lru_cache.ttl = ttl
+    return _lru_cache
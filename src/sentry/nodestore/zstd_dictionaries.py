@@ -0,0 +1,53 @@
+"""
+Storage of trained zstd dictionaries for nodestore payloads.
+
+Dictionaries are stored as individual files named ``nodestore-<version>.zdict``
+in a directory shared by all processes that read or write nodestore. Versions
+are increasing integers and are recorded in the header of every value
+compressed with a dictionary (see ``sentry.utils.codecs.ZstdDictCodec``), so a
+dictionary must stay available for as long as data compressed with it exists.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable
+
+import zstandard
+
+FILENAME_RE = re.compile(r"^nodestore-(\d+)\.zdict$")
+
+# The zstd CLI's default, a good fit for payloads in the 1-100KB range.
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+
+
+def load_dictionaries(path: str) -> dict[int, bytes]:
+    dictionaries = {}
+    for filename in os.listdir(path):
+        match = FILENAME_RE.match(filename)
+        if match is None:
+            continue
+        with open(os.path.join(path, filename), "rb") as f:
+            dictionaries[int(match.group(1))] = f.read()
+    return dictionaries
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = DEFAULT_DICTIONARY_SIZE) -> bytes:
+    return zstandard.train_dictionary(size, list(samples)).as_bytes()
+
+
+def write_dictionary(path: str, data: bytes) -> int:
+    """
+    Stores ``data`` as the next dictionary version in ``path`` and returns its
+    version.
+    """
+    os.makedirs(path, exist_ok=True)
+    version = max(load_dictionaries(path), default=0) + 1
+    # Write to a temporary file first, readers may pick up the directory at
+    # any time.
+    filename = os.path.join(path, f"nodestore-{version}.zdict")
+    with open(f"{filename}.tmp", "wb") as f:
+        f.write(data)
+    os.rename(f"{filename}.tmp", filename)
+    return version
@@ -745,8 +745,51 @@ register("snuba.search.chunk-growth-rate", default=1.5, flags=FLAG_AUTOMATOR_MOD
 register("snuba.search.max-chunk-size", default=2000, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.hits-sample-size", default=100, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds to cache issue search hit counts for. Cached counts are kept up to date
+# with the groups first seen since they were counted. 0 disables the cache.
+register("snuba.search.hits-cache-ttl", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds to keep the state of an issue search for its next page, so that the
+# page can be served from, or resumed after, the groups already fetched from
+# Snuba. 0 disables it.
+register("snuba.search.cursor-cache-ttl", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.track-outcomes-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Snuba query result cache. Queries with these referrers are cached even if the
+# caller doesn't pass `use_cache`.
+register(
+    "snuba.query-cache.referrers",
+    type=Sequence,
+    default=[],
+    flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Timestamps in cached queries are rounded down to this many seconds when
+# fingerprinting, so queries over a sliding time range share results. 0 disables
+# rounding.
+register("snuba.query-cache.time-granularity", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Results larger than this many bytes are not cached.
+register("snuba.query-cache.max-result-size", default=1_000_000, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds to wait for the result of an identical query that's already being run
+# by another process, instead of running it again. 0 disables waiting.
+register("snuba.query-cache.single-flight-wait", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Identical queries running concurrently in a process share one response.
+register(
+    "snuba.query-coalescing.enabled", type=Bool, default=False, flags=FLAG_AUTOMATOR_MODIFIABLE
+)
+# Limits the number of Snuba queries running concurrently per process, in total
+# and per referrer. 0 disables the limit.
+register("snuba.query-scheduler.max-concurrent", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register(
+    "snuba.query-scheduler.max-concurrent-per-referrer", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE
+)
+# Latency sensitive referrer prefixes, which go first when queries have to wait
+# for the scheduler.
+register(
+    "snuba.query-scheduler.priority-referrers",
+    type=Sequence,
+    default=["api."],
+    flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register(
     "snuba.tagstore.cache-tagkeys-rate",
@@ -775,6 +818,12 @@ register(
     default=0.0,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Cache frames symbolicated by symbolicator, and only send stacktraces with uncached frames
+register(
+    "symbolicator.sourcemaps-frame-cache-enabled",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 # Transaction events
 # True => kill switch to disable ingestion of transaction events for internal project.
@@ -1969,6 +2018,9 @@ register("flagpole.debounce_reporting_seconds", default=0, flags=FLAG_AUTOMATOR_
 # Feature flagging error capture rate.
 # When feature flagging has faults, it can become very high volume and we can overwhelm sentry.
 register("features.error.capture_rate", default=0.1, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Memoize feature checks for the duration of an API request, and report the hit
+# rate and time spent checking features in the `X-Sentry-Feature-Checks` header.
+register("features.request-cache.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
 # Retry controls
 register("hybridcloud.regionsiloclient.retries", default=5, flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1996,6 +2048,9 @@ register("txnames.bump-lifetime-sample-rate", default=0.1, flags=FLAG_AUTOMATOR_
 register(
     "nodestore.set-subkeys.enable-set-cache-item", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE
 )
+# Size in bytes of the process-wide LRU cache of nodestore payloads. 0 disables it.
+register("nodestore.lru-cache.max-bytes", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("nodestore.lru-cache.ttl-seconds", default=60.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
 # === Backpressure related runtime options ===
 
@@ -2556,6 +2611,19 @@ register(
     flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Rate at which enhancements lookups are recorded in Redis to find the most used configs
+register(
+    "grouping.enhancements.hot-configs-sample-rate",
+    default=0.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Number of most used enhancements configs that ingest worker processes parse on startup
+register(
+    "grouping.enhancements.warm-cache-size",
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Rates controlling the rollout of grouping parameterization experiments
 register(
     "grouping.experiments.parameterization.uniq_id",
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import inf
 from time import time
 from typing import TYPE_CHECKING, Any
 
@@ -9,7 +14,7 @@ from redis.exceptions import RedisError
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
-from sentry.utils import redis
+from sentry.utils import metrics, redis
 from sentry.utils.hashlib import md5_text
 
 if TYPE_CHECKING:
@@ -17,6 +22,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+lease_values = redis.load_redis_script("ratelimits/lease.lua")
+
 
 def _time_bucket(request_time: float, window: int) -> int:
     """Bucket number lookup for given UTC time since epoch"""
@@ -28,11 +35,68 @@ def _bucket_start_time(bucket_number: int, window: int) -> int:
     return bucket_number * window
 
 
+@dataclass
+class _Lease:
+    """A range of counter values of a rate limit key reserved by this process."""
+
+    limit: int
+    next_value: int
+    # The last value of the range, inclusive
+    end: int
+    reset_time: int
+
+    @property
+    def unused(self) -> int:
+        return self.end - self.next_value + 1
+
+
 class RedisRateLimiter(RateLimiter):
-    def __init__(self, **options: Any) -> None:
+    """
+    Fixed window rate limiter counting requests in Redis.
+
+    With a `lease_ratio` set, the limiter leases a range of counter values for a
+    key from Redis and hands them out locally, so that only one in every lease
+    size requests talks to Redis. This trades accuracy for round trips in two
+    ways:
+
+    * Values leased but not used yet by one process count against the limit
+      for every other process, so requests can be limited while the window
+      still has up to that many values left. Leases are sized from the
+      headroom left in the window to keep this small: the `lease_holders`
+      processes expected to hold a lease of a key never lease more than half
+      of it together, and no lease is larger than `max_lease_size`, so leases
+      shrink to single values well before the limit.
+    * Unused values are returned to Redis when a lease is evicted or replaced
+      or the process exits. Returned values at or below the limit can be
+      handed out again, so if other processes had leased values past them,
+      the limit is exceeded by at most the number of values returned. This is
+      reported by the `ratelimits.lease.over_admission` metric.
+
+    Leases of past windows are dropped without being returned.
+    """
+
+    def __init__(
+        self,
+        lease_ratio: float = 0.0,
+        max_lease_size: int = 100,
+        max_leases: int = 10_000,
+        lease_holders: int = 10,
+        **options: Any,
+    ) -> None:
         cluster_key = settings.SENTRY_RATE_LIMIT_REDIS_CLUSTER
         self.client = redis.redis_clusters.get(cluster_key)
 
+        self.lease_ratio = lease_ratio
+        self.max_lease_size = max_lease_size
+        self.max_leases = max_leases
+        self.lease_holders = lease_holders
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        # The earliest reset time of any lease, i.e. when leases need to be dropped
+        self._leases_reset_time: float = inf
+        self._leases_lock = threading.Lock()
+        if lease_ratio > 0:
+            atexit.register(self.release_leases)
+
     def _construct_redis_key(
         self,
         key: str,
@@ -73,7 +137,8 @@ class RedisRateLimiter(RateLimiter):
         self, key: str, project: Project | None = None, window: int | None = None
     ) -> int:
         """
-        Get the current value stored in redis for the rate limit with key "key" and said window
+        Get the current value stored in redis for the rate limit with key "key" and said window,
+        not counting the values leased but not used yet by this process
         """
         redis_key = self._construct_redis_key(key, project=project, window=window)
 
@@ -88,7 +153,11 @@ class RedisRateLimiter(RateLimiter):
         if current_count is None:
             # Key hasn't been created yet, therefore no hits done so far
             return 0
-        return int(current_count)
+
+        with self._leases_lock:
+            lease = self._leases.get(redis_key)
+            unused = lease.unused if lease is not None else 0
+        return max(0, int(current_count) - unused)
 
     def is_limited_with_value(
         self, key: str, limit: int, project: Project | None = None, window: int | None = None
@@ -107,6 +176,13 @@ class RedisRateLimiter(RateLimiter):
         expiration = window - int(request_time % window)
         # Reset Time = next time bucket's start time
         reset_time = _bucket_start_time(_time_bucket(request_time, window) + 1, window)
+
+        max_lease_size = self._get_max_lease_size(limit)
+        if max_lease_size > 1:
+            return self._is_limited_with_lease(
+                redis_key, limit, max_lease_size, expiration, reset_time
+            )
+
         try:
             pipe = self.client.pipeline()
             pipe.incr(redis_key)
@@ -121,6 +197,105 @@ class RedisRateLimiter(RateLimiter):
 
         return result > limit, result, reset_time
 
+    def _get_max_lease_size(self, limit: int) -> int:
+        if self.lease_ratio <= 0:
+            return 1
+        return max(1, min(self.max_lease_size, int(limit * self.lease_ratio)))
+
+    def _is_limited_with_lease(
+        self, redis_key: str, limit: int, max_lease_size: int, expiration: int, reset_time: int
+    ) -> tuple[bool, int, int]:
+        with self._leases_lock:
+            lease = self._leases.get(redis_key)
+            if lease is not None and lease.unused > 0:
+                value = lease.next_value
+                lease.next_value += 1
+                return value > limit, value, reset_time
+
+        try:
+            end, lease_size = lease_values(
+                [redis_key],
+                [max_lease_size, limit, self.lease_holders, expiration],
+                client=self.client,
+            )
+        except RedisError:
+            logger.exception("Failed to retrieve current rate limit value from redis")
+            return False, 0, reset_time
+
+        metrics.distribution("ratelimits.lease.size", lease_size)
+
+        value = end - lease_size + 1
+        evicted = []
+        with self._leases_lock:
+            self._drop_expired_leases()
+            # Another thread may have leased values for the key concurrently,
+            # return its unused values rather than losing them.
+            replaced = self._leases.get(redis_key)
+            if replaced is not None and replaced.unused > 0:
+                evicted.append((redis_key, replaced))
+            self._leases[redis_key] = _Lease(
+                limit=limit, next_value=value + 1, end=end, reset_time=reset_time
+            )
+            self._leases.move_to_end(redis_key)
+            self._leases_reset_time = min(self._leases_reset_time, reset_time)
+            while len(self._leases) > self.max_leases:
+                evicted.append(self._leases.popitem(last=False))
+
+        for evicted_key, evicted_lease in evicted:
+            self._release_lease(evicted_key, evicted_lease)
+
+        return value > limit, value, reset_time
+
+    def _drop_expired_leases(self) -> None:
+        """
+        Drops the leases of past windows, their key has expired and their
+        unused values can't be handed out anymore. Must be called with the
+        leases lock held.
+        """
+        now = time()
+        if now < self._leases_reset_time:
+            return
+
+        for redis_key in [
+            redis_key for redis_key, lease in self._leases.items() if lease.reset_time <= now
+        ]:
+            del self._leases[redis_key]
+        self._leases_reset_time = min(
+            (lease.reset_time for lease in self._leases.values()), default=inf
+        )
+
+    def _release_lease(self, redis_key: str, lease: _Lease) -> None:
+        # Leases of past windows don't need to be returned, their key is gone or about to be.
+        if lease.unused <= 0 or lease.reset_time <= time():
+            return
+
+        try:
+            current_value = self.client.decrby(redis_key, lease.unused)
+        except RedisError:
+            logger.exception("Failed to return rate limit lease to redis")
+            return
+
+        metrics.incr("ratelimits.lease.returned", amount=lease.unused)
+        # Returned values at or below the limit can be handed out again. If
+        # other processes had already leased values past this lease, some of
+        # them get admitted twice.
+        over_admission = min(lease.unused, lease.limit - current_value)
+        if over_admission > 0:
+            metrics.incr("ratelimits.lease.over_admission", amount=over_admission)
+
+    def release_leases(self) -> None:
+        """
+        Returns all unused leased values to Redis.
+        """
+        with self._leases_lock:
+            leases = list(self._leases.items())
+            self._leases.clear()
+
+        for redis_key, lease in leases:
+            self._release_lease(redis_key, lease)
+
     def reset(self, key: str, project: Project | None = None, window: int | None = None) -> None:
         redis_key = self._construct_redis_key(key, project=project, window=window)
+        with self._leases_lock:
+            self._leases.pop(redis_key, None)
         self.client.delete(redis_key)
@@ -2,9 +2,10 @@ import logging
 import math
 import uuid
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Callable
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from itertools import islice
 from typing import ClassVar
 
 from celery import Task
@@ -47,6 +48,13 @@ class DelayedProcessingBase(ABC):
     def processing_task(self) -> Task:
         raise NotImplementedError
 
+    def get_shard_key(self, field: str) -> str:
+        """
+        Buffered items with the same shard key are always processed in the same batch. Defaults
+        to the group id, which is the second part of the hash fields of all processing types.
+        """
+        return field.split(":")[1]
+
 
 delayed_processing_registry = Registry[type[DelayedProcessingBase]]()
 
@@ -71,11 +79,36 @@ def bucket_num_groups(num_groups: int) -> str:
     return "1"
 
 
+def shard_items(
+    items: dict[str, str], batch_size: int, get_shard_key: Callable[[str], str]
+) -> list[dict[str, str]]:
+    """
+    Splits the buffered items into batches of at most `batch_size` items, keeping items which share
+    a shard key together. A single shard larger than `batch_size` becomes its own batch.
+    """
+    shards: defaultdict[str, dict[str, str]] = defaultdict(dict)
+    for field, value in items.items():
+        shards[get_shard_key(field)][field] = value
+
+    batches = []
+    batch: dict[str, str] = {}
+    for shard in shards.values():
+        if batch and len(batch) + len(shard) > batch_size:
+            batches.append(batch)
+            batch = {}
+        batch.update(shard)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 def process_in_batches(project_id: int, processing_type: str) -> None:
     """
     This will check the number of alertgroup_to_event_data items in the Redis buffer for a project.
 
     If the number is larger than the batch size, it will chunk the items and process them in batches.
+    Items of the same group are kept in the same batch, so that batches query disjoint sets of groups
+    and can be processed in parallel by different workers.
 
     The batches are replicated into a new redis hash with a unique filter (a uuid) to identify the batch.
     We need to use a UUID because these batches can be created in multiple processes and we need to ensure
@@ -118,9 +151,10 @@ def process_in_batches(project_id: int, processing_type: str) -> None:
     alertgroup_to_event_data = fetch_group_to_event_data(project_id, hash_args.model)
 
     with metrics.timer(f"{processing_type}.process_batch.duration"):
-        items = iter(alertgroup_to_event_data.items())
+        batches = shard_items(alertgroup_to_event_data, batch_size, processing_info.get_shard_key)
+        metrics.distribution(f"{processing_type}.num_batches", len(batches))
 
-        while batch := dict(islice(items, batch_size)):
+        for batch in batches:
             batch_key = str(uuid.uuid4())
 
             buffer.backend.push_to_hash_bulk(
@@ -333,6 +333,9 @@ def get_condition_group_results(
     condition_group_results = {}
     current_time = datetime.now(tz=timezone.utc)
     project_id = project.id
+    rules_by_id = Rule.objects.in_bulk(
+        {rule_id for _, _, rule_id in condition_groups.values() if rule_id}
+    )
 
     for unique_condition, (condition_data, group_ids, rule_id) in condition_groups.items():
         cls_id = unique_condition.cls_id
@@ -345,10 +348,7 @@ def get_condition_group_results(
             )
             continue
 
-        if rule_id:
-            rule = Rule.objects.get(id=rule_id)
-        else:
-            rule = None
+        rule = rules_by_id.get(rule_id) if rule_id else None
 
         condition_inst = condition_cls(
             project=project, data=condition_data, rule=rule  # type: ignore[arg-type]
@@ -379,41 +379,43 @@ def get_condition_group_results(
     return condition_group_results
 
 
-def passes_comparison(
+class ConditionResult(NamedTuple):
+    # Groups for which every query of the condition returned a value
+    evaluated_group_ids: set[int]
+    passing_group_ids: set[int]
+
+
+def evaluate_condition(
     condition_group_results: dict[UniqueConditionQuery, dict[int, int | float]],
     condition_data: EventFrequencyConditionData,
-    group_id: int,
     environment_id: int,
-    project_id: int,
-) -> bool:
+) -> ConditionResult:
     """
-    Checks if a specific condition instance has passed. Handles both the count
-    and percent comparison type conditions.
+    Evaluates a condition instance for all groups that have query results at
+    once. Handles both the count and percent comparison type conditions.
     """
     unique_queries = generate_unique_queries(condition_data, environment_id)
-    try:
-        query_values = [
-            condition_group_results[unique_query][group_id] for unique_query in unique_queries
-        ]
-    except KeyError:
-        metrics.incr("delayed_processing.missing_query_result")
-        logger.info(
-            "delayed_processing.missing_query_result",
-            extra={
-                "condition_data": condition_data,
-                "project_id": project_id,
-                "group_id": group_id,
-            },
-        )
-        return False
+    query_results = [condition_group_results.get(query, {}) for query in unique_queries]
 
-    calculated_value = query_values[0]
-    if condition_data.get("comparisonType") == ComparisonType.PERCENT:
-        calculated_value = percent_increase(calculated_value, query_values[1])
+    evaluated_group_ids = set(query_results[0])
+    for results in query_results[1:]:
+        evaluated_group_ids.intersection_update(results)
 
     target_value = float(condition_data["value"])
+    values = query_results[0]
+    if condition_data.get("comparisonType") == ComparisonType.PERCENT:
+        comparison_values = query_results[1]
+        passing_group_ids = {
+            group_id
+            for group_id in evaluated_group_ids
+            if percent_increase(values[group_id], comparison_values[group_id]) > target_value
+        }
+    else:
+        passing_group_ids = {
+            group_id for group_id in evaluated_group_ids if values[group_id] > target_value
+        }
 
-    return calculated_value > target_value
+    return ConditionResult(evaluated_group_ids, passing_group_ids)
 
 
 def get_rules_to_fire(
@@ -423,25 +425,56 @@ def get_rules_to_fire(
     project_id: int,
 ) -> DefaultDict[Rule, set[int]]:
     rules_to_fire = defaultdict(set)
+    # Rules commonly share conditions, each distinct condition is only evaluated once for all
+    # groups and then narrowed down to the groups of each rule.
+    condition_results: dict[tuple[Any, ...], ConditionResult] = {}
+
     for alert_rule, slow_conditions in rules_to_slow_conditions.items():
         action_match = alert_rule.data.get("action_match", "any")
-        for group_id in rules_to_groups[alert_rule.id]:
-            conditions_matched = 0
-            for slow_condition in slow_conditions:
-                if passes_comparison(
-                    condition_group_results,
-                    slow_condition,
-                    group_id,
-                    alert_rule.environment_id,
-                    project_id,
-                ):
-                    if action_match == "any":
-                        rules_to_fire[alert_rule].add(group_id)
-                        break
-                    elif action_match == "all":
-                        conditions_matched += 1
-            if action_match == "all" and conditions_matched == len(slow_conditions):
-                rules_to_fire[alert_rule].add(group_id)
+        group_ids = rules_to_groups[alert_rule.id]
+        if action_match == "any":
+            matched_group_ids: set[int] = set()
+        elif action_match == "all":
+            matched_group_ids = set(group_ids)
+        else:
+            continue
+
+        for slow_condition in slow_conditions:
+            condition_key = (
+                alert_rule.environment_id,
+                slow_condition["id"],
+                slow_condition["interval"],
+                slow_condition.get("comparisonType"),
+                slow_condition.get("comparisonInterval"),
+                slow_condition["value"],
+            )
+            condition_result = condition_results.get(condition_key)
+            if condition_result is None:
+                condition_result = condition_results[condition_key] = evaluate_condition(
+                    condition_group_results, slow_condition, alert_rule.environment_id
+                )
+
+            missing_group_ids = group_ids - condition_result.evaluated_group_ids
+            if missing_group_ids:
+                metrics.incr(
+                    "delayed_processing.missing_query_result", amount=len(missing_group_ids)
+                )
+                logger.info(
+                    "delayed_processing.missing_query_result",
+                    extra={
+                        "condition_data": slow_condition,
+                        "project_id": project_id,
+                        "group_ids": missing_group_ids,
+                    },
+                )
+
+            if action_match == "any":
+                matched_group_ids |= condition_result.passing_group_ids & group_ids
+            else:
+                matched_group_ids &= condition_result.passing_group_ids
+
+        if matched_group_ids:
+            rules_to_fire[alert_rule] = matched_group_ids
     return rules_to_fire
 
 
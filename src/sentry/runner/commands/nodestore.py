@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def nodestore() -> None:
+    """Tools for interacting with nodestore."""
+
+
+@nodestore.command("train-dictionary")
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option(
+    "--project",
+    "project_ids",
+    type=int,
+    multiple=True,
+    required=True,
+    help="Project to sample events from, can be passed multiple times.",
+)
+@click.option("--samples", default=10_000, show_default=True, help="Number of events to sample.")
+@click.option("--days", default=1, show_default=True, help="How far back to sample events from.")
+@click.option(
+    "--size",
+    default=None,
+    type=int,
+    help="Dictionary size in bytes (defaults to the zstd CLI default).",
+)
+@configuration
+def train_dictionary(
+    output_dir: str, project_ids: tuple[int, ...], samples: int, days: int, size: int | None
+) -> None:
+    """
+    Train a zstd dictionary for nodestore event payloads.
+
+    Samples recently stored events of the given projects and writes the
+    trained dictionary as the next version to OUTPUT_DIR, which can then be
+    configured as the `compression_dictionaries_path` of the Bigtable
+    nodestore backend.
+    """
+    from sentry import eventstore, nodestore
+    from sentry.eventstore.base import Filter
+    from sentry.eventstore.models import Event
+    from sentry.models.project import Project
+    from sentry.nodestore import zstd_dictionaries
+
+    organization_id = Project.objects.get(id=project_ids[0]).organization_id
+    end = datetime.now(timezone.utc)
+    events = eventstore.backend.get_events(
+        filter=Filter(project_ids=list(project_ids), start=end - timedelta(days=days), end=end),
+        limit=samples,
+        referrer="nodestore.train_dictionary",
+        tenant_ids={"organization_id": organization_id},
+    )
+    node_ids = [Event.generate_node_id(event.project_id, event.event_id) for event in events]
+
+    payloads = []
+    for node_id in node_ids:
+        payload = nodestore.backend.get_bytes(node_id)
+        if payload:
+            payloads.append(payload)
+
+    if not payloads:
+        raise click.ClickException("No event payloads found to train on.")
+
+    click.echo(f"Training dictionary on {len(payloads)} payloads...")
+    data = zstd_dictionaries.train_dictionary(
+        payloads, size=size or zstd_dictionaries.DEFAULT_DICTIONARY_SIZE
+    )
+    version = zstd_dictionaries.write_dictionary(output_dir, data)
+    click.echo(f"Wrote dictionary version {version} ({len(data)} bytes) to {output_dir}")
@@ -0,0 +1,34 @@
+-- Leases a range of values of a fixed window rate limit counter, sized from the
+-- headroom left in the window.
+--
+-- Input:
+-- keys:
+--   * redis_key (the counter of the rate limit window)
+-- args:
+--   * max_lease_size (upper bound on the number of values leased)
+--   * limit (the limit of the rate limit)
+--   * holders (expected number of processes holding a lease of the counter)
+--   * expiration (time to live of the counter in seconds)
+--
+-- Output:
+--   * end (the last value of the lease, inclusive)
+--   * lease_size (the number of values leased)
+--
+-- All holders together never lease more than half of the remaining headroom,
+-- so leases shrink as the counter approaches the limit, down to single values
+-- once the headroom is less than four values per holder.
+
+local key = KEYS[1]
+local max_lease_size = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local holders = tonumber(ARGV[3])
+local expiration = tonumber(ARGV[4])
+
+local current = tonumber(redis.call("get", key) or 0)
+local headroom = limit - current
+local lease_size = math.max(1, math.min(max_lease_size, math.floor(headroom / (2 * holders))))
+
+local lease_end = redis.call("incrby", key, lease_size)
+redis.call("expire", key, expiration)
+
+return { lease_end, lease_size }
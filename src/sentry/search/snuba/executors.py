@@ -7,13 +7,14 @@ import time
 from abc import ABCMeta, abstractmethod
 from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from enum import Enum, auto
 from hashlib import md5
 from math import floor
 from typing import Any, TypedDict, cast
 
 import sentry_sdk
+from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
 from snuba_sdk import (
@@ -876,35 +877,62 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             )
             return results
 
-        # Here we check if all the django filters reduce the set of groups down
-        # to something that we can send down to Snuba in a `group_id IN (...)`
-        # clause.
-        max_candidates = options.get("snuba.search.max-pre-snuba-candidates")
-
-        with sentry_sdk.start_span(op="snuba_group_query") as span:
-            group_ids = list(
-                group_queryset.using_replica().values_list("id", flat=True)[: max_candidates + 1]
+        # If the previous page left its state behind for this cursor, we resume
+        # its search instead of starting over.
+        cursor_cache_ttl = options.get("snuba.search.cursor-cache-ttl")
+        search_state = None
+        if cursor_cache_ttl > 0 and cursor is not None and not cursor.is_prev:
+            search_state = self._get_search_state(
+                self._get_search_cache_key(
+                    "search:cursor",
+                    projects,
+                    environments,
+                    search_filters,
+                    start,
+                    end,
+                    actor,
+                    cursor_cache_ttl,
+                    sort_by,
+                    aggregate_kwargs,
+                    str(cursor),
+                )
             )
-            span.set_data("Max Candidates", max_candidates)
-            span.set_data("Result Size", len(group_ids))
-        metrics.distribution("snuba.search.num_candidates", len(group_ids))
-        too_many_candidates = False
-        if not group_ids:
-            # no matches could possibly be found from this point on
-            metrics.incr("snuba.search.no_candidates", skip_internal=False)
-            return self.empty_result
-        elif len(group_ids) > max_candidates:
-            # If the pre-filter query didn't include anything to significantly
-            # filter down the number of results (from 'first_release', 'status',
-            # 'bookmarked_by', 'assigned_to', 'unassigned', or 'subscribed_by')
-            # then it might have surpassed the `max_candidates`. In this case,
-            # we *don't* want to pass candidates down to Snuba, and instead we
-            # want Snuba to do all the filtering/sorting it can and *then* apply
-            # this queryset to the results from Snuba, which we call
-            # post-filtering.
-            metrics.incr("snuba.search.too_many_candidates", skip_internal=False)
-            too_many_candidates = True
-            group_ids = []
+
+        if search_state is not None:
+            group_ids = search_state["group_ids"]
+            too_many_candidates = search_state["too_many_candidates"]
+        else:
+            # Here we check if all the django filters reduce the set of groups down
+            # to something that we can send down to Snuba in a `group_id IN (...)`
+            # clause.
+            max_candidates = options.get("snuba.search.max-pre-snuba-candidates")
+
+            with sentry_sdk.start_span(op="snuba_group_query") as span:
+                group_ids = list(
+                    group_queryset.using_replica().values_list("id", flat=True)[
+                        : max_candidates + 1
+                    ]
+                )
+                span.set_data("Max Candidates", max_candidates)
+                span.set_data("Result Size", len(group_ids))
+            metrics.distribution("snuba.search.num_candidates", len(group_ids))
+            too_many_candidates = False
+            if not group_ids:
+                # no matches could possibly be found from this point on
+                metrics.incr("snuba.search.no_candidates", skip_internal=False)
+                return self.empty_result
+            elif len(group_ids) > max_candidates:
+                # If the pre-filter query didn't include anything to significantly
+                # filter down the number of results (from 'first_release', 'status',
+                # 'bookmarked_by', 'assigned_to', 'unassigned', or 'subscribed_by')
+                # then it might have surpassed the `max_candidates`. In this case,
+                # we *don't* want to pass candidates down to Snuba, and instead we
+                # want Snuba to do all the filtering/sorting it can and *then* apply
+                # this queryset to the results from Snuba, which we call
+                # post-filtering.
+                metrics.incr("snuba.search.too_many_candidates", skip_internal=False)
+                too_many_candidates = True
+                group_ids = []
 
         sort_field = self.sort_strategies[sort_by]
         chunk_growth = options.get("snuba.search.chunk-growth-rate")
@@ -936,10 +964,30 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         paginator_results = self.empty_result
         result_groups = []
         result_group_ids = set()
+        # scores of all groups fetched from Snuba, before post-filtering
+        snuba_scores = []
 
         max_time = options.get("snuba.search.max-total-chunk-time-seconds")
         time_start = time.time()
         more_results = False
+        needs_more_results = True
+
+        if search_state is not None:
+            # The groups that the previous page already fetched (and post-filtered)
+            # past its last result come first. Snuba only has to be queried if they
+            # don't fill this page, starting after the rows we already have.
+            result_groups = search_state["result_groups"]
+            result_group_ids = {group_id for group_id, _ in result_groups}
+            snuba_scores = search_state["snuba_scores"]
+            offset = len(snuba_scores)
+            chunk_limit = search_state["chunk_limit"]
+            more_results = search_state["more_results"]
+            paginator_results = SequencePaginator(
+                [(score, id) for (id, score) in result_groups], reverse=True, **paginator_options
+            ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
+            needs_more_results = (
+                not group_ids and len(paginator_results.results) < limit and more_results
+            )
 
         # Do smaller searches in chunks until we have enough results
         # to answer the query (or hit the end of possible results). We do
@@ -947,7 +995,7 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         # sorted by `last_seen`, and we want to avoid returning all of
         # a project's groups and then post-sorting them all in Postgres
         # when typically the first N results will do.
-        while (time.time() - time_start) < max_time:
+        while needs_more_results and (time.time() - time_start) < max_time:
             num_chunks += 1
 
             # grow the chunk size on each iteration to account for huge projects
@@ -977,6 +1025,7 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             count = len(snuba_groups)
             more_results = count >= limit and (offset + limit) < total
             offset += len(snuba_groups)
+            snuba_scores.extend(score for _, score in snuba_groups)
 
             if not snuba_groups:
                 break
@@ -1042,6 +1091,44 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # more results.
             paginator_results.prev.has_results = True
 
+        if (
+            cursor_cache_ttl > 0
+            and (cursor is None or not cursor.is_prev)
+            and paginator_results.next.has_results
+        ):
+            next_cursor = paginator_results.next
+            # Everything at or past the next cursor is still needed for the next
+            # page, the cursor's offset skips the groups with the same score that
+            # were on this page.
+            cache.set(
+                self._get_search_cache_key(
+                    "search:cursor",
+                    projects,
+                    environments,
+                    search_filters,
+                    start,
+                    end,
+                    actor,
+                    cursor_cache_ttl,
+                    sort_by,
+                    aggregate_kwargs,
+                    str(next_cursor),
+                ),
+                {
+                    "group_ids": group_ids,
+                    "too_many_candidates": too_many_candidates,
+                    "result_groups": [
+                        (group_id, score)
+                        for group_id, score in result_groups
+                        if score <= next_cursor.value
+                    ],
+                    "snuba_scores": [score for score in snuba_scores if score <= next_cursor.value],
+                    "chunk_limit": chunk_limit,
+                    "more_results": more_results,
+                },
+                cursor_cache_ttl,
+            )
+
         metrics.distribution("snuba.search.num_chunks", num_chunks)
 
         groups = Group.objects.in_bulk(paginator_results.results)
@@ -1087,64 +1174,197 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # we need an alternative way to figure out the total hits that this
             # query has.
 
-            # To do this, we get a sample of groups matching the snuba side of
-            # the query, and see how many of those pass the post-filter in
-            # postgres. This should give us an estimate of the total number of
-            # snuba matches that will be overall matches, which we can use to
-            # get an estimate for X-Hits.
-
-            # The sampling is not simple random sampling. It will return *all*
-            # matching groups if there are less than N groups matching the
-            # query, or it will return a random, deterministic subset of N of
-            # the groups if there are more than N overall matches. This means
-            # that the "estimate" is actually an accurate result when there are
-            # less than N matching groups.
-
-            # The number of samples required to achieve a certain error bound
-            # with a certain confidence interval can be calculated from a
-            # rearrangement of the normal approximation (Wald) confidence
-            # interval formula:
-            #
-            # https://en.wikipedia.org/wiki/Binomial_proportion_confidence_interval
-            #
-            # Effectively if we want the estimate to be within +/- 10% of the
-            # real value with 95% confidence, we would need (1.96^2 * p*(1-p))
-            # / 0.1^2 samples. With a starting assumption of p=0.5 (this
-            # requires the most samples) we would need 96 samples to achieve
-            # +/-10% @ 95% confidence.
-
-            sample_size = options.get("snuba.search.hits-sample-size")
-            kwargs = dict(
-                start=start,
-                end=end,
-                project_ids=[p.id for p in projects],
-                environment_ids=environments and [environment.id for environment in environments],
-                organization=projects[0].organization,
-                sort_field=sort_field,
-                limit=sample_size,
-                offset=0,
-                get_sample=True,
-                search_filters=search_filters,
-                actor=actor,
+            cache_ttl = options.get("snuba.search.hits-cache-ttl")
+            cache_key = None
+            if cache_ttl > 0:
+                cache_key = self._get_search_cache_key(
+                    "search:hits",
+                    projects,
+                    environments,
+                    search_filters,
+                    start,
+                    end,
+                    actor,
+                    cache_ttl,
+                )
+                cached_hits = self._get_cached_hits(cache_key, group_queryset, search_filters)
+                if cached_hits is not None:
+                    return cached_hits
+
+            hits = self._estimate_hits(
+                group_ids,
+                too_many_candidates,
+                sort_field,
+                projects,
+                group_queryset,
+                environments,
+                search_filters,
+                start,
+                end,
+                actor,
             )
-            if not too_many_candidates:
-                kwargs["group_ids"] = group_ids
-
-            snuba_groups, snuba_total = self.snuba_search(**kwargs)
-            snuba_count = len(snuba_groups)
-            if snuba_count == 0:
-                # Maybe check for 0 hits and return EMPTY_RESULT in ::query? self.empty_result
-                return 0
-            else:
-                filtered_count = group_queryset.filter(
-                    id__in=[gid for gid, _ in snuba_groups]
-                ).count()
-
-                hit_ratio = filtered_count / float(snuba_count)
-                hits = int(hit_ratio * snuba_total)
-                return hits
+            if cache_key is not None:
+                cache.set(cache_key, {"hits": hits, "counted_at": time.time()}, cache_ttl)
+            return hits
         return None
 
+    def _get_search_cache_key(
+        self,
+        prefix: str,
+        projects: Sequence[Project],
+        environments: Sequence[Environment] | None,
+        search_filters: Sequence[SearchFilter] | None,
+        start: datetime,
+        end: datetime,
+        actor: Any | None,
+        granularity: int,
+        *extra: Any,
+    ) -> str:
+        """
+        Returns a cache key for the normalized search. Timestamps, both the
+        search bounds and the values of date filters like `lastSeen:-24h`, are
+        rounded down to the given granularity in seconds, since they are
+        usually relative to the current time.
+        """
+
+        def normalize(value: Any) -> Any:
+            if isinstance(value, datetime):
+                timestamp = int(value.timestamp())
+                return timestamp - timestamp % granularity
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return str(value)
+
+        key = json.dumps(
+            [
+                self.__class__.__name__,
+                sorted(project.id for project in projects),
+                sorted(environment.id for environment in environments or []),
+                sorted(
+                    [f.key.name, f.operator, normalize(f.value.raw_value)]
+                    for f in search_filters or []
+                ),
+                normalize(start),
+                normalize(end),
+                getattr(actor, "id", None),
+                *extra,
+            ]
+        )
+        return f"{prefix}:{md5(key.encode('utf-8')).hexdigest()}"
+
+    def _get_search_state(self, cache_key: str) -> dict[str, Any] | None:
+        search_state = cache.get(cache_key)
+        metrics.incr(
+            "snuba.search.cursor_cache", tags={"result": "miss" if search_state is None else "hit"}
+        )
+        return search_state
+
+    def _get_cached_hits(
+        self,
+        cache_key: str,
+        group_queryset: Query,
+        search_filters: Sequence[SearchFilter] | None,
+    ) -> int | None:
+        """
+        Returns the cached hit count, plus the groups matching the query that
+        were first seen since it was counted.
+
+        New groups can only be counted in Postgres, so if the search also
+        filters in Snuba, the cached count is only used while no new groups
+        have been seen at all.
+        """
+        cached = cache.get(cache_key)
+        if cached is None:
+            metrics.incr("snuba.search.hits_cache", tags={"result": "miss"})
+            return None
+
+        counted_at = datetime.fromtimestamp(cached["counted_at"], tz=UTC)
+        new_groups_queryset = group_queryset.filter(first_seen__gt=counted_at)
+        has_snuba_filters = any(
+            sf.key.name not in self.postgres_only_fields.union(["date", "timestamp"])
+            for sf in search_filters or ()
+        )
+        if has_snuba_filters:
+            if new_groups_queryset.exists():
+                metrics.incr("snuba.search.hits_cache", tags={"result": "stale"})
+                return None
+
+            metrics.incr("snuba.search.hits_cache", tags={"result": "hit"})
+            return cached["hits"]
+
+        metrics.incr("snuba.search.hits_cache", tags={"result": "hit"})
+        new_groups = new_groups_queryset.count()
+        metrics.distribution("snuba.search.hits_cache.new_groups", new_groups)
+        return cached["hits"] + new_groups
+
+    def _estimate_hits(
+        self,
+        group_ids: Sequence[int],
+        too_many_candidates: bool,
+        sort_field: str,
+        projects: Sequence[Project],
+        group_queryset: Query,
+        environments: Sequence[Environment] | None,
+        search_filters: Sequence[SearchFilter] | None,
+        start: datetime,
+        end: datetime,
+        actor: Any | None,
+    ) -> int:
+        # To estimate the hits, we get a sample of groups matching the snuba side of
+        # the query, and see how many of those pass the post-filter in
+        # postgres. This should give us an estimate of the total number of
+        # snuba matches that will be overall matches, which we can use to
+        # get an estimate for X-Hits.
+
+        # The sampling is not simple random sampling. It will return *all*
+        # matching groups if there are less than N groups matching the
+        # query, or it will return a random, deterministic subset of N of
+        # the groups if there are more than N overall matches. This means
+        # that the "estimate" is actually an accurate result when there are
+        # less than N matching groups.
+
+        # The number of samples required to achieve a certain error bound
+        # with a certain confidence interval can be calculated from a
+        # rearrangement of the normal approximation (Wald) confidence
+        # interval formula:
+        #
+        # https://en.wikipedia.org/wiki/Binomial_proportion_confidence_interval
+        #
+        # Effectively if we want the estimate to be within +/- 10% of the
+        # real value with 95% confidence, we would need (1.96^2 * p*(1-p))
+        # / 0.1^2 samples. With a starting assumption of p=0.5 (this
+        # requires the most samples) we would need 96 samples to achieve
+        # +/-10% @ 95% confidence.
+
+        sample_size = options.get("snuba.search.hits-sample-size")
+        kwargs = dict(
+            start=start,
+            end=end,
+            project_ids=[p.id for p in projects],
+            environment_ids=environments and [environment.id for environment in environments],
+            organization=projects[0].organization,
+            sort_field=sort_field,
+            limit=sample_size,
+            offset=0,
+            get_sample=True,
+            search_filters=search_filters,
+            actor=actor,
+        )
+        if not too_many_candidates:
+            kwargs["group_ids"] = group_ids
+
+        snuba_groups, snuba_total = self.snuba_search(**kwargs)
+        snuba_count = len(snuba_groups)
+        if snuba_count == 0:
+            # Maybe check for 0 hits and return EMPTY_RESULT in ::query? self.empty_result
+            return 0
+        else:
+            filtered_count = group_queryset.filter(id__in=[gid for gid, _ in snuba_groups]).count()
+
+            hit_ratio = filtered_count / float(snuba_count)
+            hits = int(hit_ratio * snuba_total)
+            return hits
+
 
 class InvalidQueryForExecutor(Exception):
     pass
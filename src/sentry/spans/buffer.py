@@ -63,9 +63,11 @@ Glossary for types of keys:
 
 from __future__ import annotations
 
+import heapq
 import itertools
-from collections.abc import MutableMapping, Sequence
-from typing import Any, NamedTuple
+from collections.abc import Callable, Iterable, Iterator, MutableMapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, TypeVar
 
 import rapidjson
 from django.conf import settings
@@ -84,6 +86,9 @@ SegmentKey = bytes
 
 QueueKey = bytes
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def _segment_key_to_span_id(segment_key: SegmentKey) -> bytes:
     return parse_segment_key(segment_key)[2]
@@ -134,24 +139,68 @@ class FlushedSegment(NamedTuple):
     spans: list[OutputSpan]
 
 
+class QueuedSegment(NamedTuple):
+    # flush deadline of the segment, i.e. its score in the queue
+    deadline: float
+    shard: int
+    queue_key: QueueKey
+    segment_key: SegmentKey
+
+
 class SpansBuffer:
+    """
+    :param flush_concurrency: When greater than 1, `flush_segments` reads the
+        shard queues and loads segments using up to this many threads, each
+        handling a subset of the assigned shards with its own pipeline.
+    :param segment_read_chunk_size: When greater than 0, segment members are
+        read with SSCAN in chunks of roughly this many spans instead of a
+        single SMEMBERS, and decoded as they arrive.
+    :param max_segment_bytes: When greater than 0, stop reading a segment once
+        the payloads read so far exceed this many bytes. The segment is then
+        flushed with the spans read so far (at least one), the rest is dropped
+        and counted in the `spans.buffer.flush_segments.truncated_segments`
+        metric. Together with `segment_read_chunk_size` this bounds the memory
+        used per segment regardless of trace size.
+    """
+
     def __init__(
         self,
         assigned_shards: list[int],
         span_buffer_timeout_secs: int = 60,
         span_buffer_root_timeout_secs: int = 10,
         redis_ttl: int = 3600,
+        flush_concurrency: int = 1,
+        segment_read_chunk_size: int = 0,
+        max_segment_bytes: int = 0,
     ):
         self.assigned_shards = list(assigned_shards)
         self.span_buffer_timeout_secs = span_buffer_timeout_secs
         self.span_buffer_root_timeout_secs = span_buffer_root_timeout_secs
         self.redis_ttl = redis_ttl
+        self.flush_concurrency = flush_concurrency
+        self.segment_read_chunk_size = segment_read_chunk_size
+        self.max_segment_bytes = max_segment_bytes
         self.add_buffer_sha: str | None = None
 
     @cached_property
     def client(self) -> RedisCluster[bytes] | StrictRedis[bytes]:
         return get_redis_client()
 
+    @cached_property
+    def flush_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.flush_concurrency, thread_name_prefix="spans-buffer-flush"
+        )
+
+    def close(self) -> None:
+        """
+        Shuts down the threads used for concurrent flushing, if any were
+        started. The buffer can't flush concurrently afterwards.
+        """
+        flush_executor = self.__dict__.pop("flush_executor", None)
+        if flush_executor is not None:
+            flush_executor.shutdown(wait=True)
+
     # make it pickleable
     def __reduce__(self):
         return (
@@ -161,6 +210,9 @@ class SpansBuffer:
                 self.span_buffer_timeout_secs,
                 self.span_buffer_root_timeout_secs,
                 self.redis_ttl,
+                self.flush_concurrency,
+                self.segment_read_chunk_size,
+                self.max_segment_bytes,
             ),
         )
 
@@ -306,87 +358,207 @@ class SpansBuffer:
 
         return trees
 
-    def flush_segments(self, now: int, max_segments: int = 0) -> dict[SegmentKey, FlushedSegment]:
-        cutoff = now
+    def _fan_out(self, items: Sequence[T], fn: Callable[[Sequence[T]], list[R]]) -> list[R]:
+        """
+        Calls `fn` with chunks of `items`, in parallel on the flush executor if
+        concurrent flushing is enabled, and returns the concatenated results in
+        order.
+        """
+        if self.flush_concurrency <= 1 or len(items) <= 1:
+            return fn(items)
 
-        queue_keys = []
+        chunk_size = -(-len(items) // self.flush_concurrency)
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+        return list(itertools.chain.from_iterable(self.flush_executor.map(fn, chunks)))
 
-        with metrics.timer("spans.buffer.flush_segments.load_segment_ids"):
-            with self.client.pipeline(transaction=False) as p:
-                for shard in self.assigned_shards:
-                    key = self._get_queue_key(shard)
-                    p.zrangebyscore(
-                        key, 0, cutoff, start=0 if max_segments else None, num=max_segments or None
-                    )
-                    p.zcard(key)
-                    queue_keys.append(key)
+    def _load_queued_segments(
+        self, shards: Sequence[int], cutoff: int, max_segments: int
+    ) -> list[tuple[int, list[QueuedSegment], int]]:
+        """
+        Returns, for each shard, the segments due for flushing (ordered by
+        deadline, at most `max_segments` per shard) and the size of its queue.
+        """
+        with self.client.pipeline(transaction=False) as p:
+            for shard in shards:
+                key = self._get_queue_key(shard)
+                p.zrangebyscore(
+                    key,
+                    0,
+                    cutoff,
+                    start=0 if max_segments else None,
+                    num=max_segments or None,
+                    withscores=True,
+                )
+                p.zcard(key)
 
-                result = iter(p.execute())
+            result = iter(p.execute())
 
-        segment_keys: list[tuple[QueueKey, SegmentKey]] = []
-        queue_sizes = []
+        rv = []
+        for shard in shards:
+            queue_key = self._get_queue_key(shard)
+            queued = [
+                QueuedSegment(deadline, shard, queue_key, segment_key)
+                for segment_key, deadline in next(result)
+            ]
+            rv.append((shard, queued, next(result)))
+        return rv
 
-        with metrics.timer("spans.buffer.flush_segments.load_segment_data"):
+    def _load_segments(self, queued: Sequence[QueuedSegment]) -> list[tuple[FlushedSegment, bool]]:
+        """
+        Loads and assembles the given segments. Runs on the flush executor,
+        so segments that need more than one SSCAN round trip are read in
+        parallel with the other chunks.
+        """
+        if not self.segment_read_chunk_size:
             with self.client.pipeline(transaction=False) as p:
-                # ZRANGEBYSCORE output
-                for queue_key, segment_span_ids in zip(queue_keys, result):
-                    # process return value of zrevrangebyscore
-                    for segment_key in segment_span_ids:
-                        segment_keys.append((queue_key, segment_key))
-                        p.smembers(segment_key)
+                for segment in queued:
+                    p.smembers(segment.segment_key)
 
-                    # ZCARD output
-                    queue_sizes.append(next(result))
+                segments_payloads: list[Iterable[bytes]] = p.execute()
+        else:
+            # Read the first chunk of every segment in one pipeline, most
+            # segments are small and fit into it. The rest is scanned lazily
+            # while the segment is assembled.
+            with self.client.pipeline(transaction=False) as p:
+                for segment in queued:
+                    p.sscan(segment.segment_key, 0, count=self.segment_read_chunk_size)
+
+                first_chunks = p.execute()
+
+            segments_payloads = [
+                self._iter_segment_payloads(segment.segment_key, cursor, chunk)
+                for segment, (cursor, chunk) in zip(queued, first_chunks)
+            ]
+
+        return [
+            self._assemble_segment(segment.segment_key, segment.queue_key, payloads)
+            for segment, payloads in zip(queued, segments_payloads)
+        ]
+
+    def _iter_segment_payloads(
+        self, segment_key: SegmentKey, cursor: int, chunk: list[bytes]
+    ) -> Iterator[bytes]:
+        yield from chunk
+        while cursor:
+            cursor, chunk = self.client.sscan(
+                segment_key, cursor, count=self.segment_read_chunk_size
+            )
+            yield from chunk
 
-                segments = p.execute()
+    def _assemble_segment(
+        self, segment_key: SegmentKey, queue_key: QueueKey, payloads: Iterable[bytes]
+    ) -> tuple[FlushedSegment, bool]:
+        """
+        Decodes the span payloads of a segment into `OutputSpan`s, consuming
+        `payloads` incrementally. Returns the segment and whether it contains
+        its root span.
+        """
+        segment_span_id = _segment_key_to_span_id(segment_key).decode("ascii")
+
+        output_spans = []
+        has_root_span = False
+        truncated = False
+        segment_bytes = 0
+        # SSCAN may return a member more than once
+        seen_span_ids: set[str] = set()
+
+        for payload in payloads:
+            val = rapidjson.loads(payload)
+            if self.segment_read_chunk_size:
+                if val["span_id"] in seen_span_ids:
+                    continue
+                seen_span_ids.add(val["span_id"])
+
+            segment_bytes += len(payload)
+            # Always keep at least one span, an empty segment would be dropped
+            # by the flusher entirely.
+            if self.max_segment_bytes and segment_bytes > self.max_segment_bytes and output_spans:
+                truncated = True
+                break
+
+            old_segment_id = val.get("segment_id")
+            outcome = "same" if old_segment_id == segment_span_id else "different"
+
+            is_segment = val["is_segment"] = segment_span_id == val["span_id"]
+            if is_segment:
+                has_root_span = True
+
+            val_data = val.setdefault("data", {})
+            if isinstance(val_data, dict):
+                val_data["__sentry_internal_span_buffer_outcome"] = outcome
+
+                if old_segment_id:
+                    val_data["__sentry_internal_old_segment_id"] = old_segment_id
+
+            val["segment_id"] = segment_span_id
+
+            metrics.incr(
+                "spans.buffer.flush_segments.is_same_segment",
+                tags={
+                    "outcome": outcome,
+                    "is_segment_span": is_segment,
+                    "old_segment_is_null": "true" if old_segment_id is None else "false",
+                },
+            )
+
+            output_spans.append(OutputSpan(payload=val))
+
+        metrics.timing("spans.buffer.flush_segments.num_spans_per_segment", len(output_spans))
+        metrics.timing("spans.buffer.flush_segments.segment_bytes", segment_bytes)
+        if truncated:
+            metrics.incr("spans.buffer.flush_segments.truncated_segments")
+
+        return (
+            FlushedSegment(queue_key=queue_key, spans=output_spans),
+            has_root_span,
+        )
 
-        for shard_i, queue_size in zip(self.assigned_shards, queue_sizes):
+    def flush_segments(self, now: int, max_segments: int = 0) -> dict[SegmentKey, FlushedSegment]:
+        """
+        Loads all segments that are due for flushing at `now`.
+
+        :param max_segments: Upper bound on the number of segments loaded
+            across all assigned shards. When more segments are due, the ones
+            with the oldest deadlines are flushed first.
+        """
+        cutoff = now
+
+        with metrics.timer("spans.buffer.flush_segments.load_segment_ids"):
+            shard_queues = self._fan_out(
+                self.assigned_shards,
+                lambda shards: self._load_queued_segments(shards, cutoff, max_segments),
+            )
+
+        all_queued = []
+        for shard_i, queued, queue_size in shard_queues:
             metrics.timing(
                 "spans.buffer.flush_segments.queue_size",
                 queue_size,
                 tags={"shard_i": shard_i},
             )
+            # How far behind the flusher is on this shard: time elapsed since
+            # the most overdue segment should have been flushed.
+            metrics.timing(
+                "spans.buffer.flush_segments.flush_lag",
+                now - queued[0].deadline if queued else 0,
+                tags={"shard_i": shard_i},
+            )
+            all_queued.extend(queued)
 
-        return_segments = {}
+        if max_segments and len(all_queued) > max_segments:
+            all_queued = heapq.nsmallest(max_segments, all_queued)
+        else:
+            all_queued.sort()
 
-        num_has_root_spans = 0
+        with metrics.timer("spans.buffer.flush_segments.load_segment_data"):
+            segments = self._fan_out(all_queued, self._load_segments)
 
-        for (queue_key, segment_key), segment in zip(segment_keys, segments):
-            segment_span_id = _segment_key_to_span_id(segment_key).decode("ascii")
-
-            output_spans = []
-            has_root_span = False
-            metrics.timing("spans.buffer.flush_segments.num_spans_per_segment", len(segment))
-            for payload in segment:
-                val = rapidjson.loads(payload)
-                old_segment_id = val.get("segment_id")
-                outcome = "same" if old_segment_id == segment_span_id else "different"
-
-                is_segment = val["is_segment"] = segment_span_id == val["span_id"]
-                if is_segment:
-                    has_root_span = True
-
-                val_data = val.setdefault("data", {})
-                if isinstance(val_data, dict):
-                    val_data["__sentry_internal_span_buffer_outcome"] = outcome
-
-                    if old_segment_id:
-                        val_data["__sentry_internal_old_segment_id"] = old_segment_id
-
-                val["segment_id"] = segment_span_id
-
-                metrics.incr(
-                    "spans.buffer.flush_segments.is_same_segment",
-                    tags={
-                        "outcome": outcome,
-                        "is_segment_span": is_segment,
-                        "old_segment_is_null": "true" if old_segment_id is None else "false",
-                    },
-                )
+        return_segments = {}
 
-                output_spans.append(OutputSpan(payload=val))
+        num_has_root_spans = 0
 
-            return_segments[segment_key] = FlushedSegment(queue_key=queue_key, spans=output_spans)
+        for (_, _, _, segment_key), (flushed_segment, has_root_span) in zip(all_queued, segments):
+            return_segments[segment_key] = flushed_segment
             num_has_root_spans += int(has_root_span)
 
         metrics.timing("spans.buffer.flush_segments.num_segments", len(return_segments))
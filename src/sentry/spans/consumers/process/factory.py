@@ -37,6 +37,9 @@ class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         input_block_size: int | None,
         output_block_size: int | None,
         produce_to_pipe: Callable[[KafkaPayload], None] | None = None,
+        flush_concurrency: int = 1,
+        segment_read_chunk_size: int = 0,
+        max_segment_bytes: int = 0,
     ):
         super().__init__()
 
@@ -44,6 +47,9 @@ class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         self.max_batch_size = max_batch_size
         self.max_batch_time = max_batch_time
         self.max_flush_segments = max_flush_segments
+        self.flush_concurrency = flush_concurrency
+        self.segment_read_chunk_size = segment_read_chunk_size
+        self.max_segment_bytes = max_segment_bytes
         self.input_block_size = input_block_size
         self.output_block_size = output_block_size
         self.num_processes = num_processes
@@ -59,7 +65,12 @@ class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
     ) -> ProcessingStrategy[KafkaPayload]:
         committer = CommitOffsets(commit)
 
-        buffer = SpansBuffer(assigned_shards=[p.index for p in partitions])
+        buffer = SpansBuffer(
+            assigned_shards=[p.index for p in partitions],
+            flush_concurrency=self.flush_concurrency,
+            segment_read_chunk_size=self.segment_read_chunk_size,
+            max_segment_bytes=self.max_segment_bytes,
+        )
 
         # patch onto self just for testing
         flusher: ProcessingStrategy[FilteredPayload | int]
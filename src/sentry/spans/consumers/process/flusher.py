@@ -134,6 +134,10 @@ class SpanFlusher(ProcessingStrategy[FilteredPayload | int]):
                 producer.close()
         except KeyboardInterrupt:
             pass
+        finally:
+            # The flusher owns the buffer's flush threads, a new buffer is
+            # created with every rebalance.
+            buffer.close()
 
     def poll(self) -> None:
         self.next_step.poll()
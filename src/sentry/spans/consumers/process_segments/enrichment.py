@@ -69,8 +69,7 @@ def set_shared_tags(segment: Span, spans: list[Span]) -> None:
 
     is_mobile = segment_tags.get("mobile") == "true"
     mobile_start_type = _get_mobile_start_type(segment)
-    ttid_ts = _timestamp_by_op(spans, "ui.load.initial_display")
-    ttfd_ts = _timestamp_by_op(spans, "ui.load.full_display")
+    ttid_ts, ttfd_ts = _timestamps_by_op(spans, ("ui.load.initial_display", "ui.load.full_display"))
 
     for span in spans:
         span_tags = cast(dict[str, Any], span["sentry_tags"])
@@ -109,11 +108,18 @@ def _get_mobile_start_type(segment: Span) -> str | None:
     return None
 
 
-def _timestamp_by_op(spans: list[Span], op: str) -> float | None:
+def _timestamps_by_op(spans: list[Span], ops: tuple[str, ...]) -> list[float | None]:
+    """
+    Returns the end timestamp of the first span with each of the given ops, or
+    ``None`` if there is no such span.
+    """
+    timestamps: dict[str, float] = {}
     for span in spans:
-        if span["op"] == op:
-            return span["end_timestamp_precise"]
-    return None
+        if span["op"] in ops and span["op"] not in timestamps:
+            timestamps[span["op"]] = span["end_timestamp_precise"]
+            if len(timestamps) == len(ops):
+                break
+    return [timestamps.get(op) for op in ops]
 
 
 def set_exclusive_time(spans: list[Span]) -> None:
@@ -124,27 +130,31 @@ def set_exclusive_time(spans: list[Span]) -> None:
     of all time intervals where no child span was active.
     """
 
+    # Timestamps are converted once, and child intervals are stored as
+    # (start, -end) so that they sort by start ASC, end DESC without a key
+    # function. This allows to skip over nested intervals efficiently.
+    starts = [_us(span["start_timestamp_precise"]) for span in spans]
+    ends = [_us(span["end_timestamp_precise"]) for span in spans]
+
     span_map: dict[str, list[tuple[int, int]]] = {}
-    for span in spans:
+    for span, start, end in zip(spans, starts, ends):
         if parent_span_id := span.get("parent_span_id"):
-            interval = (_us(span["start_timestamp_precise"]), _us(span["end_timestamp_precise"]))
-            span_map.setdefault(parent_span_id, []).append(interval)
-
-    for span in spans:
-        intervals = span_map.get(span["span_id"], [])
-        # Sort by start ASC, end DESC to skip over nested intervals efficiently
-        intervals.sort(key=lambda x: (x[0], -x[1]))
+            span_map.setdefault(parent_span_id, []).append((start, -end))
 
+    for span, start, end in zip(spans, starts, ends):
         exclusive_time_us: int = 0  # microseconds to prevent rounding issues
-        start, end = _us(span["start_timestamp_precise"]), _us(span["end_timestamp_precise"])
 
-        # Progressively add time gaps before the next span and then skip to its end.
-        for child_start, child_end in intervals:
-            if child_start >= end:
-                break
-            if child_start > start:
-                exclusive_time_us += child_start - start
-            start = max(start, child_end)
+        intervals = span_map.get(span["span_id"])
+        if intervals:
+            intervals.sort()
+
+            # Progressively add time gaps before the next span and then skip to its end.
+            for child_start, negative_child_end in intervals:
+                if child_start >= end:
+                    break
+                if child_start > start:
+                    exclusive_time_us += child_start - start
+                start = max(start, -negative_child_end)
 
         # Add any remaining time not covered by children
         exclusive_time_us += max(end - start, 0)
@@ -341,26 +341,39 @@ class RedisTSDB(BaseTSDB):
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
         _series = [to_datetime(item) for item in series]
+        epochs = [int(timestamp.timestamp()) for timestamp in _series]
+
+        # The counters of all keys sharing a vnode are stored in the same hash for every rollup
+        # bucket, so rather than issuing one HGET per key and bucket, we fetch each hash with a
+        # single HMGET for all of the requested fields in it.
+        fields_by_hash_key: dict[str, list[str | int]] = defaultdict(list)
+        # key -> (hash key, position of the field in the HMGET) for each bucket
+        positions: dict[TSDBKey, list[tuple[str, int]]] = {}
+        for key in keys:
+            key_positions = positions[key] = []
+            for timestamp in _series:
+                hash_key, hash_field = self.make_counter_key(
+                    model, rollup, timestamp, key, environment_id
+                )
+                fields = fields_by_hash_key[hash_key]
+                key_positions.append((hash_key, len(fields)))
+                fields.append(hash_field)
 
-        results = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
-            for key in keys:
-                for timestamp in _series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (int(timestamp.timestamp()), key, client.hget(hash_key, hash_field))
-                    )
+            promises = {
+                hash_key: client.hmget(hash_key, fields)
+                for hash_key, fields in fields_by_hash_key.items()
+            }
 
-        results_by_key: dict[TSDBKey, dict[int, int]] = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        values = {hash_key: promise.value for hash_key, promise in promises.items()}
 
         output = {}
-        for key, points in results_by_key.items():
-            output[key] = sorted(points.items())
+        for key, key_positions in positions.items():
+            output[key] = [
+                (epoch, int(values[hash_key][position] or 0))
+                for epoch, (hash_key, position) in zip(epochs, key_positions)
+            ]
         return output
 
     def merge(
@@ -547,6 +560,7 @@ class RedisTSDB(BaseTSDB):
         self.validate_arguments([model], [environment_id])
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        buckets = self.get_distinct_counts_buckets(rollup, series)
 
         responses = {}
         cluster, _ = self.get_cluster(environment_id)
@@ -559,13 +573,52 @@ class RedisTSDB(BaseTSDB):
                 # supported by the protocol -- so we have to call the command
                 # directly here instead.
                 ks = []
-                for timestamp in series:
-                    ks.append(self.make_key(model, rollup, timestamp, key, environment_id))
+                for bucket_rollup, timestamp in buckets:
+                    ks.append(self.make_key(model, bucket_rollup, timestamp, key, environment_id))
 
                 responses[key] = client.target_key(key).execute_command("PFCOUNT", *ks)
 
         return {key: value.value for key, value in responses.items()}
 
+    def get_distinct_counts_buckets(
+        self, rollup: int, series: Sequence[int]
+    ) -> list[tuple[int, int]]:
+        """
+        Returns the ``(rollup, timestamp)`` buckets whose union covers the
+        given series of ``rollup`` buckets, using as few buckets as possible.
+
+        Every item is recorded into the distinct counters of all rollups, so a
+        bucket of a coarser rollup holds exactly the union of the finer buckets
+        it spans. Wherever a coarser bucket (which has not expired yet) is
+        entirely contained in the series it's used instead of its finer
+        buckets, which results in the same estimate from a lot fewer keys.
+        """
+        if not series:
+            return []
+
+        coarser_rollups = sorted(
+            (r for r in self.rollups if r > rollup and r % rollup == 0), reverse=True
+        )
+
+        def cover(start: int, end: int, rollups: list[int]) -> list[tuple[int, int]]:
+            if not rollups:
+                return [(rollup, timestamp) for timestamp in range(start, end, rollup)]
+
+            bucket_rollup, finer_rollups = rollups[0], rollups[1:]
+            earliest = self.get_earliest_timestamp(bucket_rollup)
+            first = -(-max(start, earliest) // bucket_rollup) * bucket_rollup
+            last = end // bucket_rollup * bucket_rollup
+            if first >= last:
+                return cover(start, end, finer_rollups)
+
+            return (
+                cover(start, first, finer_rollups)
+                + [(bucket_rollup, timestamp) for timestamp in range(first, last, bucket_rollup)]
+                + cover(last, end, finer_rollups)
+            )
+
+        return cover(series[0], series[-1] + rollup, coarser_rollups)
+
     def merge_distinct_counts(
         self,
         model: TSDBModel,
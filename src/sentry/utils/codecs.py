@@ -1,5 +1,7 @@
+import struct
 import zlib
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from typing import Any, Generic, TypeVar
 
 import zstandard
@@ -91,3 +93,58 @@ class ZstdCodec(Codec[bytes, bytes]):
 
     def decode(self, value: bytes) -> bytes:
         return zstandard.ZstdDecompressor().decompress(value)
+
+
+class ZstdDictCodec(ZstdCodec):
+    """
+    Zstd compression using trained dictionaries.
+
+    Encoded values are prefixed with a header carrying the version of the
+    dictionary they were compressed with, so dictionaries can be rotated
+    without rewriting existing data as long as old versions stay available for
+    decoding. Values without the header are treated as plain zstd frames, and
+    if no ``version`` is given values are encoded as plain zstd as well.
+    """
+
+    magic = b"SZD\x00"
+    header = struct.Struct("<4sI")
+
+    def __init__(
+        self,
+        dictionaries: Mapping[int, bytes] | None = None,
+        version: int | None = None,
+        level: int = 3,
+    ) -> None:
+        self.level = level
+        self.dictionaries: dict[int, zstandard.ZstdCompressionDict] = {}
+        for dict_version, data in (dictionaries or {}).items():
+            dictionary = zstandard.ZstdCompressionDict(data)
+            # Precomputing makes creating a compressor per call cheap.
+            dictionary.precompute_compress(level=level)
+            self.dictionaries[dict_version] = dictionary
+
+        if version is not None and version not in self.dictionaries:
+            raise ValueError(f"unknown dictionary version: {version!r}")
+        self.version = version
+
+    def encode(self, value: bytes) -> bytes:
+        if self.version is None:
+            return super().encode(value)
+
+        compressor = zstandard.ZstdCompressor(
+            level=self.level, dict_data=self.dictionaries[self.version]
+        )
+        return self.header.pack(self.magic, self.version) + compressor.compress(value)
+
+    def decode(self, value: bytes) -> bytes:
+        if value[: len(self.magic)] != self.magic:
+            return super().decode(value)
+
+        _, version = self.header.unpack_from(value)
+        try:
+            dictionary = self.dictionaries[version]
+        except KeyError:
+            raise ValueError(f"unknown dictionary version: {version!r}")
+
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor.decompress(value[self.header.size :])
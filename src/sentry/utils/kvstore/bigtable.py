@@ -15,7 +15,7 @@ from google.cloud.bigtable.row_data import DEFAULT_RETRY_READ_ROWS
 from google.cloud.bigtable.row_set import RowSet
 from google.cloud.bigtable.table import Table
 
-from sentry.utils.codecs import Codec, ZlibCodec, ZstdCodec
+from sentry.utils.codecs import Codec, ZlibCodec, ZstdCodec, ZstdDictCodec
 from sentry.utils.kvstore.abstract import KVStorage
 
 logger = logging.getLogger(__name__)
@@ -54,10 +54,14 @@ class BigtableKVStorage(KVStorage[str, bytes]):
         # behavior is explicitly undefined if both bits are set on a record.
         COMPRESSED_ZLIB = 1 << 0
         COMPRESSED_ZSTD = 1 << 1
+        COMPRESSED_ZSTD_DICT = 1 << 2
 
     compression_strategies: Mapping[str, tuple[Flags, Codec[bytes, bytes]]] = {
         "zlib": (Flags.COMPRESSED_ZLIB, ZlibCodec()),
         "zstd": (Flags.COMPRESSED_ZSTD, ZstdCodec()),
+        # Without dictionaries this can only read values written without one,
+        # see ``compression_dictionaries``.
+        "zstd-dict": (Flags.COMPRESSED_ZSTD_DICT, ZstdDictCodec()),
     }
 
     def __init__(
@@ -69,7 +73,15 @@ class BigtableKVStorage(KVStorage[str, bytes]):
         default_ttl: timedelta | None = None,
         compression: str | None = None,
         app_profile: str | None = None,
+        compression_dictionaries: Mapping[int, bytes] | None = None,
+        compression_dictionary_version: int | None = None,
     ) -> None:
+        """
+        ``compression_dictionaries`` maps versions to trained zstd dictionaries
+        used by the "zstd-dict" compression strategy. New values are compressed
+        with ``compression_dictionary_version`` (by default the highest
+        version), all given versions remain readable.
+        """
         client_options = client_options if client_options is not None else {}
         if "admin" in client_options:
             raise ValueError('"admin" cannot be provided as a client option')
@@ -85,6 +97,17 @@ class BigtableKVStorage(KVStorage[str, bytes]):
         self.compression = compression
         self.app_profile = app_profile
 
+        if compression_dictionaries:
+            if compression_dictionary_version is None:
+                compression_dictionary_version = max(compression_dictionaries)
+            self.compression_strategies = {
+                **self.compression_strategies,
+                "zstd-dict": (
+                    self.Flags.COMPRESSED_ZSTD_DICT,
+                    ZstdDictCodec(compression_dictionaries, compression_dictionary_version),
+                ),
+            }
+
         self.__table: Table
         self.__table_lock = Lock()
 
@@ -4,6 +4,8 @@ import hashlib
 import random
 import re
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import timedelta
 from enum import Enum
 from typing import Any, ClassVar, TypedDict
@@ -61,6 +63,29 @@ class PerformanceDetector(ABC):
     def __init__(self, settings: dict[DetectorType, Any], event: dict[str, Any]) -> None:
         self.settings = settings[self.settings_key]
         self._event = event
+        self._span_index: SpanIndex | None = None
+
+    @property
+    def span_index(self) -> SpanIndex:
+        """
+        The index of the spans of the event. When detectors are run through
+        `run_detector_on_data`, the index is shared between all detectors.
+        """
+        if self._span_index is None:
+            self._span_index = SpanIndex(self._event.get("spans") or [])
+        return self._span_index
+
+    @span_index.setter
+    def span_index(self, span_index: SpanIndex) -> None:
+        self._span_index = span_index
+
+    def get_span_op_prefixes(self) -> Sequence[str] | None:
+        """
+        The span op prefixes this detector is interested in. Only spans with a
+        matching op are visited, detectors that need to see every span (e.g.
+        to track consecutive spans) return None.
+        """
+        return None
 
     def find_span_prefix(self, settings, span_op: str):
         allowed_span_ops = settings.get("allowed_span_ops", [])
@@ -74,7 +99,7 @@ class PerformanceDetector(ABC):
         if not op or not span_id:
             return None
 
-        span_duration = get_span_duration(span)
+        span_duration = self.span_index.get_duration(span)
         for setting in self.settings:
             op_prefix = self.find_span_prefix(setting, op)
             if op_prefix:
@@ -361,6 +386,78 @@ def parameterize_url(url: str) -> str:
     return parameterize_url_with_result(url).get("url", "")
 
 
+class SpanIndex:
+    """
+    Index over the spans of an event, built once and shared by all detectors
+    instead of every detector rescanning and re-deriving the same values.
+
+    Spans are bucketed by op, so that detectors only interested in a few ops
+    don't have to visit every span. Durations, fingerprints and
+    (parameterized) URLs are computed on first use and cached for the other
+    detectors.
+    """
+
+    def __init__(self, spans: Sequence[Span]) -> None:
+        self.spans = spans
+        self._positions_by_op: dict[str, list[int]] = defaultdict(list)
+        for position, span in enumerate(spans):
+            self._positions_by_op[span.get("op") or ""].append(position)
+
+        # Spans are dicts and not hashable, so values are cached by the id of
+        # the span. The span is kept alongside the value, so that the id can't
+        # be reused by another span while cached.
+        self._durations: dict[int, tuple[Span, timedelta]] = {}
+        self._fingerprints: dict[int, tuple[Span, str | None]] = {}
+        self._urls: dict[int, tuple[Span, str]] = {}
+        self._parameterized_urls: dict[str, ParameterizedUrl] = {}
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def iter_spans(self, op_prefixes: Iterable[str] | None = None) -> Iterator[Span]:
+        """
+        Yields the spans whose op starts with any of the given prefixes, in
+        the order of the event, or all spans if no prefixes are given.
+        """
+        if op_prefixes is None:
+            yield from self.spans
+            return
+
+        op_prefixes = tuple(op_prefixes)
+        positions = [
+            position
+            for op, op_positions in self._positions_by_op.items()
+            if op and op.startswith(op_prefixes)
+            for position in op_positions
+        ]
+        for position in sorted(positions):
+            yield self.spans[position]
+
+    def get_duration(self, span: Span) -> timedelta:
+        cached = self._durations.get(id(span))
+        if cached is None:
+            cached = self._durations[id(span)] = (span, get_span_duration(span))
+        return cached[1]
+
+    def get_fingerprint(self, span: Span) -> str | None:
+        cached = self._fingerprints.get(id(span))
+        if cached is None:
+            cached = self._fingerprints[id(span)] = (span, fingerprint_span(span))
+        return cached[1]
+
+    def get_url(self, span: Span) -> str:
+        cached = self._urls.get(id(span))
+        if cached is None:
+            cached = self._urls[id(span)] = (span, get_url_from_span(span))
+        return cached[1]
+
+    def get_parameterized_url(self, url: str) -> ParameterizedUrl:
+        parameterized_url = self._parameterized_urls.get(url)
+        if parameterized_url is None:
+            parameterized_url = self._parameterized_urls[url] = parameterize_url_with_result(url)
+        return parameterized_url
+
+
 def fingerprint_http_spans(spans: list[Span]) -> str:
     """
     Fingerprints http spans based on their paramaterized paths, assumes all spans are http spans
@@ -22,7 +22,6 @@ from ..base import (
     PerformanceDetector,
     fingerprint_spans,
     get_notification_attachment_body,
-    get_span_duration,
     get_span_evidence_value,
 )
 from ..performance_problem import PerformanceProblem
@@ -92,7 +91,7 @@ class ConsecutiveDBSpanDetector(PerformanceDetector):
             "consecutive_count_threshold"
         )
         exceeds_span_duration_threshold = all(
-            get_span_duration(span).total_seconds() * 1000
+            self.span_index.get_duration(span).total_seconds() * 1000
             > self.settings.get("span_duration_threshold")
             for span in self.independent_db_spans
         )
@@ -219,7 +218,9 @@ class ConsecutiveDBSpanDetector(PerformanceDetector):
         sum_of_dependent_span_durations = 0.0
         for span in consecutive_spans:
             if span not in independent_spans:
-                sum_of_dependent_span_durations += get_span_duration(span).total_seconds() * 1000
+                sum_of_dependent_span_durations += (
+                    self.span_index.get_duration(span).total_seconds() * 1000
+                )
 
         return total_duration - max(max_independent_span_duration, sum_of_dependent_span_durations)
 
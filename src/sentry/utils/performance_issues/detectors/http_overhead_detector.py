@@ -58,6 +58,9 @@ class HTTPOverheadDetector(PerformanceDetector):
         self.stored_problems: dict[str, PerformanceProblem] = {}
         self.location_to_indicators: dict[str, list[list[ProblemIndicator]]] = defaultdict(list)
 
+    def get_span_op_prefixes(self) -> list[str]:
+        return ["http.client"]
+
     def visit_span(self, span: Span) -> None:
         span_data = span.get("data", {})
         if not self._is_span_eligible(span) or not span_data:
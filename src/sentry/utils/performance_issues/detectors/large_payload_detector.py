@@ -39,6 +39,10 @@ class LargeHTTPPayloadDetector(PerformanceDetector):
         self.stored_problems: dict[str, PerformanceProblem] = {}
         self.consecutive_http_spans: list[Span] = []
 
+    def get_span_op_prefixes(self) -> list[str]:
+        # This detector is only available for HTTP spans
+        return ["http"]
+
     def visit_span(self, span: Span) -> None:
         if not LargeHTTPPayloadDetector._is_span_eligible(span):
             return
@@ -60,6 +60,9 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
     def is_creation_allowed_for_project(self, project: Project) -> bool:
         return self.settings["detection_enabled"]
 
+    def get_span_op_prefixes(self) -> list[str]:
+        return ["resource.link", "resource.script"]
+
     def visit_span(self, span: Span) -> None:
         if not self.fcp:
             return
@@ -12,7 +12,6 @@ from sentry.models.project import Project
 from ..base import (
     DetectorType,
     PerformanceDetector,
-    fingerprint_span,
     get_notification_attachment_body,
     get_span_evidence_value,
 )
@@ -41,6 +40,15 @@ class SlowDBQueryDetector(PerformanceDetector):
 
         self.stored_problems = {}
 
+    def get_span_op_prefixes(self) -> list[str] | None:
+        op_prefixes = []
+        for setting in self.settings:
+            allowed_span_ops = setting.get("allowed_span_ops", [])
+            if not allowed_span_ops:
+                return None
+            op_prefixes.extend(allowed_span_ops)
+        return op_prefixes
+
     def visit_span(self, span: Span) -> None:
         settings_for_span = self.settings_for_span(span)
         if not settings_for_span:
@@ -48,7 +56,7 @@ class SlowDBQueryDetector(PerformanceDetector):
         op, span_id, op_prefix, span_duration, settings = settings_for_span
         duration_threshold = settings.get("duration_threshold")
 
-        fingerprint = fingerprint_span(span)
+        fingerprint = self.span_index.get_fingerprint(span)
 
         if not fingerprint:
             return
@@ -13,7 +13,6 @@ from ..base import (
     PerformanceDetector,
     fingerprint_resource_span,
     get_notification_attachment_body,
-    get_span_duration,
     get_span_evidence_value,
 )
 from ..performance_problem import PerformanceProblem
@@ -39,6 +38,9 @@ class UncompressedAssetSpanDetector(PerformanceDetector):
         self.stored_problems = {}
         self.any_compression = False
 
+    def get_span_op_prefixes(self) -> list[str]:
+        return self.settings.get("allowed_span_ops")
+
     def visit_span(self, span: Span) -> None:
         op = span.get("op", None)
         description = span.get("description", "")
@@ -88,7 +90,7 @@ class UncompressedAssetSpanDetector(PerformanceDetector):
             return
 
         # Ignore assets under a certain duration threshold
-        if get_span_duration(span).total_seconds() * 1000 <= self.settings.get(
+        if self.span_index.get_duration(span).total_seconds() * 1000 <= self.settings.get(
             "duration_threshold"
         ):
             return
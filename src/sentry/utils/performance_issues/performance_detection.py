@@ -22,7 +22,7 @@ from sentry.utils.performance_issues.detectors.experiments.n_plus_one_db_span_de
 )
 from sentry.utils.safe import get_path
 
-from .base import DetectorType, PerformanceDetector
+from .base import DetectorType, PerformanceDetector, SpanIndex
 from .detectors.consecutive_db_detector import ConsecutiveDBSpanDetector
 from .detectors.consecutive_http_detector import ConsecutiveHTTPSpanDetector
 from .detectors.experiments.n_plus_one_api_calls_detector import (
@@ -365,11 +365,14 @@ def _detect_performance_problems(
             if detector_class.is_detection_allowed_for_system()
         ]
 
+    with sentry_sdk.start_span(op="function", name="build_span_index"):
+        span_index = SpanIndex(data.get("spans", []))
+
     for detector in detectors:
         with sentry_sdk.start_span(
             op="function", name=f"run_detector_on_data.{detector.type.value}"
         ):
-            run_detector_on_data(detector, data)
+            run_detector_on_data(detector, data, span_index)
 
     with sentry_sdk.start_span(op="function", name="report_metrics_for_detectors"):
         # Metrics reporting only for detection, not created issues.
@@ -416,12 +419,16 @@ def _detect_performance_problems(
     return list(unique_problems)
 
 
-def run_detector_on_data(detector: PerformanceDetector, data: dict[str, Any]) -> None:
+def run_detector_on_data(
+    detector: PerformanceDetector, data: dict[str, Any], span_index: SpanIndex | None = None
+) -> None:
     if not detector.is_event_eligible(data):
         return
 
-    spans = data.get("spans", [])
-    for span in spans:
+    if span_index is not None:
+        detector.span_index = span_index
+
+    for span in detector.span_index.iter_spans(detector.get_span_op_prefixes()):
         detector.visit_span(span)
 
     detector.on_complete()
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import dataclasses
 import functools
+import heapq
+import itertools
 import logging
 import math
 import os
 import re
+import threading
 import time
-from collections import namedtuple
+from collections import Counter, namedtuple
 from collections.abc import Callable, Collection, Mapping, MutableMapping, Sequence
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone
@@ -17,15 +20,17 @@ from hashlib import sha1
 from typing import Any
 from urllib.parse import urlparse
 
+import orjson
 import sentry_sdk
 import sentry_sdk.scope
 import urllib3
 from dateutil.parser import parse as parse_datetime
 from django.conf import settings
 from django.core.cache import cache
-from snuba_sdk import DeleteQuery, MetricsQuery, Request
+from snuba_sdk import Condition, DeleteQuery, MetricsQuery, Op, Query, Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
 from sentry.models.environment import Environment
 from sentry.models.group import Group
 from sentry.models.grouprelease import GroupRelease
@@ -556,6 +561,141 @@ _snuba_pool = connection_from_url(
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
 
+class QueryCoalescer:
+    """
+    Coalesces identical queries running concurrently in this process. The
+    first caller runs the query, and all callers that ask for the same query
+    with the same referrer while it's in flight share its response. Queries
+    of different referrers aren't coalesced, as Snuba can respond differently
+    to them, e.g. when a referrer is rate limited.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, str], Future[urllib3.response.HTTPResponse]] = {}
+
+    def run(
+        self, key: str, referrer: str, func: Callable[[], urllib3.response.HTTPResponse]
+    ) -> urllib3.response.HTTPResponse:
+        in_flight_key = (key, referrer)
+        with self._lock:
+            future = self._in_flight.get(in_flight_key)
+            is_leader = future is None
+            if future is None:
+                future = self._in_flight[in_flight_key] = Future()
+
+        if not is_leader:
+            metrics.incr("snuba.client.coalesced", tags={"referrer": referrer})
+            return future.result()
+
+        try:
+            response = func()
+        except BaseException as e:
+            self._done(in_flight_key)
+            future.set_exception(e)
+            raise
+
+        self._done(in_flight_key)
+        future.set_result(response)
+        return response
+
+    def _done(self, in_flight_key: tuple[str, str]) -> None:
+        with self._lock:
+            del self._in_flight[in_flight_key]
+
+
+class QueryScheduler:
+    """
+    Bounds the number of queries running concurrently in this process, in
+    total and per referrer. When queries have to wait, referrers matching
+    `snuba.query-scheduler.priority-referrers` prefixes are let through first,
+    then all other queries in the order they arrived.
+
+    Waiting queries are kept in a heap, and whenever a slot frees up it's
+    handed to the first query that can run, which is the only one woken up.
+    Queries whose referrer is at its limit are set aside until a query of the
+    same referrer finishes.
+
+    This is a no-op while `snuba.query-scheduler.max-concurrent` is 0.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._running = 0
+        self._running_by_referrer: Counter[str] = Counter()
+        # (priority, sequence number, referrer, condition to wake the query up with)
+        self._waiting: list[tuple[int, int, str, threading.Condition]] = []
+        self._blocked: dict[str, list[tuple[int, int, str, threading.Condition]]] = {}
+        self._granted: set[int] = set()
+        self._sequence = itertools.count()
+
+    def _get_priority(self, referrer: str) -> int:
+        prefixes = tuple(options.get("snuba.query-scheduler.priority-referrers"))
+        return 0 if prefixes and referrer.startswith(prefixes) else 1
+
+    def _dispatch(self) -> None:
+        """
+        Hands free slots to the waiting queries, in order. Must be called with
+        the lock held.
+        """
+        max_concurrent = options.get("snuba.query-scheduler.max-concurrent")
+        max_per_referrer = options.get("snuba.query-scheduler.max-concurrent-per-referrer")
+        while self._waiting and (max_concurrent <= 0 or self._running < max_concurrent):
+            entry = heapq.heappop(self._waiting)
+            _, sequence, referrer, condition = entry
+            if max_per_referrer > 0 and self._running_by_referrer[referrer] >= max_per_referrer:
+                heapq.heappush(self._blocked.setdefault(referrer, []), entry)
+                continue
+
+            self._running += 1
+            self._running_by_referrer[referrer] += 1
+            self._granted.add(sequence)
+            condition.notify()
+
+    @contextmanager
+    def slot(self, referrer: str):
+        max_concurrent = options.get("snuba.query-scheduler.max-concurrent")
+        if max_concurrent <= 0:
+            yield
+            return
+
+        priority = self._get_priority(referrer)
+        sequence = next(self._sequence)
+        start = time.monotonic()
+
+        with self._lock:
+            condition = threading.Condition(self._lock)
+            heapq.heappush(self._waiting, (priority, sequence, referrer, condition))
+            self._dispatch()
+            while sequence not in self._granted:
+                condition.wait()
+            self._granted.remove(sequence)
+
+        metrics.distribution(
+            "snuba.client.scheduler.wait",
+            time.monotonic() - start,
+            tags={"referrer": referrer, "priority": str(priority == 0).lower()},
+            unit="second",
+        )
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._running_by_referrer[referrer] -= 1
+                if not self._running_by_referrer[referrer]:
+                    del self._running_by_referrer[referrer]
+                # Queries set aside for this referrer may run again
+                for entry in self._blocked.pop(referrer, ()):
+                    heapq.heappush(self._waiting, entry)
+                self._dispatch()
+
+
+_query_coalescer = QueryCoalescer()
+_query_scheduler = QueryScheduler()
+
+
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
 
@@ -1076,9 +1216,85 @@ def bulk_raw_query(
     return _apply_cache_and_build_results(snuba_requests, use_cache=use_cache)
 
 
+# Tenant IDs that don't affect the result of a query
+UNCACHED_TENANT_IDS = ("referrer", "query_source")
+
+# Operators of conditions bounding the time range of a query from below and above
+TIME_RANGE_START_OPS = (Op.GT, Op.GTE)
+TIME_RANGE_END_OPS = (Op.LT, Op.LTE)
+
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+SINGLE_FLIGHT_MAX_POLL_INTERVAL = 0.5
+# Value of a single-flight claim whose query finished without caching a result
+SINGLE_FLIGHT_NO_RESULT = "no-result"
+
+
+def _round_datetime(value: datetime, granularity: int, up: bool = False) -> datetime:
+    aware_value = value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    epoch = aware_value.timestamp()
+    rounded = epoch - epoch % granularity
+    if up and rounded < epoch:
+        rounded += granularity
+    return datetime.fromtimestamp(rounded, tz=aware_value.tzinfo).replace(tzinfo=value.tzinfo)
+
+
+def _round_time_range_condition(condition: Any, granularity: int) -> Any:
+    if not isinstance(condition, Condition) or not isinstance(condition.rhs, datetime):
+        return condition
+    if condition.op in TIME_RANGE_START_OPS:
+        return Condition(condition.lhs, condition.op, _round_datetime(condition.rhs, granularity))
+    if condition.op in TIME_RANGE_END_OPS:
+        return Condition(
+            condition.lhs, condition.op, _round_datetime(condition.rhs, granularity, up=True)
+        )
+    return condition
+
+
+def _round_time_range(request: Request, granularity: int) -> Request:
+    """
+    Returns a copy of the request with the bounds of its time range, the start
+    and end of a `MetricsQuery` or the top level range conditions on datetimes
+    of a `Query`, widened to multiples of the granularity in seconds.
+    Timestamps anywhere else in the query are left alone.
+    """
+    query = request.query
+    if isinstance(query, MetricsQuery):
+        if query.start is not None:
+            query = query.set_start(_round_datetime(query.start, granularity))
+        if query.end is not None:
+            query = query.set_end(_round_datetime(query.end, granularity, up=True))
+    elif isinstance(query, Query) and query.where:
+        query = query.set_where(
+            [_round_time_range_condition(condition, granularity) for condition in query.where]
+        )
+    else:
+        return request
+    return dataclasses.replace(request, query=query)
+
+
+def get_query_fingerprint(request: Request, time_granularity: int = 0) -> str:
+    """
+    Serializes the request into a form that's identical for all requests that
+    return the same result. The parent API, referrer and query source are left
+    out, and if a time granularity (in seconds) is given, the time range of the
+    query is widened to it, so that queries over a sliding time range issued
+    within a few seconds of each other share a fingerprint.
+    """
+    if time_granularity > 0:
+        request = _round_time_range(request, time_granularity)
+    body = request.to_dict()
+    body.pop("parent_api", None)
+    body["tenant_ids"] = {
+        key: value
+        for key, value in (body.get("tenant_ids") or {}).items()
+        if key not in UNCACHED_TENANT_IDS
+    }
+    return orjson.dumps(body, option=orjson.OPT_SORT_KEYS).decode()
+
+
 def get_cache_key(query: Request) -> str:
     if isinstance(query, Request):
-        hashable = str(query)
+        hashable = get_query_fingerprint(query, options.get("snuba.query-cache.time-granularity"))
     else:
         hashable = json.dumps(query)
 
@@ -1086,6 +1302,17 @@ def get_cache_key(query: Request) -> str:
     return f"sqc:{sha1(hashable.encode('utf-8')).hexdigest()}"
 
 
+def _should_cache(snuba_request: SnubaRequest, use_cache: bool | None) -> bool:
+    if use_cache:
+        return True
+    referrer = snuba_request.referrer
+    return bool(referrer) and referrer in options.get("snuba.query-cache.referrers")
+
+
+def _get_metric_tags(snuba_request: SnubaRequest) -> dict[str, str] | None:
+    return {"referrer": snuba_request.referrer} if snuba_request.referrer else None
+
+
 def _apply_cache_and_build_results(
     snuba_requests: Sequence[SnubaRequest],
     use_cache: bool | None = False,
@@ -1105,34 +1332,52 @@ def _apply_cache_and_build_results(
 
     to_query: list[tuple[int, SnubaRequest, str | None]] = []
 
-    if use_cache:
-        cache_keys = [
-            get_cache_key(snuba_request.request) for _, snuba_request in snuba_requests_list
-        ]
-        cache_data = cache.get_many(cache_keys)
-        for (query_pos, snuba_request), cache_key in zip(snuba_requests_list, cache_keys):
-            cached_result = cache_data.get(cache_key)
-            metric_tags = {"referrer": snuba_request.referrer} if snuba_request.referrer else None
-            if cached_result is None:
-                metrics.incr("snuba.query_cache.miss", tags=metric_tags)
-                to_query.append((query_pos, snuba_request, cache_key))
-            else:
-                metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
-    else:
-        for query_pos, snuba_request in snuba_requests_list:
+    cache_keys = {
+        query_pos: get_cache_key(snuba_request.request)
+        for query_pos, snuba_request in snuba_requests_list
+        if _should_cache(snuba_request, use_cache)
+    }
+    cache_data = cache.get_many(list(cache_keys.values())) if cache_keys else {}
+    for query_pos, snuba_request in snuba_requests_list:
+        cache_key = cache_keys.get(query_pos)
+        if cache_key is None:
             to_query.append((query_pos, snuba_request, None))
+            continue
+
+        cached_result = cache_data.get(cache_key)
+        metric_tags = _get_metric_tags(snuba_request)
+        if cached_result is None:
+            metrics.incr("snuba.query_cache.miss", tags=metric_tags)
+            to_query.append((query_pos, snuba_request, cache_key))
+        else:
+            metrics.incr("snuba.query_cache.hit", tags=metric_tags)
+            results.append((query_pos, json.loads(cached_result)))
+
+    to_query, in_flight_results = _claim_queries(to_query)
+    results.extend(in_flight_results)
 
     if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query])
-        for result, (query_pos, _, opt_cache_key) in zip(query_results, to_query):
-            if opt_cache_key:
-                cache.set(
-                    opt_cache_key,
-                    json.dumps(result),
-                    settings.SENTRY_SNUBA_CACHE_TTL_SECONDS,
-                )
-            results.append((query_pos, result))
+        cached_keys = set()
+        try:
+            query_results = _bulk_snuba_query([item[1] for item in to_query])
+            max_result_size = options.get("snuba.query-cache.max-result-size")
+            for result, (query_pos, snuba_request, opt_cache_key) in zip(query_results, to_query):
+                if opt_cache_key:
+                    serialized_result = json.dumps(result)
+                    if len(serialized_result) <= max_result_size:
+                        cache.set(
+                            opt_cache_key,
+                            serialized_result,
+                            settings.SENTRY_SNUBA_CACHE_TTL_SECONDS,
+                        )
+                        cached_keys.add(opt_cache_key)
+                    else:
+                        metrics.incr(
+                            "snuba.query_cache.too_large", tags=_get_metric_tags(snuba_request)
+                        )
+                results.append((query_pos, result))
+        finally:
+            _release_queries(to_query, cached_keys)
 
     # Sort so that we get the results back in the original param list order
     results.sort()
@@ -1140,6 +1385,97 @@ def _apply_cache_and_build_results(
     return [result[1] for result in results]
 
 
+def _get_single_flight_key(cache_key: str) -> str:
+    return f"{cache_key}:in-flight"
+
+
+def _claim_queries(
+    to_query: list[tuple[int, SnubaRequest, str | None]],
+) -> tuple[list[tuple[int, SnubaRequest, str | None]], list[tuple[int, Any]]]:
+    """
+    Single-flight deduplication of cached queries across processes.
+
+    Every cached query that is about to be run is claimed in the cache. Queries
+    already claimed by another process are not run, instead their results are
+    awaited in the cache for up to `snuba.query-cache.single-flight-wait`
+    seconds, polling with a growing interval. Queries whose results don't show
+    up in time, or whose claim is released without a result because the query
+    failed or its result was too large to cache, are run anyway.
+
+    Returns the queries to run, and the results of awaited queries.
+    """
+    wait = options.get("snuba.query-cache.single-flight-wait")
+    if wait <= 0:
+        return to_query, []
+
+    claimed = []
+    waiting: dict[str, list[tuple[int, SnubaRequest, str | None]]] = {}
+    for item in to_query:
+        cache_key = item[2]
+        # `add` only succeeds if there's no claim on the query yet
+        if cache_key is None or cache.add(_get_single_flight_key(cache_key), 1, math.ceil(wait)):
+            claimed.append(item)
+        else:
+            waiting.setdefault(cache_key, []).append(item)
+
+    def stop_waiting(cache_key: str, result: str) -> list[tuple[int, SnubaRequest, str | None]]:
+        items = waiting.pop(cache_key)
+        for _, snuba_request, _ in items:
+            metrics.incr(
+                "snuba.query_cache.single_flight",
+                tags={**(_get_metric_tags(snuba_request) or {}), "result": result},
+            )
+        return items
+
+    results = []
+    interval = SINGLE_FLIGHT_POLL_INTERVAL
+    deadline = time.monotonic() + wait
+    while waiting and time.monotonic() < deadline:
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        interval = min(interval * 2, SINGLE_FLIGHT_MAX_POLL_INTERVAL)
+
+        claim_keys = {cache_key: _get_single_flight_key(cache_key) for cache_key in waiting}
+        cache_data = cache.get_many([*claim_keys, *claim_keys.values()])
+        for cache_key, claim_key in claim_keys.items():
+            cached_result = cache_data.get(cache_key)
+            if cached_result is not None:
+                for query_pos, _, _ in stop_waiting(cache_key, "hit"):
+                    results.append((query_pos, json.loads(cached_result)))
+            elif cache_data.get(claim_key) in (None, SINGLE_FLIGHT_NO_RESULT):
+                # The other process is done, but there's no result to share
+                for query_pos, snuba_request, _ in stop_waiting(cache_key, "no_result"):
+                    claimed.append((query_pos, snuba_request, None))
+
+    for cache_key in list(waiting):
+        for query_pos, snuba_request, _ in stop_waiting(cache_key, "timeout"):
+            # The result didn't show up, but don't remove the other process' claim
+            claimed.append((query_pos, snuba_request, None))
+
+    return claimed, results
+
+
+def _release_queries(
+    to_query: list[tuple[int, SnubaRequest, str | None]], cached_keys: Collection[str]
+) -> None:
+    """
+    Releases the claims of the queries that were run. Claims of queries whose
+    result wasn't cached are marked instead, so that processes waiting for the
+    result stop waiting right away.
+    """
+    wait = options.get("snuba.query-cache.single-flight-wait")
+    if wait <= 0:
+        return
+    cache_keys = [cache_key for _, _, cache_key in to_query if cache_key]
+    released = [_get_single_flight_key(key) for key in cache_keys if key in cached_keys]
+    if released:
+        cache.delete_many(released)
+    marked = [_get_single_flight_key(key) for key in cache_keys if key not in cached_keys]
+    if marked:
+        cache.set_many(
+            {claim_key: SINGLE_FLIGHT_NO_RESULT for claim_key in marked}, math.ceil(wait)
+        )
+
+
 def _is_rejected_query(body: Any) -> bool:
     return (
         "quota_allowance" in body
@@ -1302,24 +1638,34 @@ def _snuba_query(
                 # but we still want to know a general sense of how referrers impact performance
                 sentry_sdk.set_tag("query.referrer", referrer)
 
-                if isinstance(request.query, MetricsQuery):
-                    return (
-                        referrer,
-                        _raw_mql_query(request, headers),
-                        snuba_request.forward,
-                        snuba_request.reverse,
-                    )
-                elif isinstance(request.query, DeleteQuery):
-                    return (
-                        referrer,
-                        _raw_delete_query(request, headers),
-                        snuba_request.forward,
-                        snuba_request.reverse,
+                if isinstance(request.query, DeleteQuery):
+                    # Deletes are never coalesced, they aren't idempotent
+                    with _query_scheduler.slot(referrer):
+                        return (
+                            referrer,
+                            _raw_delete_query(request, headers),
+                            snuba_request.forward,
+                            snuba_request.reverse,
+                        )
+
+                raw_query = (
+                    _raw_mql_query if isinstance(request.query, MetricsQuery) else _raw_snql_query
+                )
+
+                def run_query() -> urllib3.response.HTTPResponse:
+                    with _query_scheduler.slot(referrer):
+                        return raw_query(request, headers)
+
+                if options.get("snuba.query-coalescing.enabled"):
+                    response = _query_coalescer.run(
+                        get_query_fingerprint(request), referrer, run_query
                     )
+                else:
+                    response = run_query()
 
                 return (
                     referrer,
-                    _raw_snql_query(request, headers),
+                    response,
                     snuba_request.forward,
                     snuba_request.reverse,
                 )
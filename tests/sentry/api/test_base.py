@@ -11,6 +11,7 @@ from rest_framework.permissions import AllowAny, BasePermission
 from rest_framework.response import Response
 from sentry_sdk import Scope
 
+from sentry import features
 from sentry.api.base import Endpoint, EndpointSiloLimit
 from sentry.api.exceptions import SuperuserRequired
 from sentry.api.paginator import GenericOffsetPaginator
@@ -105,6 +106,15 @@ class DummyPaginationStreamingEndpoint(Endpoint):
         )
 
 
+class DummyFeatureCheckEndpoint(Endpoint):
+    permission_classes: tuple[type[BasePermission], ...] = ()
+
+    def get(self, request):
+        for _ in range(4):
+            features.has("auth:register", actor=request.user)
+        return Response({"ok": True})
+
+
 _dummy_endpoint = DummyEndpoint.as_view()
 _dummy_streaming_endpoint = DummyPaginationStreamingEndpoint.as_view()
 
@@ -318,6 +328,25 @@ class EndpointTest(APITestCase):
         # did not try to convert args
         assert not mock_convert_args.info.called
 
+    @override_options({"features.request-cache.enabled": True})
+    def test_feature_check_cache(self):
+        request = self.make_request(method="GET")
+        response = DummyFeatureCheckEndpoint.as_view()(request)
+
+        assert response.status_code == 200, response.content
+        stats = dict(part.split("=") for part in response["X-Sentry-Feature-Checks"].split("; "))
+        # The endpoint checks the same feature 4 times
+        assert int(stats["checks"]) >= 4
+        assert int(stats["hits"]) >= 3
+        assert float(stats["duration_ms"]) > 0
+
+    def test_feature_check_cache_disabled(self):
+        request = self.make_request(method="GET")
+        response = DummyFeatureCheckEndpoint.as_view()(request)
+
+        assert response.status_code == 200, response.content
+        assert "X-Sentry-Feature-Checks" not in response
+
 
 class EndpointHandleExceptionTest(APITestCase):
     @mock.patch("rest_framework.views.APIView.handle_exception", return_value=Response(status=500))
@@ -12,8 +12,10 @@ from django.utils import timezone
 from sentry import options
 from sentry.buffer.redis import (
     BufferHookEvent,
+    IncrAggregator,
     RedisBuffer,
     _get_model_key,
+    _shutdown_incr_aggregation,
     redis_buffer_registry,
     redis_buffer_router,
 )
@@ -211,6 +213,117 @@ class TestRedisBuffer:
         else:
             assert pending == [key.encode("utf-8")]
 
+    def test_incr_aggregation_coalesces_until_threshold(self):
+        self.buf.incr_aggregator = IncrAggregator(max_keys=2, window=60)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        columns = ["times_seen"]
+        filters = {"pk": 1}
+
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        self.buf.incr(model, {"times_seen": 5}, filters)
+        # nothing is written while only one distinct key is pending
+        assert self.buf.get(model, columns, filters=filters) == {"times_seen": 0}
+
+        with mock.patch("sentry.buffer.redis.metrics") as mock_metrics:
+            self.buf.incr(model, {"times_seen": 2}, {"pk": 2})
+
+        assert self.buf.get(model, columns, filters=filters) == {"times_seen": 6}
+        assert self.buf.get(model, columns, filters={"pk": 2}) == {"times_seen": 2}
+        assert len(self.buf.incr_aggregator) == 0
+        mock_metrics.incr.assert_any_call("buffer.incr.coalesced", amount=1, skip_internal=True)
+
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        pending = client.zrange("b:p", 0, -1)
+        if not self.buf.is_redis_cluster:
+            pending = [p.decode("utf-8") for p in pending]
+        assert sorted(pending) == sorted(
+            [self.buf._make_key(model, filters), self.buf._make_key(model, {"pk": 2})]
+        )
+
+    def test_incr_aggregation_flush(self):
+        self.buf.incr_aggregator = IncrAggregator(max_keys=100, window=60)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        now = datetime.datetime(2017, 5, 3, 6, 6, 6, tzinfo=datetime.UTC)
+        filters = {"pk": 1}
+
+        self.buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "bar"})
+        self.buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "baz", "datetime": now})
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 0}
+
+        self.buf.flush_aggregated_incrs()
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 2}
+
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        result = _hgetall_decode_keys(
+            client, self.buf._make_key(model, filters), self.buf.is_redis_cluster
+        )
+        if self.buf.is_redis_cluster:
+
+            def load_value(x):
+                return self.buf._load_value(json.loads(x))
+
+        else:
+            load_value = pickle.loads
+        assert load_value(result["e+foo"]) == "baz"
+        assert load_value(result["e+datetime"]) == now
+
+    def test_incr_aggregation_window_elapsed(self):
+        self.buf.incr_aggregator = IncrAggregator(max_keys=100, window=10)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+
+        with freeze_time("2017-05-03 06:06:06") as frozen_time:
+            self.buf.incr(model, {"times_seen": 1}, filters)
+            assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 0}
+            frozen_time.shift(11)
+            self.buf.incr(model, {"times_seen": 1}, filters)
+
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 2}
+
+    def test_incr_aggregation_write_failure(self):
+        self.buf.incr_aggregator = IncrAggregator(max_keys=100, window=60)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        pipe = mock.Mock()
+        pipe.execute.side_effect = Exception("boom")
+        client = mock.Mock()
+        client.pipeline.return_value = pipe
+        with (
+            mock.patch.object(self.buf.cluster, "pipeline", return_value=pipe, create=True),
+            mock.patch.object(
+                self.buf.cluster, "get_local_client", return_value=client, create=True
+            ),
+            mock.patch("sentry.buffer.redis.metrics") as mock_metrics,
+        ):
+            self.buf.flush_aggregated_incrs()
+
+        # the pipeline may have partially applied, so the increment isn't retried
+        mock_metrics.incr.assert_any_call(
+            "buffer.incr.aggregated-dropped", amount=1, skip_internal=True
+        )
+        assert len(self.buf.incr_aggregator) == 0
+        self.buf.incr(model, {"times_seen": 2}, filters)
+        self.buf.flush_aggregated_incrs()
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 2}
+
+    def test_incr_aggregation_flushed_on_shutdown(self):
+        self.buf.incr_aggregator = IncrAggregator(max_keys=100, window=60)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        _shutdown_incr_aggregation(sender=None)
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 1}
+        assert self.buf._flush_thread_stop is not None
+        assert self.buf._flush_thread_stop.is_set()
+
     def group_rule_data_by_project_id(self, buffer, project_ids):
         project_ids_to_rule_data = defaultdict(list)
         for proj_id in project_ids:
@@ -365,6 +365,54 @@ class FeatureManagerTest(TestCase):
         assert manager.has("projects:feature", actor=self.user, project=self.project)
         assert manager.has("auth:register", actor=self.user)
 
+    def test_request_cache(self):
+        manager = features.FeatureManager()
+        manager.add("organizations:feature", OrganizationFeature)
+        handler = mock.Mock(spec=features.FeatureHandler)
+        handler.has.return_value = True
+        manager.add_entity_handler(handler)
+
+        assert manager.has("organizations:feature", self.organization, actor=self.user)
+        assert manager.has("organizations:feature", self.organization, actor=self.user)
+        assert handler.has.call_count == 2
+
+        with manager.request_cache() as check_cache:
+            assert manager.has("organizations:feature", self.organization, actor=self.user)
+            assert manager.has(
+                "organizations:feature", organization=self.organization, actor=self.user
+            )
+            assert handler.has.call_count == 3
+
+            # Checks for another actor aren't shared
+            assert manager.has("organizations:feature", self.organization)
+            assert handler.has.call_count == 4
+            assert (check_cache.hits, check_cache.misses) == (1, 2)
+
+        # Results are only memoized within the block
+        assert manager.has("organizations:feature", self.organization, actor=self.user)
+        assert handler.has.call_count == 5
+
+    def test_request_cache_prefetch(self):
+        manager = features.FeatureManager()
+        manager.add("organizations:feature", OrganizationFeature)
+        manager.add("projects:feature", ProjectFeature)
+        manager.add_entity_handler(MockBatchHandler())
+
+        with (
+            mock.patch.object(MockBatchHandler, "has", return_value=True) as mock_has,
+            manager.request_cache() as check_cache,
+        ):
+            manager.prefetch(
+                ["organizations:feature", "projects:feature"],
+                actor=self.user,
+                projects=[self.project],
+                organization=self.organization,
+            )
+            assert manager.has("organizations:feature", self.organization, actor=self.user)
+            assert manager.has("projects:feature", self.project, actor=self.user)
+            assert mock_has.call_count == 0
+            assert check_cache.hits == 2
+
     def test_user_flag(self):
         manager = features.FeatureManager()
         manager.add("users:feature", UserFeature)
@@ -15,12 +15,14 @@ from sentry.grouping.enhancer import (
     is_valid_profiling_matcher,
     keep_profiling_rules,
 )
+from sentry.grouping.enhancer import cache as enhancements_cache
 from sentry.grouping.enhancer.actions import EnhancementAction
 from sentry.grouping.enhancer.exceptions import InvalidEnhancerConfig
 from sentry.grouping.enhancer.matchers import ReturnValueCache, _cached, create_match_frame
 from sentry.grouping.enhancer.parser import parse_enhancements
 from sentry.grouping.enhancer.rules import EnhancementRule
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 
 
 def convert_to_dict(obj: object) -> object | dict[str, Any]:
@@ -131,6 +133,47 @@ def test_basic_parsing(insta_snapshot, version):
     assert isinstance(enhancements_str, str)
 
 
+def test_from_base64_string_cached():
+    enhancements_cache.clear_cache()
+    enhancements_str = Enhancements.from_rules_text("function:foo -app").base64_string
+
+    enhancements = Enhancements.from_base64_string(enhancements_str)
+    assert Enhancements.from_base64_string(enhancements_str) is enhancements
+    assert Enhancements.from_base64_string(enhancements_str.encode("ascii")) is enhancements
+
+    enhancements_cache.clear_cache()
+    assert Enhancements.from_base64_string(enhancements_str) is not enhancements
+
+
+def test_from_base64_string_invalid():
+    enhancements_cache.clear_cache()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            Enhancements.from_base64_string("invalid")
+
+
+def test_warm_enhancements_cache():
+    enhancements_cache.clear_cache()
+    enhancements_str = Enhancements.from_rules_text("function:bar -app").base64_string
+
+    with override_options({"grouping.enhancements.hot-configs-sample-rate": 1.0}):
+        Enhancements.from_base64_string(enhancements_str)
+
+    cache_key = enhancements_cache.get_cache_key(enhancements_str.encode("ascii"))
+    enhancements_cache.clear_cache()
+
+    enhancements_cache.warm_enhancements_cache()
+    assert enhancements_cache.get_cached_enhancements(cache_key) is None
+
+    with override_options({"grouping.enhancements.warm-cache-size": 10}):
+        enhancements_cache.warm_enhancements_cache()
+
+    enhancements = enhancements_cache.get_cached_enhancements(cache_key)
+    assert enhancements is not None
+    assert enhancements.base64_string == enhancements_str
+    assert Enhancements.from_base64_string(enhancements_str) is enhancements
+
+
 def test_parse_empty_with_base():
     enhancements = Enhancements.from_rules_text(
         "",
@@ -8,6 +8,7 @@ from sentry.grouping.api import GroupingConfig
 from sentry.grouping.ingest.hashing import (
     _calculate_event_grouping,
     _calculate_secondary_hashes,
+    bulk_get_or_create_grouphashes,
     get_or_create_grouphashes,
 )
 from sentry.grouping.variants import BaseVariant
@@ -201,3 +202,55 @@ class SecondaryGroupingTest(TestCase):
                 legacy_config_hash,
                 default_config_hash,
             }
+
+
+class BulkGetOrCreateGrouphashesTest(TestCase):
+    def test_creates_missing_grouphashes(self) -> None:
+        existing_grouphash = GroupHash.objects.create(project=self.project, hash="dogs")
+
+        with self.assertNumQueries(3):
+            result = bulk_get_or_create_grouphashes(
+                self.project, ["cats", "dogs", "maisey", "cats"]
+            )
+
+        assert [(grouphash.hash, created) for grouphash, created in result] == [
+            ("cats", True),
+            ("dogs", False),
+            ("maisey", True),
+        ]
+        assert result[1][0].id == existing_grouphash.id
+        assert all(grouphash.id is not None for grouphash, _ in result)
+        assert GroupHash.objects.filter(project=self.project).count() == 3
+
+    def test_single_query_when_all_exist(self) -> None:
+        GroupHash.objects.create(project=self.project, hash="dogs")
+        GroupHash.objects.create(project=self.project, hash="cats")
+
+        with self.assertNumQueries(1):
+            result = bulk_get_or_create_grouphashes(self.project, ["dogs", "cats"])
+
+        assert [(grouphash.hash, created) for grouphash, created in result] == [
+            ("dogs", False),
+            ("cats", False),
+        ]
+
+    def test_skips_missing_grouphashes_without_create(self) -> None:
+        GroupHash.objects.create(project=self.project, hash="dogs")
+
+        result = bulk_get_or_create_grouphashes(
+            self.project, ["cats", "dogs"], create_missing=False
+        )
+
+        assert [(grouphash.hash, created) for grouphash, created in result] == [("dogs", False)]
+        assert not GroupHash.objects.filter(project=self.project, hash="cats").exists()
+
+    def test_other_project_grouphashes_ignored(self) -> None:
+        other_project = self.create_project()
+        GroupHash.objects.create(project=other_project, hash="dogs")
+
+        result = bulk_get_or_create_grouphashes(self.project, ["dogs"])
+
+        assert len(result) == 1
+        grouphash, created = result[0]
+        assert created is True
+        assert grouphash.project_id == self.project.id
@@ -18,10 +18,13 @@ from sentry.eventstore.snuba.backend import SnubaEventStorage
 from sentry.issues.grouptype import PerformanceSlowDBQueryGroupType, ProfileFileIOGroupType
 from sentry.issues.issue_occurrence import IssueOccurrence
 from sentry.issues.occurrence_consumer import (
+    BatchContext,
     EventLookupError,
     InvalidEventPayloadError,
     _get_kwargs,
     _process_message,
+    get_rate_limited_occurrences,
+    prepare_batch_context,
     process_occurrence_group,
 )
 from sentry.issues.producer import _prepare_status_change_message
@@ -305,6 +308,87 @@ class IssueOccurrenceProcessMessageTest(IssueOccurrenceTestBase):
         assert rate_limit_quota.granularity_seconds == 60
         assert rate_limit_quota.limit == 1000
 
+    def test_batch_rate_limit(self) -> None:
+        message1 = get_test_message(self.project.id, fingerprint=["a"])
+        message2 = get_test_message(self.project.id, fingerprint=["a"])
+        message3 = get_test_message(self.project.id, fingerprint=["b"])
+        with self.options(
+            {
+                "issues.occurrence-consumer.rate-limit.enabled": True,
+                "issues.occurrence-consumer.rate-limit.quota": {
+                    "window_seconds": 3600,
+                    "granularity_seconds": 60,
+                    "limit": 1,
+                },
+            }
+        ):
+            rate_limited = get_rate_limited_occurrences([message1, message2, message3])
+            assert rate_limited == {message2["id"]}
+
+            # the quota of both fingerprints is used up now
+            rate_limited = get_rate_limited_occurrences([message1, message3])
+            assert rate_limited == {message1["id"], message3["id"]}
+
+    def test_batch_rate_limit_disabled(self) -> None:
+        message = get_test_message(self.project.id)
+        assert get_rate_limited_occurrences([message]) == frozenset()
+
+    @mock.patch("sentry.issues.occurrence_consumer.rate_limiter.check_and_use_quotas")
+    def test_batch_context_rate_limit(self, check_and_use_quotas: mock.MagicMock) -> None:
+        message = get_test_message(self.project.id)
+        other_message = get_test_message(self.project.id)
+        batch_context = BatchContext(
+            rate_limit_checked_ids=frozenset([message["id"], other_message["id"]]),
+            rate_limited_ids=frozenset([message["id"]]),
+        )
+        with (
+            self.feature("organizations:profile-file-io-main-thread-ingest"),
+            self.options({"issues.occurrence-consumer.rate-limit.enabled": True}),
+        ):
+            assert _process_message(message, batch_context) is None
+            result = _process_message(other_message, batch_context)
+        assert result is not None
+        assert not check_and_use_quotas.called
+
+    def test_batch_context_kwargs(self) -> None:
+        message = get_test_message(self.project.id)
+        with self.feature("organizations:profile-file-io-main-thread-ingest"):
+            batch_context = prepare_batch_context([message])
+            with mock.patch(
+                "sentry.issues.occurrence_consumer._get_kwargs", side_effect=_get_kwargs
+            ) as get_kwargs:
+                result = _process_message(message, batch_context)
+        assert result is not None
+        # the occurrence was parsed when preparing the batch
+        assert not get_kwargs.called
+        assert batch_context.take_kwargs(message["id"]) is None
+
+    @mock.patch("sentry.issues.occurrence_consumer.get_rate_limited_occurrences")
+    def test_batch_context_skips_dropped_occurrences(
+        self, get_rate_limited_occurrences: mock.MagicMock
+    ) -> None:
+        get_rate_limited_occurrences.return_value = frozenset()
+        message = get_test_message(self.project.id)
+        processed_message = get_test_message(self.project.id)
+        invalid_message = get_test_message(self.project.id)
+        del invalid_message["issue_title"]
+        cache.set(f"occurrence_consumer.process_occurrence_group.{processed_message['id']}", 1)
+
+        with self.feature("organizations:profile-file-io-main-thread-ingest"):
+            batch_context = prepare_batch_context(
+                [message, message, processed_message, invalid_message]
+            )
+        get_rate_limited_occurrences.assert_called_once_with([message])
+        assert batch_context.rate_limit_checked_ids == {message["id"]}
+        assert set(batch_context.kwargs) == {message["id"], invalid_message["id"]}
+        with pytest.raises(InvalidEventPayloadError):
+            batch_context.take_kwargs(invalid_message["id"])
+
+        # the type of the occurrence may not be ingested without the feature
+        get_rate_limited_occurrences.reset_mock()
+        prepare_batch_context([get_test_message(self.project.id)])
+        get_rate_limited_occurrences.assert_called_once_with([])
+
 
 class IssueOccurrenceLookupEventIdTest(IssueOccurrenceTestBase):
     def test_lookup_event_doesnt_exist(self) -> None:
@@ -343,6 +427,27 @@ class IssueOccurrenceLookupEventIdTest(IssueOccurrenceTestBase):
         assert fetched_event is not None
         assert fetched_event.get_event_type() == "transaction"
 
+    def test_batch_context_lookup(self) -> None:
+        event = self.store_event(
+            data={"timestamp": before_now(minutes=1).isoformat()}, project_id=self.project.id
+        )
+        message = get_test_message(self.project.id, include_event=False, event_id=event.event_id)
+        missing_message = get_test_message(self.project.id, include_event=False)
+
+        with self.feature("organizations:profile-file-io-main-thread-ingest"):
+            batch_context = prepare_batch_context([message, missing_message])
+            assert list(batch_context.event_data) == [
+                Event.generate_node_id(self.project.id, event.event_id)
+            ]
+
+            with mock.patch("sentry.issues.occurrence_consumer.nodestore") as nodestore:
+                processed = _process_message(message, batch_context)
+        assert processed is not None
+        occurrence = processed[0]
+        assert occurrence is not None
+        assert occurrence.event_id == event.event_id
+        assert not nodestore.backend.get.called
+
 
 class ParseEventPayloadTest(IssueOccurrenceTestBase):
     def run_test(self, message: dict[str, Any]) -> None:
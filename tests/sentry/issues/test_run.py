@@ -10,7 +10,11 @@ from arroyo.types import Topic as ArroyoTopic
 from django.db import close_old_connections
 
 from sentry.conf.types.kafka_definition import Topic
-from sentry.issues.occurrence_consumer import _process_message, process_occurrence_group
+from sentry.issues.occurrence_consumer import (
+    BatchContext,
+    _process_message,
+    process_occurrence_group,
+)
 from sentry.issues.producer import (
     PayloadType,
     _prepare_occurrence_message,
@@ -28,8 +32,10 @@ from tests.sentry.issues.test_utils import OccurrenceTestMixin, StatusChangeTest
 
 
 # need to shut down the connections in the thread for tests to pass
-def process_occurrence_group_with_shutdown(items: list[Mapping[str, Any]]) -> None:
-    process_occurrence_group(items)
+def process_occurrence_group_with_shutdown(
+    items: list[Mapping[str, Any]], batch_context: BatchContext | None = None
+) -> None:
+    process_occurrence_group(items, batch_context)
     close_old_connections()
 
 
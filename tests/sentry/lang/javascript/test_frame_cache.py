@@ -0,0 +1,30 @@
+from sentry.lang.javascript.frame_cache import get_cache_keys
+
+DATA = {"platform": "javascript", "release": "abc", "dist": None}
+FRAMES = [
+    {"abs_path": "http://example.com/app.js", "lineno": 1, "colno": 10},
+    {"abs_path": "http://example.com/app.js", "lineno": 1, "colno": 20},
+    {"abs_path": "http://example.com/app.js", "lineno": 1, "colno": 30},
+]
+
+
+def test_get_cache_keys() -> None:
+    keys = get_cache_keys(1, DATA, [], FRAMES)
+    assert len(set(keys)) == 3
+    assert keys == get_cache_keys(1, dict(DATA), [], [dict(frame) for frame in FRAMES])
+
+    assert get_cache_keys(2, DATA, [], FRAMES) != keys
+    assert get_cache_keys(1, {**DATA, "release": "def"}, [], FRAMES) != keys
+    modules = [{"type": "sourcemap", "code_file": "app.js", "debug_id": "abc"}]
+    assert get_cache_keys(1, DATA, modules, FRAMES) != keys
+
+
+def test_get_cache_keys_neighbours() -> None:
+    keys = get_cache_keys(1, DATA, [], FRAMES)
+
+    # function names depend on adjacent frames
+    other_keys = get_cache_keys(1, DATA, [], [FRAMES[0], FRAMES[1], {**FRAMES[2], "colno": 40}])
+    assert other_keys[0] == keys[0]
+    assert other_keys[1] != keys[1]
+
+    assert get_cache_keys(1, DATA, [], FRAMES[1:])[0] != keys[1]
@@ -1,7 +1,11 @@
+import uuid
+from copy import deepcopy
 from unittest import TestCase
 from unittest.mock import Mock
 
+from sentry.lang.javascript import frame_cache
 from sentry.lang.javascript.processing import NODE_MODULES_RE, is_in_app, process_js_stacktraces
+from sentry.testutils.helpers import override_options
 
 
 class JavaScriptProcessingTest(TestCase):
@@ -265,3 +269,63 @@ class JavaScriptProcessingTest(TestCase):
         self.assertIsNone(
             result["symbolicated_in_app"]
         )  # Should be None since no frames are in_app
+
+    def _get_frame_cache_test_data_and_symbolicator(self, symbolicated_in_app=True):
+        frame_cache.clear_local_cache()
+        data, symbolicator = self._get_test_data_and_symbolicator(
+            in_app_frames=True, symbolicated_in_app=symbolicated_in_app
+        )
+        # keep cache keys unique between test runs
+        data["release"] = uuid.uuid4().hex
+        symbolicator.project.id = 1
+        return data, symbolicator
+
+    @override_options({"symbolicator.sourcemaps-frame-cache-enabled": True})
+    def test_process_js_stacktraces_frame_cache(self):
+        data, symbolicator = self._get_frame_cache_test_data_and_symbolicator()
+        result = process_js_stacktraces(symbolicator, deepcopy(data))
+        assert symbolicator.process_js.call_count == 1
+
+        cached_result = process_js_stacktraces(symbolicator, deepcopy(data))
+        assert symbolicator.process_js.call_count == 1
+        assert cached_result == result
+
+        # frames found in Redis only are symbolicated the same way
+        frame_cache.clear_local_cache()
+        cached_result = process_js_stacktraces(symbolicator, deepcopy(data))
+        assert symbolicator.process_js.call_count == 1
+        assert cached_result == result
+
+    @override_options({"symbolicator.sourcemaps-frame-cache-enabled": True})
+    def test_process_js_stacktraces_frame_cache_unsymbolicated(self):
+        data, symbolicator = self._get_frame_cache_test_data_and_symbolicator(
+            symbolicated_in_app=False
+        )
+        process_js_stacktraces(symbolicator, deepcopy(data))
+        result = process_js_stacktraces(symbolicator, deepcopy(data))
+        assert symbolicator.process_js.call_count == 2
+        self.assertFalse(result["symbolicated_in_app"])
+
+    @override_options({"symbolicator.sourcemaps-frame-cache-enabled": True})
+    def test_process_js_stacktraces_frame_cache_partial(self):
+        data, symbolicator = self._get_frame_cache_test_data_and_symbolicator()
+        process_js_stacktraces(symbolicator, deepcopy(data))
+
+        # a second stacktrace with other frames is sent to symbolicator on its own
+        exception = deepcopy(data["exception"]["values"][0])
+        for frame in exception["stacktrace"]["frames"]:
+            frame["lineno"] += 1
+        data["exception"]["values"].append(exception)
+        response = symbolicator.process_js.return_value
+        symbolicator.process_js.return_value = {
+            **response,
+            "stacktraces": response["stacktraces"][:1],
+            "raw_stacktraces": response["raw_stacktraces"][:1],
+        }
+
+        result = process_js_stacktraces(symbolicator, data)
+        assert symbolicator.process_js.call_count == 2
+        (sent_stacktrace,) = symbolicator.process_js.call_args.kwargs["stacktraces"]
+        assert sent_stacktrace["frames"][0]["lineno"] == 11
+        frames = [value["stacktrace"]["frames"] for value in result["exception"]["values"]]
+        assert frames[0][0]["function"] == frames[1][0]["function"] == "MyComponent.renderHeader"
@@ -1,4 +1,5 @@
 import copy
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -7,6 +8,7 @@ from sentry.lang.native.sources import (
     redact_internal_sources,
     reverse_aliases_map,
 )
+from sentry.lang.native.symbolicator import SymbolicatorSession
 from sentry.testutils.helpers import Feature
 from sentry.testutils.pytest.fixtures import django_db_all
 
@@ -279,3 +281,25 @@ class TestAliasReversion:
         reverse_aliases = reverse_aliases_map(builtin_sources)
         expected = {"sentry:ios-source": "sentry:ios", "sentry:tvos-source": "sentry:ios"}
         assert reverse_aliases == expected
+
+
+def test_session_pooled():
+    with SymbolicatorSession(url="http://symbolicator", timeout=5) as session:
+        http_session = session.session
+        assert http_session is not None
+    assert session.session is None
+
+    with SymbolicatorSession(url="http://symbolicator", timeout=5) as session:
+        # connections of the previous session are reused
+        assert session.session is http_session
+
+
+def test_session_pooled_per_thread():
+    def get_http_session():
+        with SymbolicatorSession(url="http://symbolicator", timeout=5) as session:
+            return session.session
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_session = executor.submit(get_http_session).result()
+
+    assert other_thread_session is not get_http_session()
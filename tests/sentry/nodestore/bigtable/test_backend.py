@@ -9,6 +9,9 @@ from google.cloud.bigtable.row_data import DEFAULT_RETRY_READ_ROWS
 from google.rpc.status_pb2 import Status
 
 from sentry.nodestore.bigtable.backend import BigtableNodeStorage
+from sentry.nodestore.zstd_dictionaries import train_dictionary, write_dictionary
+from sentry.utils import json
+from sentry.utils.codecs import ZstdDictCodec
 from sentry.utils.kvstore.bigtable import BigtableKVStorage
 
 
@@ -175,3 +178,36 @@ def test_compression() -> None:
     assert ns.store.compression == "zlib"
     ns = BigtableNodeStorage(compression=False)
     assert ns.store.compression is None
+
+
+def test_compression_dictionaries(tmp_path) -> None:
+    samples = [
+        json.dumps(
+            {"platform": "python", "event_id": f"{i:032x}", "tags": [["level", "error"]]}
+        ).encode()
+        for i in range(500)
+    ]
+    write_dictionary(str(tmp_path), train_dictionary(samples, size=4096))
+
+    ns = MockedBigtableNodeStorage(
+        project="test", compression="zstd-dict", compression_dictionaries_path=str(tmp_path)
+    )
+    data = {"platform": "python", "event_id": "a" * 32, "tags": [["level", "error"]]}
+    ns.set("node_1", data)
+
+    value = ns.store._get_table().read_row("node_1").cells["x"][b"0"][0].value
+    assert ZstdDictCodec.header.unpack_from(value) == (ZstdDictCodec.magic, 1)
+    assert json.loads(ns.get_bytes("node_1")) == data
+
+    # Rotating in a new dictionary keeps data written with the old one readable
+    write_dictionary(str(tmp_path), train_dictionary(samples, size=2048))
+    ns_2 = MockedBigtableNodeStorage(
+        project="test", compression="zstd-dict", compression_dictionaries_path=str(tmp_path)
+    )
+    ns_2.store._get_table()._rows = ns.store._get_table()._rows
+    assert json.loads(ns_2.get_bytes("node_1")) == data
+
+    ns_2.set("node_2", data)
+    value = ns_2.store._get_table().read_row("node_2").cells["x"][b"0"][0].value
+    assert ZstdDictCodec.header.unpack_from(value) == (ZstdDictCodec.magic, 2)
+    assert json.loads(ns_2.get_bytes("node_2")) == data
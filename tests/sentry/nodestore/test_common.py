@@ -4,6 +4,7 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 """
 
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
@@ -98,3 +99,37 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@override_options(
+    {
+        "nodestore.set-subkeys.enable-set-cache-item": False,
+        "nodestore.lru-cache.max-bytes": 1024 * 1024,
+    }
+)
+def test_lru_cache(ns):
+    ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+    ns.set("node_2", {"foo": "c"})
+
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": {"foo": "a"}, "node_2": {"foo": "c"}}
+
+    with mock.patch.object(ns, "_get_bytes_multi") as get_bytes_multi, mock.patch.object(
+        ns, "_get_bytes"
+    ) as get_bytes:
+        # every read, including subkeys, is served from the cached payload
+        assert ns.get("node_1") == {"foo": "a"}
+        assert ns.get("node_1", subkey="other") == {"foo": "b"}
+        assert ns.get_multi(["node_1", "node_2"]) == {
+            "node_1": {"foo": "a"},
+            "node_2": {"foo": "c"},
+        }
+        assert not get_bytes_multi.called
+        assert not get_bytes.called
+
+    ns.set("node_2", {"foo": "d"})
+    assert ns.get("node_2") == {"foo": "d"}
+
+    ns.delete_multi(["node_1", "node_2"])
+    assert ns.get("node_1") is None
+    assert ns.get("node_1", subkey="other") is None
+    assert ns.get("node_2") is None
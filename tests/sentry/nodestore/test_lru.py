@@ -0,0 +1,83 @@
+from unittest import mock
+
+from sentry.nodestore.lru import NodeLRUCache, get_lru_cache
+from sentry.testutils.helpers import override_options
+
+
+def test_get_set():
+    cache = NodeLRUCache(max_bytes=100, ttl=60)
+    cache.set("a", b"aaa")
+    assert cache.get("a") == b"aaa"
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "b"]) == {"a": b"aaa"}
+    assert cache.current_bytes == 3
+
+
+def test_overwrite_accounts_bytes():
+    cache = NodeLRUCache(max_bytes=100, ttl=60)
+    cache.set("a", b"aaa")
+    cache.set("a", b"aaaaa")
+    assert cache.current_bytes == 5
+    cache.set_many({"a": None})
+    assert "a" not in cache
+    assert cache.current_bytes == 0
+
+
+def test_evicts_least_recently_used():
+    cache = NodeLRUCache(max_bytes=10, ttl=60)
+    cache.set_many({"a": b"aaaa", "b": b"bbbb"})
+    # touch "a" so that "b" becomes the least recently used entry
+    assert cache.get("a") == b"aaaa"
+
+    with mock.patch("sentry.nodestore.lru.metrics") as mock_metrics:
+        cache.set("c", b"cccc")
+
+    assert "b" not in cache
+    assert cache.get_many(["a", "c"]) == {"a": b"aaaa", "c": b"cccc"}
+    assert cache.current_bytes == 8
+    mock_metrics.incr.assert_called_once_with(
+        "nodestore.lru.evict", amount=1, tags={"reason": "size"}
+    )
+
+
+def test_oversized_values_are_not_cached():
+    cache = NodeLRUCache(max_bytes=4, ttl=60)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbbb")
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_ttl():
+    cache = NodeLRUCache(max_bytes=100, ttl=10)
+    with mock.patch("time.monotonic", return_value=100.0):
+        cache.set("a", b"aaa")
+    with mock.patch("time.monotonic", return_value=109.0):
+        assert cache.get("a") == b"aaa"
+    with mock.patch("time.monotonic", return_value=110.0):
+        assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+def test_delete_many():
+    cache = NodeLRUCache(max_bytes=100, ttl=60)
+    cache.set_many({"a": b"aaa", "b": b"bbb"})
+    cache.delete_many(["a", "c"])
+    assert cache.get_many(["a", "b"]) == {"b": b"bbb"}
+    assert cache.current_bytes == 3
+
+
+def test_get_lru_cache_disabled_by_default():
+    assert get_lru_cache() is None
+
+
+@override_options({"nodestore.lru-cache.max-bytes": 100, "nodestore.lru-cache.ttl-seconds": 5.0})
+def test_get_lru_cache_applies_options():
+    cache = get_lru_cache()
+    assert cache is not None
+    assert cache.max_bytes == 100
+    assert cache.ttl == 5.0
+
+    with override_options({"nodestore.lru-cache.max-bytes": 200}):
+        assert get_lru_cache() is cache
+        assert cache.max_bytes == 200
@@ -1,6 +1,7 @@
 from time import time
+from unittest import mock
 
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.ratelimits.redis import RedisRateLimiter, _Lease, lease_values
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.datetime import freeze_time
 
@@ -71,3 +72,121 @@ class RedisRateLimiterTest(TestCase):
             assert self.backend.is_limited("foo", 1, self.project)
             self.backend.reset("foo", self.project)
             assert not self.backend.is_limited("foo", 1, self.project)
+
+
+class RedisRateLimiterLeaseTest(TestCase):
+    def setUp(self):
+        # leases of up to 10 values for a limit of 100
+        self.backend = RedisRateLimiter(lease_ratio=0.1, lease_holders=1)
+        # reads the counters in redis, including values leased but not used
+        self.counter = RedisRateLimiter()
+
+    def test_lease(self):
+        with freeze_time("2000-01-01"):
+            for expected_value in range(1, 11):
+                limited, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+                assert not limited
+                assert value == expected_value
+                assert self.backend.current_value("foo", window=60) == expected_value
+                # only the first call leases values from redis
+                assert self.counter.current_value("foo", window=60) == 10
+
+            _, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+            assert value == 11
+            assert self.counter.current_value("foo", window=60) == 20
+
+    def test_lease_headroom(self):
+        backend = RedisRateLimiter(lease_ratio=0.1, lease_holders=10)
+        with freeze_time("2000-01-01"):
+            # 10 holders lease at most half of the headroom of 100 together
+            backend.is_limited("foo", 100, window=60)
+            assert self.counter.current_value("foo", window=60) == 5
+
+            for _ in range(85):
+                self.counter.is_limited("foo", 100, window=60)
+            backend.release_leases()
+            assert self.counter.current_value("foo", window=60) == 86
+
+            # well before the limit, single values are leased
+            backend.is_limited("foo", 100, window=60)
+            assert self.counter.current_value("foo", window=60) == 87
+
+    def test_lease_limit(self):
+        with freeze_time("2000-01-01"):
+            for _ in range(100):
+                assert not self.backend.is_limited("foo", 100, window=60)
+            assert self.counter.current_value("foo", window=60) == 100
+
+            # close to the limit, single values are taken
+            limited, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+            assert limited
+            assert value == 101
+            assert self.counter.current_value("foo", window=60) == 101
+
+    def test_lease_shared(self):
+        other = RedisRateLimiter(lease_ratio=0.1, lease_holders=1)
+        with freeze_time("2000-01-01"):
+            _, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+            assert value == 1
+            _, value, _ = other.is_limited_with_value("foo", 100, window=60)
+            assert value == 11
+
+    def test_release_leases(self):
+        with freeze_time("2000-01-01"):
+            for _ in range(3):
+                self.backend.is_limited("foo", 100, window=60)
+            assert self.counter.current_value("foo", window=60) == 10
+
+            self.backend.release_leases()
+            assert self.counter.current_value("foo", window=60) == 3
+
+            _, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+            assert value == 4
+
+    def test_release_evicted_lease(self):
+        self.backend.max_leases = 1
+        with freeze_time("2000-01-01"):
+            self.backend.is_limited("foo", 100, window=60)
+            self.backend.is_limited("bar", 100, window=60)
+            assert self.counter.current_value("foo", window=60) == 1
+            assert self.counter.current_value("bar", window=60) == 10
+
+    def test_release_replaced_lease(self):
+        redis_key = self.backend._construct_redis_key("foo", window=60)
+
+        def lease_concurrently(*args, **kwargs):
+            # another thread leases values of the key in the meantime and uses one
+            end, lease_size = lease_values(*args, **kwargs)
+            self.backend._leases[redis_key] = _Lease(
+                limit=100, next_value=end - lease_size + 2, end=end, reset_time=int(time()) + 60
+            )
+            return lease_values(*args, **kwargs)
+
+        with freeze_time("2000-01-01"):
+            with mock.patch("sentry.ratelimits.redis.lease_values", side_effect=lease_concurrently):
+                self.backend.is_limited("foo", 100, window=60)
+            # the unused values of the replaced lease were returned
+            assert self.counter.current_value("foo", window=60) == 11
+
+    def test_drop_expired_leases(self):
+        with freeze_time("2000-01-01") as frozen_time:
+            self.backend.is_limited("foo", 100, window=60)
+            frozen_time.shift(60)
+            self.backend.is_limited("bar", 100, window=60)
+            assert list(self.backend._leases) == [
+                self.backend._construct_redis_key("bar", window=60)
+            ]
+
+    def test_no_lease_for_small_limits(self):
+        with freeze_time("2000-01-01"):
+            assert not self.backend.is_limited("foo", 10, window=60)
+            assert self.backend.current_value("foo", window=60) == 1
+
+    def test_reset(self):
+        with freeze_time("2000-01-01"):
+            self.backend.is_limited("foo", 100, window=60)
+            self.backend.reset("foo", window=60)
+            assert self.backend.current_value("foo", window=60) == 0
+
+            _, value, _ = self.backend.is_limited_with_value("foo", 100, window=60)
+            assert value == 1
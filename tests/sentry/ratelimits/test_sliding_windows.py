@@ -1,3 +1,5 @@
+from unittest import mock
+
 import pytest
 
 from sentry.ratelimits.sliding_windows import (
@@ -71,3 +73,27 @@ def test_basic(limiter):
         )
 
         assert resp == [GrantedQuota(prefix="foo", granted=0, reached_quotas=quotas)]
+
+
+def test_no_requests(limiter):
+    with mock.patch.object(limiter, "_impl") as impl:
+        assert limiter.check_within_quotas([], timestamp=TIMESTAMP_OFFSET) == (TIMESTAMP_OFFSET, [])
+    assert not impl.check_within_quotas.called
+
+
+def test_use_quotas_skips_denied_requests(limiter):
+    quotas = [Quota(window_seconds=10, granularity_seconds=1, limit=1)]
+    requests = [
+        RequestedQuota(prefix="foo", requested=1, quotas=quotas),
+        RequestedQuota(prefix="bar", requested=1, quotas=quotas),
+    ]
+    timestamp, grants = limiter.check_within_quotas(requests, timestamp=TIMESTAMP_OFFSET)
+    denied = [GrantedQuota(prefix="foo", granted=0, reached_quotas=quotas)]
+
+    with mock.patch.object(limiter, "_impl") as impl:
+        # nothing to consume, Redis isn't called at all
+        limiter.use_quotas(requests[:1], denied, timestamp)
+        assert not impl.use_quotas.called
+
+        limiter.use_quotas(requests, [denied[0], grants[1]], timestamp)
+        impl.use_quotas.assert_called_once_with(requests[1:], grants[1:], timestamp)
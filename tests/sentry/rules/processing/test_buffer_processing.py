@@ -10,6 +10,7 @@ from sentry.rules.processing.buffer_processing import (
     bucket_num_groups,
     process_buffer,
     process_in_batches,
+    shard_items,
 )
 from sentry.rules.processing.processor import PROJECT_ID_BUFFER_LIST_KEY
 from sentry.testutils.cases import PerformanceIssueTestCase, TestCase
@@ -29,6 +30,25 @@ def test_bucket_num_groups():
     assert bucket_num_groups(101) == ">100"
 
 
+def test_shard_items():
+    items = {"1:10": "a", "2:10": "b", "1:11": "c", "1:12": "d", "2:12": "e", "3:12": "f"}
+
+    def get_group_id(field: str) -> str:
+        return field.split(":")[1]
+
+    assert shard_items(items, 3, get_group_id) == [
+        {"1:10": "a", "2:10": "b", "1:11": "c"},
+        {"1:12": "d", "2:12": "e", "3:12": "f"},
+    ]
+    # A shard never gets split, even if it's larger than the batch size
+    assert shard_items(items, 2, get_group_id) == [
+        {"1:10": "a", "2:10": "b"},
+        {"1:11": "c"},
+        {"1:12": "d", "2:12": "e", "3:12": "f"},
+    ]
+    assert shard_items({}, 2, get_group_id) == []
+
+
 @freeze_time(FROZEN_TIME)
 class CreateEventTestCase(TestCase, BaseEventFrequencyPercentTest):
     def setUp(self):
@@ -292,3 +312,22 @@ class ProcessInBatchesTest(CreateEventTestCase):
 
         # Validate that we've cleared the original data to reduce storage usage
         assert not buffer.backend.get_hash(model=Project, field={"project_id": self.project.id})
+
+    @override_options({"delayed_processing.batch_size": 2})
+    @patch("sentry.rules.processing.delayed_processing.apply_delayed.delay")
+    def test_batch_keeps_groups_together(self, mock_apply_delayed):
+        rule_two = self.create_alert_rule()
+        self.push_to_hash(self.project.id, self.rule.id, self.group.id)
+        self.push_to_hash(self.project.id, self.rule.id, self.group_two.id)
+        self.push_to_hash(self.project.id, rule_two.id, self.group.id)
+        self.push_to_hash(self.project.id, rule_two.id, self.group_two.id)
+
+        process_in_batches(self.project.id, "delayed_processing")
+        assert mock_apply_delayed.call_count == 2
+
+        for call in mock_apply_delayed.call_args_list:
+            batch = buffer.backend.get_hash(
+                model=Project, field={"project_id": self.project.id, "batch_key": call[0][1]}
+            )
+            assert len(batch) == 2
+            assert len({field.split(":")[1] for field in batch}) == 1
@@ -20,11 +20,13 @@ from sentry.rules.conditions.event_frequency import (
 )
 from sentry.rules.processing.buffer_processing import process_in_batches
 from sentry.rules.processing.delayed_processing import (
+    ConditionResult,
     DataAndGroups,
     UniqueConditionQuery,
     apply_delayed,
     bulk_fetch_events,
     cleanup_redis_buffer,
+    evaluate_condition,
     generate_unique_queries,
     get_condition_group_results,
     get_condition_query_groups,
@@ -410,15 +412,21 @@ class GetRulesToFireTest(TestCase):
         self.rules_to_groups[self.rule1.id].add(self.group1.id)
         self.rules_to_groups[self.rule1.id].add(self.group2.id)
 
-        # Mock passes_comparison function
-        self.patcher = patch("sentry.rules.processing.delayed_processing.passes_comparison")
-        self.mock_passes_comparison = self.patcher.start()
+        # Mock evaluate_condition function
+        self.patcher = patch("sentry.rules.processing.delayed_processing.evaluate_condition")
+        self.mock_evaluate_condition = self.patcher.start()
 
     def tearDown(self):
         self.patcher.stop()
 
+    def set_passes_comparison(self, passes: bool) -> None:
+        group_ids = {self.group1.id, self.group2.id}
+        self.mock_evaluate_condition.return_value = ConditionResult(
+            evaluated_group_ids=group_ids, passing_group_ids=group_ids if passes else set()
+        )
+
     def test_comparison(self):
-        self.mock_passes_comparison.return_value = True
+        self.set_passes_comparison(True)
 
         result = get_rules_to_fire(
             self.condition_group_results,
@@ -430,7 +438,7 @@ class GetRulesToFireTest(TestCase):
         assert result[self.rule1] == {self.group1.id, self.group2.id}
 
     def test_comparison_fail_all(self):
-        self.mock_passes_comparison.return_value = False
+        self.set_passes_comparison(False)
 
         result = get_rules_to_fire(
             self.condition_group_results,
@@ -443,7 +451,7 @@ class GetRulesToFireTest(TestCase):
 
     def test_comparison_any(self):
         self.rule1.data["action_match"] = "any"
-        self.mock_passes_comparison.return_value = True
+        self.set_passes_comparison(True)
 
         result = get_rules_to_fire(
             self.condition_group_results,
@@ -456,7 +464,7 @@ class GetRulesToFireTest(TestCase):
 
     def test_comparison_any_fail(self):
         self.rule1.data["action_match"] = "any"
-        self.mock_passes_comparison.return_value = False
+        self.set_passes_comparison(False)
 
         result = get_rules_to_fire(
             self.condition_group_results,
@@ -471,8 +479,8 @@ class GetRulesToFireTest(TestCase):
         result = get_rules_to_fire({}, defaultdict(list), defaultdict(set), self.project.id)
         assert len(result) == 0
 
-    @patch("sentry.rules.processing.delayed_processing.passes_comparison", return_value=True)
-    def test_multiple_rules_and_groups(self, mock_passes):
+    def test_multiple_rules_and_groups(self):
+        self.set_passes_comparison(True)
         rule2 = self.create_project_rule(
             project=self.project,
             condition_data=[TEST_RULE_SLOW_CONDITION],
@@ -493,6 +501,109 @@ class GetRulesToFireTest(TestCase):
         assert result[rule2] == {self.group2.id}
 
 
+class EvaluateConditionTest(TestCase):
+    def setUp(self):
+        self.environment = self.create_environment()
+        self.count_query, self.comparison_query = generate_unique_queries(
+            {
+                **TEST_RULE_SLOW_CONDITION,
+                "comparisonType": ComparisonType.PERCENT,
+                "comparisonInterval": "1d",
+            },
+            self.environment.id,
+        )
+
+    def test_count_comparison(self):
+        result = evaluate_condition(
+            {self.count_query: {1: 2, 2: 1, 3: 5}},
+            TEST_RULE_SLOW_CONDITION,
+            self.environment.id,
+        )
+        assert result == ConditionResult(evaluated_group_ids={1, 2, 3}, passing_group_ids={1, 3})
+
+    def test_percent_comparison(self):
+        condition: EventFrequencyConditionData = {
+            **TEST_RULE_SLOW_CONDITION,
+            "value": 50,
+            "comparisonType": ComparisonType.PERCENT,
+            "comparisonInterval": "1d",
+        }
+        result = evaluate_condition(
+            {
+                self.count_query: {1: 20, 2: 11, 3: 5, 4: 3},
+                self.comparison_query: {1: 10, 2: 10, 3: 0},
+            },
+            condition,
+            self.environment.id,
+        )
+        # Group 4 has no comparison result, group 3's comparison value is 0
+        assert result == ConditionResult(evaluated_group_ids={1, 2, 3}, passing_group_ids={1})
+
+    def test_missing_query(self):
+        result = evaluate_condition({}, TEST_RULE_SLOW_CONDITION, self.environment.id)
+        assert result == ConditionResult(evaluated_group_ids=set(), passing_group_ids=set())
+
+
+class GetRulesToFireEvaluationTest(TestCase):
+    def setUp(self):
+        self.project = self.create_project()
+        self.environment = self.create_environment()
+        self.query = generate_unique_queries(TEST_RULE_SLOW_CONDITION, self.environment.id)[0]
+        self.higher_condition: EventFrequencyConditionData = {
+            **TEST_RULE_SLOW_CONDITION,
+            "value": 10,
+        }
+
+    def create_rule(self, action_match: str, conditions: list[EventFrequencyConditionData]):
+        rule = self.create_project_rule(
+            project=self.project,
+            condition_data=conditions,
+            environment_id=self.environment.id,
+        )
+        rule.data["action_match"] = action_match
+        return rule
+
+    def test_any_and_all(self):
+        any_rule = self.create_rule("any", [TEST_RULE_SLOW_CONDITION, self.higher_condition])
+        all_rule = self.create_rule("all", [TEST_RULE_SLOW_CONDITION, self.higher_condition])
+        rules_to_slow_conditions: DefaultDict[Rule, list[EventFrequencyConditionData]] = (
+            defaultdict(list)
+        )
+        rules_to_slow_conditions[any_rule] = [TEST_RULE_SLOW_CONDITION, self.higher_condition]
+        rules_to_slow_conditions[all_rule] = [TEST_RULE_SLOW_CONDITION, self.higher_condition]
+        rules_to_groups: DefaultDict[int, set[int]] = defaultdict(set)
+        rules_to_groups[any_rule.id] = {1, 2, 3}
+        rules_to_groups[all_rule.id] = {1, 2, 3}
+
+        result = get_rules_to_fire(
+            {self.query: {1: 1, 2: 5, 3: 20}},
+            rules_to_slow_conditions,
+            rules_to_groups,
+            self.project.id,
+        )
+
+        assert result == {any_rule: {2, 3}, all_rule: {3}}
+
+    @patch("sentry.rules.processing.delayed_processing.metrics")
+    def test_missing_query_result(self, mock_metrics):
+        rule = self.create_rule("any", [TEST_RULE_SLOW_CONDITION])
+        rules_to_slow_conditions: DefaultDict[Rule, list[EventFrequencyConditionData]] = (
+            defaultdict(list)
+        )
+        rules_to_slow_conditions[rule] = [TEST_RULE_SLOW_CONDITION]
+        rules_to_groups: DefaultDict[int, set[int]] = defaultdict(set)
+        rules_to_groups[rule.id] = {1, 2, 3}
+
+        result = get_rules_to_fire(
+            {self.query: {1: 5}}, rules_to_slow_conditions, rules_to_groups, self.project.id
+        )
+
+        assert result == {rule: {1}}
+        mock_metrics.incr.assert_called_once_with(
+            "delayed_processing.missing_query_result", amount=2
+        )
+
+
 class GetRulesToGroupsTest(TestCase):
     def test_empty_input(self):
         result = get_rules_to_groups({})
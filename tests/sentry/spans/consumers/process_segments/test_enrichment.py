@@ -1,4 +1,8 @@
-from sentry.spans.consumers.process_segments.enrichment import set_exclusive_time
+from sentry.spans.consumers.process_segments.enrichment import (
+    match_schemas,
+    set_exclusive_time,
+    set_shared_tags,
+)
 from tests.sentry.spans.consumers.process import build_mock_span
 
 # Tests ported from Relay
@@ -303,3 +307,98 @@ def test_only_immediate_child_spans_affect_calculation():
         "cccccccccccccccc": 400.0,
         "dddddddddddddddd": 400.0,
     }
+
+
+def test_unordered_child_spans():
+    spans = [
+        build_mock_span(
+            project_id=1,
+            start_timestamp_precise=1609455603.0,
+            end_timestamp_precise=1609455604.0,
+            span_id="cccccccccccccccc",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+        build_mock_span(
+            project_id=1,
+            start_timestamp_precise=1609455601.0,
+            end_timestamp_precise=1609455601.5,
+            span_id="dddddddddddddddd",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+        build_mock_span(
+            project_id=1,
+            is_segment=True,
+            start_timestamp_precise=1609455600.0,
+            end_timestamp_precise=1609455605.0,
+            span_id="aaaaaaaaaaaaaaaa",
+        ),
+        build_mock_span(
+            project_id=1,
+            start_timestamp_precise=1609455601.0,
+            end_timestamp_precise=1609455602.0,
+            span_id="bbbbbbbbbbbbbbbb",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+    ]
+
+    set_exclusive_time(spans)
+
+    exclusive_times = {span["span_id"]: span["exclusive_time"] for span in spans}
+    assert exclusive_times == {
+        "aaaaaaaaaaaaaaaa": 3000.0,
+        "bbbbbbbbbbbbbbbb": 1000.0,
+        "cccccccccccccccc": 1000.0,
+        "dddddddddddddddd": 500.0,
+    }
+
+
+def test_shared_tags_ttid_ttfd():
+    segment = build_mock_span(
+        project_id=1,
+        is_segment=True,
+        start_timestamp_precise=1609455600.0,
+        end_timestamp_precise=1609455605.0,
+        span_id="aaaaaaaaaaaaaaaa",
+        sentry_tags={"transaction": "MainActivity"},
+    )
+    spans = [
+        segment,
+        build_mock_span(
+            project_id=1,
+            span_op="ui.load.initial_display",
+            start_timestamp_precise=1609455600.0,
+            end_timestamp_precise=1609455601.0,
+            span_id="bbbbbbbbbbbbbbbb",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+        build_mock_span(
+            project_id=1,
+            start_timestamp_precise=1609455601.0,
+            end_timestamp_precise=1609455602.0,
+            span_id="cccccccccccccccc",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+        build_mock_span(
+            project_id=1,
+            span_op="ui.load.full_display",
+            start_timestamp_precise=1609455600.0,
+            end_timestamp_precise=1609455603.0,
+            span_id="dddddddddddddddd",
+            parent_span_id="aaaaaaaaaaaaaaaa",
+        ),
+    ]
+
+    match_schemas(spans)
+    set_shared_tags(segment, spans)
+
+    tags = {
+        span["span_id"]: (span["sentry_tags"].get("ttid"), span["sentry_tags"].get("ttfd"))
+        for span in spans
+    }
+    assert tags == {
+        "aaaaaaaaaaaaaaaa": (None, None),
+        "bbbbbbbbbbbbbbbb": ("ttid", "ttfd"),
+        "cccccccccccccccc": (None, "ttfd"),
+        "dddddddddddddddd": (None, "ttfd"),
+    }
+    assert all(span["sentry_tags"]["transaction"] == "MainActivity" for span in spans)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import itertools
+import threading
 from collections.abc import Sequence
 from unittest import mock
 
@@ -496,3 +497,174 @@ def test_flush_rebalance(buffer: SpansBuffer):
     assert not rv
 
     assert_clean(buffer.client)
+
+
+def _root_span(trace_id: str, span_id: str) -> Span:
+    return Span(
+        payload=_payload(span_id.encode("ascii")),
+        trace_id=trace_id,
+        span_id=span_id,
+        parent_span_id=None,
+        project_id=1,
+        is_segment_span=True,
+    )
+
+
+@pytest.mark.parametrize("flush_concurrency", [1, 4])
+def test_flush_max_segments_is_global(buffer: SpansBuffer, flush_concurrency):
+    buffer.flush_concurrency = flush_concurrency
+
+    # three traces landing on three different shards, becoming due one after
+    # another
+    process_spans([_root_span("a" * 32, "a" * 16)], buffer, now=0)
+    process_spans([_root_span("b" * 32, "b" * 16)], buffer, now=1)
+    process_spans([_root_span("c" * 32, "c" * 16)], buffer, now=2)
+
+    with mock.patch("sentry.spans.buffer.metrics") as mock_metrics:
+        rv = buffer.flush_segments(now=20, max_segments=2)
+
+    # the oldest segments are flushed first
+    assert set(rv) == {
+        _segment_id(1, "a" * 32, "a" * 16),
+        _segment_id(1, "b" * 32, "b" * 16),
+    }
+    lags = {
+        call.kwargs["tags"]["shard_i"]: call.args[1]
+        for call in mock_metrics.timing.mock_calls
+        if call.args and call.args[0] == "spans.buffer.flush_segments.flush_lag"
+    }
+    assert len(lags) == 32
+    assert sorted(lags.values())[-3:] == [8, 9, 10]
+
+    buffer.done_flush_segments(rv)
+    rv = buffer.flush_segments(now=20, max_segments=2)
+    assert set(rv) == {_segment_id(1, "c" * 32, "c" * 16)}
+
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+    assert_clean(buffer.client)
+
+
+def test_flush_concurrent(buffer: SpansBuffer):
+    buffer.flush_concurrency = 4
+    spans = [_root_span(f"{i:032x}", f"{i:016x}") for i in range(1, 50)]
+
+    process_spans(spans, buffer, now=0)
+
+    rv = buffer.flush_segments(now=11)
+    assert rv == {
+        _segment_id(1, span.trace_id, span.span_id): FlushedSegment(
+            queue_key=mock.ANY,
+            spans=[
+                _output_segment(
+                    span.span_id.encode("ascii"), span.span_id.encode("ascii"), True
+                )
+            ],
+        )
+        for span in spans
+    }
+
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+    assert_clean(buffer.client)
+
+    flush_executor = buffer.flush_executor
+    buffer.close()
+    assert flush_executor._shutdown
+
+
+def _child_spans(trace_id: str, parent_span_id: str, count: int) -> list[Span]:
+    return [
+        Span(
+            payload=_payload(f"{i:016x}".encode("ascii")),
+            trace_id=trace_id,
+            span_id=f"{i:016x}",
+            parent_span_id=parent_span_id,
+            project_id=1,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def test_flush_chunked_read(buffer: SpansBuffer):
+    buffer.segment_read_chunk_size = 3
+    spans = [_root_span("a" * 32, "a" * 16), *_child_spans("a" * 32, "a" * 16, 20)]
+
+    process_spans(spans, buffer, now=0)
+
+    rv = buffer.flush_segments(now=11)
+    _normalize_output(rv)
+    segment = rv[_segment_id(1, "a" * 32, "a" * 16)]
+    assert sorted(span.payload["span_id"] for span in segment.spans) == sorted(
+        span.span_id for span in spans
+    )
+
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+    assert_clean(buffer.client)
+
+
+@pytest.mark.parametrize("segment_read_chunk_size", [0, 3])
+def test_flush_max_segment_bytes(buffer: SpansBuffer, segment_read_chunk_size):
+    buffer.segment_read_chunk_size = segment_read_chunk_size
+    spans = [_root_span("a" * 32, "a" * 16), *_child_spans("a" * 32, "a" * 16, 20)]
+    buffer.max_segment_bytes = len(spans[0].payload) * 5
+
+    process_spans(spans, buffer, now=0)
+
+    rv = buffer.flush_segments(now=11)
+    segment = rv[_segment_id(1, "a" * 32, "a" * 16)]
+    assert len(segment.spans) == 5
+
+    # truncated segments are still removed from the buffer entirely
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+
+
+@pytest.mark.parametrize("segment_read_chunk_size", [0, 3])
+def test_flush_max_segment_bytes_keeps_first_span(buffer: SpansBuffer, segment_read_chunk_size):
+    buffer.segment_read_chunk_size = segment_read_chunk_size
+    spans = [_root_span("a" * 32, "a" * 16), *_child_spans("a" * 32, "a" * 16, 3)]
+    buffer.max_segment_bytes = 1
+
+    process_spans(spans, buffer, now=0)
+
+    rv = buffer.flush_segments(now=11)
+    assert len(rv[_segment_id(1, "a" * 32, "a" * 16)].spans) == 1
+
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+    assert_clean(buffer.client)
+
+
+def test_flush_chunked_read_concurrent(buffer: SpansBuffer):
+    buffer.flush_concurrency = 2
+    buffer.segment_read_chunk_size = 3
+    spans = [
+        *[_root_span("a" * 32, "a" * 16), *_child_spans("a" * 32, "a" * 16, 10)],
+        *[_root_span("b" * 32, "b" * 16), *_child_spans("b" * 32, "b" * 16, 10)],
+    ]
+
+    process_spans(spans, buffer, now=0)
+
+    sscan_threads = set()
+    sscan = buffer.client.sscan
+
+    def record_sscan(*args, **kwargs):
+        sscan_threads.add(threading.get_ident())
+        return sscan(*args, **kwargs)
+
+    with mock.patch.object(buffer.client, "sscan", side_effect=record_sscan):
+        rv = buffer.flush_segments(now=11)
+
+    assert {segment_key: len(segment.spans) for segment_key, segment in rv.items()} == {
+        _segment_id(1, "a" * 32, "a" * 16): 11,
+        _segment_id(1, "b" * 32, "b" * 16): 11,
+    }
+    # continuations are scanned on the flush executor, not the calling thread
+    assert sscan_threads
+    assert threading.get_ident() not in sscan_threads
+
+    buffer.done_flush_segments(rv)
+    assert buffer.flush_segments(now=30) == {}
+    assert_clean(buffer.client)
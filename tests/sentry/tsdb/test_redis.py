@@ -52,6 +52,27 @@ class RedisTSDBTest(TestCase):
         with self.db.cluster.all() as client:
             client.flushdb()
 
+    def test_get_range_shared_vnodes(self):
+        now = datetime.now(timezone.utc) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        def timestamp(d):
+            t = int(d.timestamp())
+            return t - (t % 3600)
+
+        # With 64 vnodes, keys 1, 65 and 129 share a hash per bucket
+        keys = [1, 65, 129, 2, "foo"]
+        for i, key in enumerate(keys):
+            self.db.incr(TSDBModel.project, key, dts[i % 4], count=i + 1)
+
+        results = self.db.get_range(TSDBModel.project, keys, dts[0], dts[-1])
+        assert results == {
+            key: [(timestamp(dt), i + 1 if j == i % 4 else 0) for j, dt in enumerate(dts)]
+            for i, key in enumerate(keys)
+        }
+
+        assert self.db.get_range(TSDBModel.project, [], dts[0], dts[-1]) == {}
+
     def test_make_counter_key(self):
         result = self.db.make_counter_key(TSDBModel.project, 1, to_datetime(1368889980), 1, None)
         assert result == ("ts:1:1368889980:1", 1)
@@ -309,6 +330,62 @@ class RedisTSDBTest(TestCase):
         )
         assert results == {1: 0, 2: 0}
 
+    def test_get_distinct_counts_buckets(self):
+        hour = int(datetime.now(timezone.utc).timestamp()) // 3600 * 3600 - 3 * 3600
+        series = list(range(hour - 120, hour + 2 * 3600 + 180, 60))
+
+        assert self.db.get_distinct_counts_buckets(60, series) == [
+            (60, hour - 120),
+            (60, hour - 60),
+            (3600, hour),
+            (3600, hour + 3600),
+            (60, hour + 7200),
+            (60, hour + 7260),
+            (60, hour + 7320),
+        ]
+
+        # Nothing coarser is fully contained
+        assert self.db.get_distinct_counts_buckets(60, series[:10]) == [
+            (60, timestamp) for timestamp in series[:10]
+        ]
+
+        # Coarser buckets which already expired can't be used
+        old_hour = hour - 48 * 3600
+        old_series = list(range(old_hour, old_hour + 3600, 60))
+        assert self.db.get_distinct_counts_buckets(60, old_series) == [
+            (60, timestamp) for timestamp in old_series
+        ]
+
+        assert self.db.get_distinct_counts_buckets(60, []) == []
+
+    @override_options(
+        {"redis.clusters": {"tsdb": {"hosts": {i - 6: {"db": i} for i in range(6, 9)}}}}
+    )
+    def test_count_distinct_totals_coarser_buckets(self):
+        # Keep minutes long enough for the hour buckets to be fully covered
+        db = RedisTSDB(
+            rollups=((ONE_MINUTE, 24 * 60), (ONE_HOUR, 24 * 7), (ONE_DAY, 30)),
+            vnodes=64,
+            cluster="tsdb",
+        )
+        model = TSDBModel.users_affected_by_group
+        hour = datetime.fromtimestamp(
+            int(datetime.now(timezone.utc).timestamp()) // 3600 * 3600 - 3 * 3600, timezone.utc
+        )
+
+        db.record(model, 1, ("foo", "bar"), hour - timedelta(minutes=1))
+        db.record(model, 1, ("bar", "baz"), hour + timedelta(minutes=30))
+        db.record(model, 1, ("qux",), hour + timedelta(minutes=61))
+
+        start = hour - timedelta(minutes=2)
+        end = hour + timedelta(minutes=61)
+        rollup, series = db.get_optimal_rollup_series(start, end, rollup=60)
+        assert (ONE_HOUR, int(hour.timestamp())) in db.get_distinct_counts_buckets(rollup, series)
+        assert db.get_distinct_counts_totals(model, [1], start, end, rollup=60) == {1: 4}
+        assert db.get_distinct_counts_totals(
+            model, [1], hour, hour + timedelta(minutes=59), rollup=60
+        ) == {1: 2}
+
     def test_frequency_tables(self):
         now = datetime.now(timezone.utc)
         model = TSDBModel.frequent_issues_by_project
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from sentry.testutils.performance_issues.event_generators import create_event, create_span
+from sentry.utils.performance_issues.base import (
+    DetectorType,
+    PerformanceDetector,
+    SpanIndex,
+    fingerprint_span,
+)
+from sentry.utils.performance_issues.performance_detection import run_detector_on_data
+from sentry.utils.performance_issues.types import Span
+
+
+def make_span(op: str, span_id: str, parent_span_id: str, **kwargs: Any) -> dict[str, Any]:
+    span = create_span(op, **kwargs)
+    span["span_id"] = span_id
+    span["parent_span_id"] = parent_span_id
+    return span
+
+
+class RecordingDetector(PerformanceDetector):
+    type = DetectorType.SLOW_DB_QUERY
+    settings_key = DetectorType.SLOW_DB_QUERY
+
+    def __init__(self, event: dict[str, Any], span_op_prefixes: list[str] | None = None) -> None:
+        super().__init__({DetectorType.SLOW_DB_QUERY: {}}, event)
+        self.span_op_prefixes = span_op_prefixes
+        self.visited: list[Span] = []
+        self.stored_problems = {}
+
+    def get_span_op_prefixes(self) -> list[str] | None:
+        return self.span_op_prefixes
+
+    def visit_span(self, span: Span) -> None:
+        self.visited.append(span)
+
+
+SPANS = [
+    make_span("db", "a" * 16, "f" * 16),
+    make_span("http.client", "b" * 16, "a" * 16, desc="GET /api/0/users/1"),
+    make_span("db.sql.query", "c" * 16, "a" * 16, duration=300.0),
+    make_span("http.server", "d" * 16, "c" * 16),
+    make_span("resource.script", "e" * 16, "f" * 16),
+]
+
+
+def test_iter_spans() -> None:
+    index = SpanIndex(SPANS)
+
+    assert list(index.iter_spans()) == SPANS
+    assert list(index.iter_spans(["db"])) == [SPANS[0], SPANS[2]]
+    assert list(index.iter_spans(["http", "db.sql"])) == [SPANS[1], SPANS[2], SPANS[3]]
+    assert list(index.iter_spans(["http.client"])) == [SPANS[1]]
+    assert list(index.iter_spans(["mark"])) == []
+    assert list(index.iter_spans([])) == []
+
+
+def test_cached_values() -> None:
+    index = SpanIndex(SPANS)
+
+    assert index.get_duration(SPANS[2]) == timedelta(milliseconds=300)
+    assert index.get_fingerprint(SPANS[0]) == fingerprint_span(SPANS[0])
+    assert index.get_url(SPANS[1]) == "/api/0/users/1"
+    assert index.get_parameterized_url("/api/0/users/1")["url"] == "/api/*/users/*"
+
+    # Values are computed once, and not recomputed if the span changes
+    spans = [dict(span) for span in SPANS]
+    index = SpanIndex(spans)
+    assert index.get_duration(spans[0]) == timedelta(milliseconds=100)
+    spans[0]["timestamp"] += 1
+    assert index.get_duration(spans[0]) == timedelta(milliseconds=100)
+
+
+def test_run_detector_on_data_with_op_prefixes() -> None:
+    event = create_event(SPANS)
+    span_index = SpanIndex(SPANS)
+
+    detector = RecordingDetector(event)
+    run_detector_on_data(detector, event, span_index)
+    assert detector.visited == SPANS
+    assert detector.span_index is span_index
+
+    detector = RecordingDetector(event, ["http", "resource"])
+    run_detector_on_data(detector, event, span_index)
+    assert detector.visited == [SPANS[1], SPANS[3], SPANS[4]]
+
+    # Without a shared index, the detector builds its own
+    detector = RecordingDetector(event, ["db"])
+    run_detector_on_data(detector, event)
+    assert detector.visited == [SPANS[0], SPANS[2]]
@@ -1,6 +1,7 @@
 import pytest
+import zstandard
 
-from sentry.utils.codecs import BytesCodec, JSONCodec, ZlibCodec, ZstdCodec
+from sentry.utils.codecs import BytesCodec, JSONCodec, ZlibCodec, ZstdCodec, ZstdDictCodec
 
 
 @pytest.mark.parametrize(
@@ -22,3 +23,47 @@ def test_codec_chaining() -> None:
 
     assert codec.encode([1, 2, 3]) == b"[1,2,3]"
     assert codec.decode(b"[1,2,3]") == [1, 2, 3]
+
+
+def _train_dictionary(dict_size: int = 4096) -> bytes:
+    samples = [
+        f'{{"platform":"python","sdk":{{"name":"sentry.python","version":"1.{i}.0"}},'
+        f'"event_id":"{i:032x}","level":"error","logger":"root{i % 7}"}}'.encode()
+        for i in range(500)
+    ]
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+def test_zstd_dict_codec() -> None:
+    codec = ZstdDictCodec({1: _train_dictionary()}, version=1)
+    value = b'{"platform":"python","sdk":{"name":"sentry.python","version":"1.1000.0"}}'
+
+    encoded = codec.encode(value)
+    assert encoded[:4] == ZstdDictCodec.magic
+    assert ZstdDictCodec.header.unpack_from(encoded)[1] == 1
+    assert codec.decode(encoded) == value
+    assert len(encoded) < len(ZstdCodec().encode(value))
+
+
+def test_zstd_dict_codec_versions() -> None:
+    old, new = _train_dictionary(), _train_dictionary(2048)
+    value = b'{"platform":"python"}'
+    encoded_old = ZstdDictCodec({1: old}, version=1).encode(value)
+
+    codec = ZstdDictCodec({1: old, 2: new}, version=2)
+    assert ZstdDictCodec.header.unpack_from(codec.encode(value))[1] == 2
+    assert codec.decode(encoded_old) == value
+
+    with pytest.raises(ValueError):
+        ZstdDictCodec({2: new}, version=2).decode(encoded_old)
+
+    with pytest.raises(ValueError):
+        ZstdDictCodec({2: new}, version=1)
+
+
+def test_zstd_dict_codec_plain_zstd() -> None:
+    codec = ZstdDictCodec({1: _train_dictionary()}, version=1)
+    assert codec.decode(ZstdCodec().encode(b"hello")) == b"hello"
+
+    # without a version the codec writes plain zstd frames
+    assert ZstdDictCodec().encode(b"hello") == ZstdCodec().encode(b"hello")
@@ -1,9 +1,14 @@
+import threading
+import time
 import unittest
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 from unittest import mock
 
 import pytest
+from django.core.cache import cache
 from django.utils import timezone
+from snuba_sdk import Column, Condition, Entity, Op, Query, Request
 from urllib3 import HTTPConnectionPool
 from urllib3.exceptions import HTTPError, ReadTimeoutError
 
@@ -12,13 +17,21 @@ from sentry.models.project import Project
 from sentry.models.release import Release
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers import override_options
+from sentry.utils import json
 from sentry.utils.snuba import (
     ROUND_UP,
+    SINGLE_FLIGHT_NO_RESULT,
+    QueryCoalescer,
+    QueryScheduler,
     RetrySkipTimeout,
     SnubaQueryParams,
     UnqualifiedQueryError,
     _prepare_query_params,
+    bulk_snuba_queries,
+    get_cache_key,
     get_json_type,
+    get_query_fingerprint,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
     get_snuba_translators,
@@ -412,6 +425,329 @@ class QuantizeTimeTest(unittest.TestCase):
         assert i != j
 
 
+def build_request(start: datetime, end: datetime, referrer: str = "testing.test") -> Request:
+    return Request(
+        dataset="events",
+        app_id="default",
+        query=Query(
+            match=Entity("events"),
+            select=[Column("event_id")],
+            where=[
+                Condition(Column("project_id"), Op.EQ, 1),
+                Condition(Column("timestamp"), Op.GTE, start),
+                Condition(Column("timestamp"), Op.LT, end),
+            ],
+        ),
+        tenant_ids={"referrer": referrer, "organization_id": 1},
+    )
+
+
+class SnubaQueryCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.end = datetime(2024, 1, 1, 12, 0, 5, tzinfo=UTC)
+        self.start = self.end - timedelta(days=1)
+        self.result = {"data": [{"event_id": "a" * 32}]}
+
+    def test_fingerprint_ignores_parent_api_and_referrer(self):
+        request = build_request(self.start, self.end, referrer="testing.test")
+        request.parent_api = "/api/0/a/"
+        other_request = build_request(self.start, self.end, referrer="api.dashboards.widget")
+        other_request.parent_api = "/api/0/b/"
+
+        assert get_query_fingerprint(request) == get_query_fingerprint(other_request)
+        assert "testing.test" not in get_query_fingerprint(request)
+
+    def test_fingerprint_rounds_timestamps(self):
+        request = build_request(self.start, self.end)
+        later_request = build_request(
+            self.start + timedelta(seconds=30), self.end + timedelta(seconds=30)
+        )
+
+        assert get_query_fingerprint(request) != get_query_fingerprint(later_request)
+        assert get_query_fingerprint(request, 60) == get_query_fingerprint(later_request, 60)
+        # the time range is widened to the granularity
+        assert "2023-12-31T12:00:00+00:00" in get_query_fingerprint(request, 60)
+        assert "2024-01-01T12:01:00+00:00" in get_query_fingerprint(request, 60)
+
+        with override_options({"snuba.query-cache.time-granularity": 60}):
+            assert get_cache_key(request) == get_cache_key(later_request)
+
+    def test_fingerprint_keeps_other_timestamps(self):
+        request = build_request(self.start, self.end)
+        request.query = request.query.set_where(
+            [
+                *request.query.where,
+                Condition(Column("received"), Op.EQ, datetime(2024, 1, 1, 6, 0, 5, tzinfo=UTC)),
+            ]
+        )
+
+        assert "2024-01-01T06:00:05+00:00" in get_query_fingerprint(request, 60)
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_referrer_opt_in(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+
+        assert bulk_snuba_queries([build_request(self.start, self.end)]) == [self.result]
+        assert bulk_snuba_queries([build_request(self.start, self.end)]) == [self.result]
+        assert mock_bulk_snuba_query.call_count == 2
+
+        mock_bulk_snuba_query.reset_mock()
+        with override_options({"snuba.query-cache.referrers": ["testing.test"]}):
+            for _ in range(2):
+                assert bulk_snuba_queries(
+                    [build_request(self.start, self.end)], referrer="testing.test"
+                ) == [self.result]
+        assert mock_bulk_snuba_query.call_count == 1
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_max_result_size(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+
+        with override_options({"snuba.query-cache.max-result-size": 10}):
+            for _ in range(2):
+                bulk_snuba_queries([build_request(self.start, self.end)], use_cache=True)
+        assert mock_bulk_snuba_query.call_count == 2
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_single_flight_waits_for_result(self, mock_bulk_snuba_query):
+        request = build_request(self.start, self.end)
+        cache_key = get_cache_key(request)
+        # Another process is already running the query
+        cache.add(f"{cache_key}:in-flight", 1, 10)
+
+        def finish_other_query(_):
+            cache.set(cache_key, json.dumps(self.result), 60)
+
+        with (
+            override_options({"snuba.query-cache.single-flight-wait": 5.0}),
+            mock.patch("sentry.utils.snuba.time.sleep", side_effect=finish_other_query),
+        ):
+            assert bulk_snuba_queries([request], use_cache=True) == [self.result]
+
+        assert mock_bulk_snuba_query.call_count == 0
+        # The claim of the other process is left alone
+        assert cache.get(f"{cache_key}:in-flight") == 1
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_single_flight_timeout(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+        request = build_request(self.start, self.end)
+        cache_key = get_cache_key(request)
+        cache.add(f"{cache_key}:in-flight", 1, 10)
+
+        with override_options({"snuba.query-cache.single-flight-wait": 0.1}):
+            assert bulk_snuba_queries([request], use_cache=True) == [self.result]
+
+        assert mock_bulk_snuba_query.call_count == 1
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_single_flight_no_result(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+        request = build_request(self.start, self.end)
+        cache_key = get_cache_key(request)
+        # The other process ran the query, but its result was too large to cache
+        cache.add(f"{cache_key}:in-flight", SINGLE_FLIGHT_NO_RESULT, 10)
+
+        with (
+            override_options({"snuba.query-cache.single-flight-wait": 5.0}),
+            mock.patch("sentry.utils.snuba.time.sleep") as sleep,
+        ):
+            assert bulk_snuba_queries([request], use_cache=True) == [self.result]
+
+        assert sleep.call_count == 1
+        assert mock_bulk_snuba_query.call_count == 1
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_single_flight_marks_uncached_result(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+        request = build_request(self.start, self.end)
+        cache_key = get_cache_key(request)
+
+        with override_options(
+            {
+                "snuba.query-cache.single-flight-wait": 5.0,
+                "snuba.query-cache.max-result-size": 10,
+            }
+        ):
+            assert bulk_snuba_queries([request], use_cache=True) == [self.result]
+
+        assert cache.get(f"{cache_key}:in-flight") == SINGLE_FLIGHT_NO_RESULT
+        assert cache.get(cache_key) is None
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_single_flight_releases_claim(self, mock_bulk_snuba_query):
+        mock_bulk_snuba_query.return_value = [self.result]
+        request = build_request(self.start, self.end)
+        cache_key = get_cache_key(request)
+
+        with override_options({"snuba.query-cache.single-flight-wait": 5.0}):
+            assert bulk_snuba_queries([request], use_cache=True) == [self.result]
+
+        assert mock_bulk_snuba_query.call_count == 1
+        assert cache.get(f"{cache_key}:in-flight") is None
+        assert json.loads(cache.get(cache_key)) == self.result
+
+
+class QueryCoalescerTest(unittest.TestCase):
+    def test_concurrent_queries_share_response(self):
+        coalescer = QueryCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        coalesced = threading.Semaphore(0)
+
+        def run_query():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "response"
+
+        def incr(key, *args, **kwargs):
+            if key == "snuba.client.coalesced":
+                coalesced.release()
+
+        with (
+            mock.patch("sentry.utils.snuba.metrics.incr", side_effect=incr),
+            ThreadPoolExecutor(max_workers=3) as executor,
+        ):
+            leader = executor.submit(coalescer.run, "key", "testing.test", run_query)
+            assert started.wait(5)
+            followers = [
+                executor.submit(coalescer.run, "key", "testing.test", run_query) for _ in range(2)
+            ]
+            # Only release the query once both followers found it in flight
+            for _ in followers:
+                assert coalesced.acquire(timeout=5)
+            release.set()
+            results = [leader.result(5)] + [follower.result(5) for follower in followers]
+
+        assert results == ["response"] * 3
+        assert len(calls) == 1
+
+        # Once done, the query runs again
+        release.set()
+        assert coalescer.run("key", "testing.test", run_query) == "response"
+        assert len(calls) == 2
+
+    def test_referrers_dont_share_responses(self):
+        coalescer = QueryCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+
+        def run_query():
+            started.set()
+            release.wait(5)
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(coalescer.run, "key", "testing.test", run_query)
+            started.wait(5)
+            # The same query of another referrer runs on its own
+            assert coalescer.run("key", "testing.other", lambda: "other response") == (
+                "other response"
+            )
+            release.set()
+            assert leader.result(5) == "response"
+
+    def test_failed_query_is_not_left_in_flight(self):
+        coalescer = QueryCoalescer()
+
+        def run_query():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            coalescer.run("key", "testing.test", run_query)
+        # The failed query isn't left in flight
+        assert coalescer.run("key", "testing.test", lambda: "response") == "response"
+
+
+class QuerySchedulerTest(TestCase):
+    def run_queries(self, referrers):
+        """
+        Runs a query per referrer, each in its own thread, arriving in the
+        given order. Queries keep running until released, one at a time in
+        the order they started. Returns the referrers of the queries in the
+        order they started, and the most queries that ran at once.
+        """
+        scheduler = QueryScheduler()
+        started = threading.Condition()
+        started_queries: list[int] = []
+        running: set[int] = set()
+        max_running = 0
+        releases = [threading.Event() for _ in referrers]
+
+        def run_query(index):
+            nonlocal max_running
+            with scheduler.slot(referrers[index]):
+                with started:
+                    started_queries.append(index)
+                    running.add(index)
+                    max_running = max(max_running, len(running))
+                    started.notify_all()
+                releases[index].wait(5)
+                with started:
+                    running.remove(index)
+
+        def wait_until(predicate):
+            deadline = time.monotonic() + 5
+            while True:
+                with scheduler._lock, started:
+                    if predicate():
+                        return
+                assert time.monotonic() < deadline
+                time.sleep(0.001)
+
+        def num_arrived():
+            # Queries the scheduler knows about, or that started without it
+            # while it's disabled.
+            num_scheduled = (
+                scheduler._running
+                + len(scheduler._waiting)
+                + sum(len(blocked) for blocked in scheduler._blocked.values())
+            )
+            return max(num_scheduled, len(started_queries))
+
+        threads = [
+            threading.Thread(target=run_query, args=(index,)) for index in range(len(referrers))
+        ]
+        for index, thread in enumerate(threads):
+            thread.start()
+            # Make sure queries arrive in order
+            wait_until(lambda: num_arrived() > index)
+
+        for position in range(len(referrers)):
+            # Every query that was handed a slot has started
+            wait_until(lambda: len(running) >= scheduler._running)
+            index = started_queries[position]
+            releases[index].set()
+            # Wait for the query to give its slot back before releasing the next one
+            threads[index].join(5)
+            assert not threads[index].is_alive()
+
+        return [referrers[index] for index in started_queries], max_running
+
+    def test_disabled(self):
+        _, max_running = self.run_queries(["testing.test"] * 3)
+        assert max_running == 3
+
+    @override_options(
+        {
+            "snuba.query-scheduler.max-concurrent": 2,
+            "snuba.query-scheduler.max-concurrent-per-referrer": 1,
+            "snuba.query-scheduler.priority-referrers": ["api."],
+        }
+    )
+    def test_limits_and_priority(self):
+        order, max_running = self.run_queries(
+            ["tasks.a", "tasks.a", "tasks.b", "api.a", "tasks.a", "api.b"]
+        )
+
+        assert max_running == 2
+        # The API queries overtake the queued task queries
+        assert order == ["tasks.a", "tasks.b", "api.a", "api.b", "tasks.a", "tasks.a"]
+
+
 class FakeConnectionPool(HTTPConnectionPool):
     def __init__(self, connection, **kwargs):
         self.connection = connection
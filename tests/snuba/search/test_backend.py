@@ -29,10 +29,10 @@ from sentry.models.grouphistory import GroupHistoryStatus, record_group_history
 from sentry.models.groupowner import GroupOwner
 from sentry.models.groupsubscription import GroupSubscription
 from sentry.search.snuba.backend import EventsDatasetSnubaSearchBackend, SnubaSearchBackendBase
-from sentry.search.snuba.executors import TrendsSortWeights
+from sentry.search.snuba.executors import PostgresSnubaQueryExecutor, TrendsSortWeights
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import SnubaTestCase, TestCase, TransactionTestCase
-from sentry.testutils.helpers import Feature, apply_feature_flag_on_cls
+from sentry.testutils.helpers import Feature, apply_feature_flag_on_cls, override_options
 from sentry.testutils.helpers.datetime import before_now
 from sentry.types.group import GroupSubStatus, PriorityLevel
 from sentry.utils import json
@@ -2560,7 +2560,107 @@ class EventsSnubaSearchTestCases(EventsDatasetTestSetup):
 
 
 class EventsSnubaSearchTest(TestCase, EventsSnubaSearchTestCases):
-    pass
+    @override_options({"snuba.search.hits-cache-ttl": 300})
+    def test_hits_cache(self):
+        with mock.patch.object(
+            PostgresSnubaQueryExecutor, "_estimate_hits", return_value=2
+        ) as estimate_hits:
+            results = self.make_query(sort_by="date", limit=1, count_hits=True)
+            assert results.hits == 2
+            assert estimate_hits.call_count == 0
+
+            # Hits of later pages are estimated once, and then reused
+            results = self.make_query(sort_by="date", limit=1, cursor=results.next, count_hits=True)
+            assert results.hits == 2
+            assert estimate_hits.call_count == 1
+
+            cursor = results.next
+            results = self.make_query(sort_by="date", limit=1, cursor=cursor, count_hits=True)
+            assert results.hits == 2
+            assert estimate_hits.call_count == 1
+
+            # Groups first seen since the hits were counted are added to them
+            event = self.store_event(
+                data={"fingerprint": ["put-me-in-group-new"], "message": "new group"},
+                project_id=self.project.id,
+            )
+            Group.objects.filter(id=event.group_id).update(
+                first_seen=timezone.now() + timedelta(minutes=1)
+            )
+            results = self.make_query(sort_by="date", limit=1, cursor=cursor, count_hits=True)
+            assert results.hits == 3
+            assert estimate_hits.call_count == 1
+
+            # A different search is estimated again
+            results = self.make_query(
+                search_filter_query="is:unresolved",
+                sort_by="date",
+                limit=1,
+                cursor=cursor,
+                count_hits=True,
+            )
+            assert results.hits == 2
+            assert estimate_hits.call_count == 2
+
+    @override_options({"snuba.search.hits-cache-ttl": 300})
+    def test_hits_cache_snuba_filters(self):
+        with mock.patch.object(
+            PostgresSnubaQueryExecutor, "_estimate_hits", return_value=1
+        ) as estimate_hits:
+            results = self.make_query(
+                search_filter_query="foo", sort_by="date", limit=1, count_hits=True
+            )
+            cursor = results.next
+            results = self.make_query(
+                search_filter_query="foo", sort_by="date", limit=1, cursor=cursor, count_hits=True
+            )
+            assert results.hits == 1
+            assert estimate_hits.call_count == 1
+
+            results = self.make_query(
+                search_filter_query="foo", sort_by="date", limit=1, cursor=cursor, count_hits=True
+            )
+            assert results.hits == 1
+            assert estimate_hits.call_count == 1
+
+            # New groups may not match the Snuba side of the search, so they
+            # can't be added to the cached hits, which are estimated again.
+            event = self.store_event(
+                data={"fingerprint": ["put-me-in-group-new"], "message": "new group"},
+                project_id=self.project.id,
+            )
+            Group.objects.filter(id=event.group_id).update(
+                first_seen=timezone.now() + timedelta(minutes=1)
+            )
+            results = self.make_query(
+                search_filter_query="foo", sort_by="date", limit=1, cursor=cursor, count_hits=True
+            )
+            assert results.hits == 1
+            assert estimate_hits.call_count == 2
+
+    @override_options({"snuba.search.cursor-cache-ttl": 300})
+    def test_cursor_cache(self):
+        with mock.patch.object(
+            PostgresSnubaQueryExecutor,
+            "snuba_search",
+            side_effect=PostgresSnubaQueryExecutor.snuba_search,
+            autospec=True,
+        ) as snuba_search:
+            results = self.make_query(sort_by="freq", limit=1)
+            assert list(results) == [self.group1]
+            assert results.next.has_results
+            assert snuba_search.call_count == 1
+
+            # The next page is served from the groups fetched for the first one
+            results = self.make_query(sort_by="freq", limit=1, cursor=results.next)
+            assert list(results) == [self.group2]
+            assert not results.next.has_results
+            assert snuba_search.call_count == 1
+
+            # Without the state of a previous page, Snuba is queried again
+            results = self.make_query(sort_by="freq", limit=1, cursor=results.prev)
+            assert list(results) == [self.group1]
+            assert snuba_search.call_count == 2
 
 
 @apply_feature_flag_on_cls("organizations:issue-search-group-attributes-side-query")